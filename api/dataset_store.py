@@ -0,0 +1,272 @@
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+
+META_FILE = "meta.json"
+# Bumped whenever the cleaned representation changes, so old stores are not reused
+STORE_FORMAT = 3
+# Decimal digits float32 always round-trips (numpy's finfo(float32).precision)
+FLOAT32_DIGITS = np.finfo(np.float32).precision
+
+
+# ---------------------------------------------------------------------------
+# Content hashing
+# ---------------------------------------------------------------------------
+
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's bytes, read in fixed-size chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+_SOURCE_HASHES: dict[tuple[str, int, int], str] = {}
+
+
+def source_hash(path: str) -> str:
+    """``file_hash`` memoized on (path, size, mtime), so unchanged files are hashed once per process."""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    if key not in _SOURCE_HASHES:
+        _SOURCE_HASHES[key] = file_hash(path)
+    return _SOURCE_HASHES[key]
+
+
+def remember_source_hash(path: str, digest: str) -> None:
+    """Seed ``source_hash`` with a digest computed while the file was written."""
+    st = os.stat(path)
+    _SOURCE_HASHES[(os.path.abspath(path), st.st_size, st.st_mtime_ns)] = digest
+
+
+def dataset_key(source_hash: str, target: str, dropped: list[str]) -> str:
+    """Key a cleaned dataset by its source bytes and the ETL decisions applied to it."""
+    payload = json.dumps(
+        {"source": source_hash, "target": target, "dropped": sorted(set(dropped)), "format": STORE_FORMAT},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+# ---------------------------------------------------------------------------
+# Dtype narrowing
+# ---------------------------------------------------------------------------
+
+def int_dtype_for(lo: float, hi: float) -> np.dtype:
+    """Smallest signed integer dtype holding every value in [lo, hi]."""
+    for dt in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dt)
+        if info.min <= lo and hi <= info.max:
+            return np.dtype(dt)
+    return np.dtype(np.int64)
+
+
+def float32_safe(values: np.ndarray) -> bool:
+    """Whether float32 keeps every significant digit the values have.
+
+    True when each finite value is exactly the double nearest a decimal with
+    at most FLOAT32_DIGITS significant digits (typical amounts, rates and
+    rounded measurements) and ``widen`` recovers it bit for bit, so
+    narrowing loses nothing the source data carried. Full-precision
+    computed values stay float64.
+    """
+    v = np.asarray(values, dtype=np.float64)
+    v = v[np.isfinite(v) & (v != 0)]
+    if len(v) == 0:
+        return True
+    a = np.abs(v)
+    if a.max() > np.finfo(np.float32).max or a.min() < np.finfo(np.float32).tiny:
+        return False
+    if not np.array_equal(_round_significant(v), v):
+        return False
+    # The float32 copy must also round back to exactly these values (see ``widen``)
+    return bool(np.array_equal(_round_significant(v.astype(np.float32).astype(np.float64)), v))
+
+
+def _round_significant(v: np.ndarray) -> np.ndarray:
+    """Round non-zero finite ``v`` to FLOAT32_DIGITS significant digits, using exact powers of ten."""
+    e = (FLOAT32_DIGITS - 1 - np.floor(np.log10(np.abs(v)))).astype(np.int64)
+    up = 10.0 ** np.abs(e)
+    return np.where(e >= 0, np.round(v * up) / up, np.round(v / up) * up)
+
+
+def widen(a: np.ndarray) -> np.ndarray:
+    """float64 copy of a narrowed column with its original decimal values restored.
+
+    Columns only become float32 when their values have at most
+    FLOAT32_DIGITS significant digits, so rounding back to that many digits
+    recovers them exactly rather than exposing float32 noise to float64 maths.
+    """
+    a = np.asarray(a)
+    if a.dtype != np.float32:
+        return a.astype(np.float64) if a.dtype.kind == "f" else a
+    v = a.astype(np.float64)
+    nz = np.isfinite(v) & (v != 0)
+    v[nz] = _round_significant(v[nz])
+    return v
+
+
+def compact_dtype(lo: Optional[float], hi: Optional[float], integral: bool, has_nan: bool, f32_ok: bool) -> np.dtype:
+    """Narrowest safe numeric dtype for a column with the given summary."""
+    if lo is None:
+        return np.dtype(np.float32)
+    if integral and not has_nan:
+        return int_dtype_for(lo, hi)
+    return np.dtype(np.float32) if f32_ok else np.dtype(np.float64)
+
+
+def compact_array(a: np.ndarray) -> np.ndarray:
+    """``a`` cast to the narrowest dtype that represents it (ints to int8..int64, floats to float32 when safe)."""
+    a = np.asarray(a)
+    if a.dtype.kind not in "iuf" or len(a) == 0:
+        return a
+    if a.dtype.kind in "iu":
+        lo, hi = int(a.min()), int(a.max())
+        if hi > np.iinfo(np.int64).max:
+            return a
+        return a.astype(int_dtype_for(lo, hi), copy=False)
+    finite = np.isfinite(a)
+    has_nan = not finite.all()
+    v = a[finite]
+    if len(v) == 0:
+        return a.astype(np.float32, copy=False)
+    lo, hi = float(v.min()), float(v.max())
+    integral = bool(np.all(v == np.round(v))) and abs(lo) < 2 ** 53 and abs(hi) < 2 ** 53
+    return a.astype(compact_dtype(lo, hi, integral, has_nan, float32_safe(v)), copy=False)
+
+
+# ---------------------------------------------------------------------------
+# Columnar store — one .npy per column, read back via memory mapping
+# ---------------------------------------------------------------------------
+
+def is_store(path: Optional[str]) -> bool:
+    return bool(path) and (Path(path) / META_FILE).exists()
+
+
+def read_meta(path: str) -> dict[str, Any]:
+    with open(Path(path) / META_FILE) as f:
+        return json.load(f)
+
+
+def store_hash(path: Optional[str]) -> Optional[str]:
+    """Content key of a cleaned store, or None if ``path`` is not one."""
+    return read_meta(path).get("dataset_hash") if is_store(path) else None
+
+
+def write_store(df: pd.DataFrame, path: Path, meta: dict[str, Any]) -> None:
+    """Persist every column of ``df`` as a compactly typed .npy file under ``path``.
+
+    Files are written into a temporary sibling directory that is renamed into
+    place once complete, so a half-written store is never picked up.
+    """
+    tmp = path.with_name(f"{path.name}.tmp-{uuid.uuid4().hex[:8]}")
+    tmp.mkdir(parents=True)
+    files = {}
+    dtypes = {}
+    for i, col in enumerate(df.columns):
+        fname = f"c{i:05d}.npy"
+        arr = np.ascontiguousarray(compact_array(df[col].to_numpy()))
+        np.save(tmp / fname, arr)
+        files[col] = fname
+        dtypes[col] = str(arr.dtype)
+    full_meta = {
+        **meta,
+        "columns": list(df.columns),
+        "files": files,
+        "dtypes": dtypes,
+        "n_rows": len(df),
+    }
+    with open(tmp / META_FILE, "w") as f:
+        json.dump(full_meta, f, indent=2)
+    try:
+        tmp.rename(path)
+    except OSError:
+        # Another writer got there first with identical content
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def column_array(path: str, column: str, meta: Optional[dict] = None) -> np.ndarray:
+    """Memory-mapped, read-only view of a single stored column."""
+    meta = meta or read_meta(path)
+    if column not in meta["files"]:
+        raise KeyError(f"Column '{column}' not found in dataset store")
+    return np.load(Path(path) / meta["files"][column], mmap_mode="r")
+
+
+def load_columns(path: str, columns: Optional[list[str]] = None, exact: bool = False) -> pd.DataFrame:
+    """Load only the requested columns (all if None) from the store.
+
+    Columns keep their compact dtypes unless ``exact`` is set, in which case
+    float columns come back as float64 with their original values.
+    """
+    meta = read_meta(path)
+    columns = list(meta["columns"]) if columns is None else list(dict.fromkeys(columns))
+    if exact:
+        return pd.DataFrame({c: widen(column_array(path, c, meta)) for c in columns}, columns=columns)
+    return pd.DataFrame({c: column_array(path, c, meta) for c in columns}, columns=columns)
+
+
+def load_matrix(
+    path: str,
+    columns: list[str],
+    start: int = 0,
+    stop: Optional[int] = None,
+    dtype=np.float32,
+) -> np.ndarray:
+    """Rows ``start:stop`` of ``columns`` as one C-contiguous ``dtype`` matrix.
+
+    Filled straight from the memory-mapped columns, so no intermediate
+    DataFrame is built. float64 matrices get narrowed columns widened back
+    to their exact values (see ``widen``).
+    """
+    meta = read_meta(path)
+    stop = meta["n_rows"] if stop is None else min(stop, meta["n_rows"])
+    X = np.empty((max(stop - start, 0), len(columns)), dtype=dtype)
+    for j, col in enumerate(columns):
+        a = column_array(path, col, meta)[start:stop]
+        X[:, j] = widen(a) if np.dtype(dtype) == np.float64 else a
+    return X
+
+
+def iter_matrix(
+    path: str,
+    columns: list[str],
+    start: int = 0,
+    stop: Optional[int] = None,
+    chunk_rows: int = 250_000,
+    dtype=np.float64,
+):
+    """Yield ``(offset, X)`` for consecutive ``load_matrix`` blocks of rows ``start:stop``."""
+    stop = read_meta(path)["n_rows"] if stop is None else stop
+    for lo in range(start, stop, chunk_rows):
+        yield lo, load_matrix(path, columns, lo, min(lo + chunk_rows, stop), dtype=dtype)
+
+
+def iter_chunks(path: str, columns: Optional[list[str]] = None, chunk_rows: int = 250_000):
+    """Yield consecutive row slices of the store as DataFrames, copying one chunk at a time."""
+    meta = read_meta(path)
+    columns = list(meta["columns"]) if columns is None else list(dict.fromkeys(columns))
+    arrays = {c: column_array(path, c, meta) for c in columns}
+    for start in range(0, meta["n_rows"], chunk_rows):
+        stop = min(start + chunk_rows, meta["n_rows"])
+        yield pd.DataFrame({c: np.array(a[start:stop]) for c, a in arrays.items()}, columns=columns)
+
+
+def prune_stores(root: Path, keep: set[str]) -> list[str]:
+    """Delete complete stores under ``root`` whose key is not in ``keep``."""
+    removed = []
+    if not root.exists():
+        return removed
+    for d in root.iterdir():
+        if d.is_dir() and d.name not in keep and is_store(str(d)):
+            shutil.rmtree(d, ignore_errors=True)
+            removed.append(d.name)
+    return removed
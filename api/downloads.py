@@ -0,0 +1,331 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+import pandas as pd
+
+try:
+    import zstandard
+except ImportError:  # optional: only needed for zstd downloads
+    zstandard = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only needed for Parquet downloads
+    pa = pq = None
+
+DOWNLOAD_FORMATS = ("csv", "parquet")
+DOWNLOAD_COMPRESSIONS = ("none", "gzip", "zstd")
+PARQUET_MEDIA_TYPES = ("application/vnd.apache.parquet", "application/x-parquet")
+EXPORTS_DIR = "exports"
+EXPORT_CHUNK_ROWS = 250_000
+COPY_CHUNK_BYTES = 1 << 20
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+# ---------------------------------------------------------------------------
+# Content negotiation
+# ---------------------------------------------------------------------------
+
+def available_compressions() -> list[str]:
+    return [c for c in DOWNLOAD_COMPRESSIONS if c != "zstd" or zstandard is not None]
+
+
+def _accept_params(header: str) -> dict[str, float]:
+    """``{token: q}`` from an Accept / Accept-Encoding header."""
+    out = {}
+    for part in header.split(","):
+        token, *params = [p.strip() for p in part.split(";")]
+        if not token:
+            continue
+        q = 1.0
+        for p in params:
+            if p.startswith("q="):
+                try:
+                    q = float(p[2:])
+                except ValueError:
+                    q = 0.0
+        out[token.lower()] = q
+    return out
+
+
+def negotiate_compression(accept_encoding: Optional[str]) -> str:
+    """Best content coding the client accepts and the server can produce (zstd over gzip on ties)."""
+    accepted = _accept_params(accept_encoding or "")
+    best, best_q = "none", 0.0
+    for coding in ("zstd", "gzip"):
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if coding in available_compressions() and q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def wants_parquet(accept: Optional[str]) -> bool:
+    accepted = _accept_params(accept or "")
+    return any(accepted.get(t, 0.0) > 0 for t in PARQUET_MEDIA_TYPES)
+
+
+def csv_columns(path: Path) -> list[str]:
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+# ---------------------------------------------------------------------------
+# Scored-output representations
+# ---------------------------------------------------------------------------
+
+class ScoredExport:
+    """One representation of a scored-output CSV: format, compression and column subset.
+
+    Representations are generated chunk by chunk on a background thread
+    and streamed as they are written, so memory is bounded by
+    ``EXPORT_CHUNK_ROWS`` and a dropped client does not abandon the work
+    (see ``_Build``). The bytes are kept under ``<artifact dir>/exports/`` (keyed by the source file's
+    size and mtime plus the parameters), so a later Range request can be
+    served from a plain file. Generation is deterministic (fixed chunking,
+    gzip mtime 0), so a transfer resumed against the cached copy gets the
+    same bytes as the interrupted stream.
+    """
+
+    def __init__(self, source: Path, fmt: str = "csv", compression: str = "none", columns: Optional[list[str]] = None):
+        if fmt not in DOWNLOAD_FORMATS:
+            raise ValueError(f"format must be one of: {', '.join(DOWNLOAD_FORMATS)}")
+        if compression not in DOWNLOAD_COMPRESSIONS:
+            raise ValueError(f"compression must be one of: {', '.join(DOWNLOAD_COMPRESSIONS)}")
+        if compression == "zstd" and zstandard is None:
+            raise ValueError("zstd downloads need the 'zstandard' package on the server")
+        if fmt == "parquet" and pq is None:
+            raise ValueError("Parquet downloads need the 'pyarrow' package on the server")
+        if fmt == "parquet" and compression != "none":
+            raise ValueError("Parquet output is already compressed; drop the compression option")
+        self.source = Path(source)
+        self.format = fmt
+        self.compression = compression
+        header = csv_columns(self.source)
+        if columns is not None:
+            unknown = [c for c in columns if c not in header]
+            if unknown:
+                raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+            columns = list(dict.fromkeys(columns))
+        self.columns = columns if columns != header else None
+
+        st = self.source.stat()
+        payload = json.dumps({
+            "source": [st.st_size, st.st_mtime_ns],
+            "format": fmt,
+            "compression": compression,
+            "columns": self.columns,
+            "chunk_rows": EXPORT_CHUNK_ROWS,
+        }, sort_keys=True)
+        self.key = hashlib.sha256(payload.encode()).hexdigest()[:24]
+        self.path = self.source.parent / EXPORTS_DIR / f"{self.key}{self.suffix}"
+
+    @property
+    def is_source(self) -> bool:
+        """True when the representation is the source file itself."""
+        return self.format == "csv" and self.compression == "none" and self.columns is None
+
+    @property
+    def suffix(self) -> str:
+        return {"parquet": ".parquet", "gzip": ".csv.gz", "zstd": ".csv.zst"}.get(
+            self.format if self.format == "parquet" else self.compression, ".csv"
+        )
+
+    @property
+    def media_type(self) -> str:
+        return PARQUET_MEDIA_TYPES[0] if self.format == "parquet" else "text/csv"
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.key}"'
+
+    def is_cached(self) -> bool:
+        return self.path.exists()
+
+    # -- generation --------------------------------------------------------
+
+    def _chunks(self, **read_args) -> Iterator[pd.DataFrame]:
+        for chunk in pd.read_csv(self.source, usecols=self.columns, chunksize=EXPORT_CHUNK_ROWS, **read_args):
+            yield chunk[self.columns] if self.columns else chunk
+
+    def _write_csv(self, sink) -> Iterator[None]:
+        if self.columns is None:
+            # Whole file: compress the bytes as they are, no re-parsing
+            with open(self.source, "rb") as f:
+                for block in iter(lambda: f.read(COPY_CHUNK_BYTES), b""):
+                    sink.write(block)
+                    yield
+            return
+        # Text dtype keeps every projected field exactly as written in the source
+        for i, chunk in enumerate(self._chunks(dtype=str, keep_default_na=False)):
+            sink.write(chunk.to_csv(index=False, header=i == 0).encode())
+            yield
+
+    def _write_parquet(self, raw) -> Iterator[None]:
+        writer = None
+        try:
+            for chunk in self._chunks():
+                if writer is None:
+                    schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+                    writer = pq.ParquetWriter(raw, schema, compression="zstd")
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+                yield
+            if writer is None:
+                empty = pd.read_csv(self.source, usecols=self.columns, nrows=0)
+                writer = pq.ParquetWriter(raw, pa.Schema.from_pandas(empty[self.columns] if self.columns else empty, preserve_index=False))
+        finally:
+            if writer is not None:
+                writer.close()
+
+    def generate(self, tmp: Path, progress: Callable[[int], None]) -> None:
+        """Write the representation to ``tmp``, reporting the bytes on disk after each chunk."""
+        with open(tmp, "wb") as raw:
+            if self.format == "parquet":
+                steps = self._write_parquet(raw)
+                sink = None
+            elif self.compression == "gzip":
+                sink = gzip.GzipFile(filename="", fileobj=raw, mode="wb", compresslevel=GZIP_LEVEL, mtime=0)
+                steps = self._write_csv(sink)
+            elif self.compression == "zstd":
+                sink = zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(raw, closefd=False)
+                steps = self._write_csv(sink)
+            else:
+                sink = raw
+                steps = self._write_csv(sink)
+            for _ in steps:
+                raw.flush()
+                progress(raw.tell())
+            if sink is not None and sink is not raw:
+                sink.close()
+            raw.flush()
+            progress(raw.tell())
+
+    def stream(self) -> Iterator[bytes]:
+        """The representation's bytes as they reach disk (from the cache if it is already there)."""
+        build = _build_for(self)
+        return _read_file(self.path) if build is None else build.tail()
+
+    def build(self) -> Path:
+        """The cached representation, waiting for (or starting) its generation if needed."""
+        build = _build_for(self)
+        if build is not None:
+            build.wait()
+        return self.path
+
+    def _prune(self) -> None:
+        # Exports older than the source were cut from a previous scoring run
+        source_mtime = self.source.stat().st_mtime_ns
+        for p in self.path.parent.iterdir():
+            try:
+                if p.stat().st_mtime_ns < source_mtime:
+                    p.unlink()
+            except OSError:
+                pass
+
+
+def _read_file(path: Path) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        yield from iter(lambda: f.read(COPY_CHUNK_BYTES), b"")
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """True when an If-None-Match header names ``etag`` (weak comparison, ``*`` matches)."""
+    if not header:
+        return False
+    tags = [t.strip() for t in header.split(",")]
+    return "*" in tags or etag in [t[2:] if t.startswith("W/") else t for t in tags]
+
+
+# ---------------------------------------------------------------------------
+# Background generation
+# ---------------------------------------------------------------------------
+
+class _Build:
+    """One in-flight generation of an export, on its own thread.
+
+    The file is written and moved into the cache whether or not anyone is
+    still reading, so a client that disconnects mid-stream and resumes
+    with a Range request waits for this build instead of starting another.
+    Readers tail the temp file as it grows.
+    """
+
+    def __init__(self, export: ScoredExport):
+        self.export = export
+        export.path.parent.mkdir(parents=True, exist_ok=True)
+        self.tmp = export.path.with_name(f".{export.path.name}.tmp-{uuid.uuid4().hex[:8]}")
+        self.tmp.touch()  # so readers can open it before the first chunk lands
+        self.written = 0
+        self.finished = False
+        self.error: Optional[Exception] = None
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="scored-export", daemon=True)
+        self._thread.start()
+
+    def _progress(self, written: int) -> None:
+        with self._cond:
+            self.written = written
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        try:
+            self.export.generate(self.tmp, self._progress)
+            os.replace(self.tmp, self.export.path)
+            self.export._prune()
+        except Exception as e:
+            self.error = e
+            self.tmp.unlink(missing_ok=True)
+        finally:
+            with _BUILDS_LOCK:
+                _BUILDS.pop(self.export.path, None)
+            with self._cond:
+                self.finished = True
+                self._cond.notify_all()
+
+    def wait(self) -> None:
+        with self._cond:
+            self._cond.wait_for(lambda: self.finished)
+        if self.error is not None:
+            raise self.error
+
+    def tail(self) -> Iterator[bytes]:
+        # The temp file may already have been moved into the cache
+        try:
+            f = open(self.tmp, "rb")
+        except FileNotFoundError:
+            self.wait()
+            f = open(self.export.path, "rb")
+        with f:
+            pos = 0
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: self.finished or self.written > pos)
+                    end, finished = self.written, self.finished
+                if self.error is not None:
+                    raise self.error
+                while pos < end:
+                    data = f.read(min(end - pos, COPY_CHUNK_BYTES))
+                    if not data:
+                        break
+                    pos += len(data)
+                    yield data
+                if finished and pos >= self.written:
+                    return
+
+
+_BUILDS: dict[Path, _Build] = {}
+_BUILDS_LOCK = threading.Lock()
+
+
+def _build_for(export: ScoredExport) -> Optional[_Build]:
+    """The running build of ``export``'s file, started if needed; None when the file is already cached."""
+    with _BUILDS_LOCK:
+        build = _BUILDS.get(export.path)
+        if build is None and not export.is_cached():
+            build = _BUILDS[export.path] = _Build(export)
+        return build
@@ -0,0 +1,83 @@
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+# Values not in a column's vocabulary (categories first seen after ETL)
+UNKNOWN_CODE = -1
+
+
+# ---------------------------------------------------------------------------
+# Categorical vocabularies
+#
+# A vocabulary is the sorted list of a column's distinct non-null values as
+# strings (the order LabelEncoder used, so a "no"/"yes" target still maps
+# to 0/1); value ``vocab[i]`` encodes to ``i``. Nulls are their own category
+# with code ``len(vocab)``.
+# ---------------------------------------------------------------------------
+
+def null_code(vocab: list[str]) -> int:
+    return len(vocab)
+
+
+def needs_encoding(s: pd.Series) -> bool:
+    return not pd.api.types.is_numeric_dtype(s)
+
+
+def transform(s: pd.Series, vocab: list[str]) -> np.ndarray:
+    """Encode a column with an existing vocabulary by vectorized lookup.
+
+    Only the column's distinct values are converted to strings and looked
+    up; the per-row work is a single factorize plus an array take.
+    """
+    codes, uniques = pd.factorize(s, use_na_sentinel=True)
+    lookup = pd.Index(vocab).get_indexer([str(u) for u in uniques])
+    out = np.full(len(s), null_code(vocab), dtype=np.int64)
+    present = codes >= 0
+    out[present] = lookup[codes[present]]  # get_indexer gives -1 == UNKNOWN_CODE for unseen values
+    return out
+
+
+def fit_transform(s: pd.Series) -> tuple[np.ndarray, list[str]]:
+    """Learn a column's vocabulary with one hash-based factorize and return its codes.
+
+    Only the distinct values are stringified and sorted, never the rows.
+    """
+    codes, uniques = pd.factorize(s, use_na_sentinel=True)
+    names = np.array([str(u) for u in uniques], dtype=object)
+    vocab = sorted(set(names))
+    # Rank of each factorized unique within the sorted vocabulary; values that
+    # print the same (e.g. 1 and "1") share a category
+    rank = pd.Index(vocab).get_indexer(names).astype(np.int64)
+    out = np.full(len(s), null_code(vocab), dtype=np.int64)
+    present = codes >= 0
+    out[present] = rank[codes[present]]
+    return out, vocab
+
+
+def fit_encodings(df: pd.DataFrame) -> tuple[pd.DataFrame, dict[str, list[str]]]:
+    """Encode every non-numeric column of ``df`` in place, returning the vocabularies."""
+    encodings = {}
+    for col in df.columns:
+        if needs_encoding(df[col]):
+            df[col], encodings[col] = fit_transform(df[col])
+    return df, encodings
+
+
+def apply_encodings(df: pd.DataFrame, encodings: dict[str, list[str]]) -> pd.DataFrame:
+    """Encode the columns of ``df`` that have a vocabulary, in place."""
+    for col, vocab in encodings.items():
+        if col in df.columns:
+            df[col] = transform(df[col], vocab)
+    return df
+
+
+def value_lookup(vocab: list[str]) -> dict[str, int]:
+    """Dict form of a vocabulary for encoding single values (see ``encode_value``)."""
+    return {v: i for i, v in enumerate(vocab)}
+
+
+def encode_value(v: Any, lookup: dict[str, int]) -> int:
+    if v is None or (isinstance(v, float) and np.isnan(v)):
+        return len(lookup)
+    return lookup.get(str(v), UNKNOWN_CODE)
@@ -0,0 +1,174 @@
+import hashlib
+import io
+import os
+import queue
+import threading
+import zlib
+from pathlib import Path
+from typing import Callable, Optional
+
+from api.profiler import DatasetProfile, profile_csv
+
+try:
+    import zstandard
+except ImportError:  # optional: only needed for .csv.zst uploads
+    zstandard = None
+
+UPLOAD_CHUNK_BYTES = 1 << 20
+# Accepted upload suffixes and the compression each implies
+UPLOAD_SUFFIXES = {".csv": None, ".csv.gz": "gzip", ".csv.zst": "zstd"}
+# Decompressed chunks buffered between the upload and the profiler thread
+_PIPE_DEPTH = 16
+
+
+def upload_compression(filename: str) -> Optional[str]:
+    """Compression of an upload from its name (None for plain CSV); ValueError if unsupported."""
+    name = filename.lower()
+    for suffix, compression in UPLOAD_SUFFIXES.items():
+        if name.endswith(suffix):
+            if compression == "zstd" and zstandard is None:
+                raise ValueError("Zstandard uploads need the 'zstandard' package on the server")
+            return compression
+    raise ValueError(f"Only {', '.join(UPLOAD_SUFFIXES)} files are accepted")
+
+
+def csv_name(filename: str) -> str:
+    """Name the decompressed upload is stored under (``data.csv.gz`` -> ``data.csv``)."""
+    name = Path(filename).name
+    for suffix in (".gz", ".zst"):
+        if name.lower().endswith(".csv" + suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+# ---------------------------------------------------------------------------
+# Streaming decompression
+# ---------------------------------------------------------------------------
+
+class _Decoder:
+    """Incremental decompressor that follows concatenated gzip members / zstd frames."""
+
+    def __init__(self, compression: Optional[str]):
+        self.factory: Optional[Callable] = {
+            None: None,
+            "gzip": lambda: zlib.decompressobj(16 + zlib.MAX_WBITS),
+            "zstd": lambda: zstandard.ZstdDecompressor().decompressobj(),
+        }[compression]
+        self._d = self.factory() if self.factory else None
+        self._pending = False
+
+    def decompress(self, data: bytes) -> bytes:
+        if self._d is None:
+            return data
+        out = []
+        while data:
+            self._pending = True
+            out.append(self._d.decompress(data))
+            if not self._d.eof:
+                break
+            data = self._d.unused_data
+            self._d = self.factory()
+            self._pending = False
+        return b"".join(out)
+
+    def finish(self) -> None:
+        if self._pending:
+            raise ValueError("Compressed upload is truncated")
+
+
+# ---------------------------------------------------------------------------
+# Upload sink — disk, hash and profile in one pass
+# ---------------------------------------------------------------------------
+
+class _Pipe(io.RawIOBase):
+    """Blocking byte pipe from the upload to the profiler thread's ``read_csv``."""
+
+    def __init__(self):
+        self._queue: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=_PIPE_DEPTH)
+        self._buffer = b""
+        self._closed_writer = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._buffer:
+            if self._closed_writer:
+                return 0
+            item = self._queue.get()
+            if item is None:
+                self._closed_writer = True
+                return 0
+            self._buffer = item
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+    def feed(self, data: Optional[bytes], reader: threading.Thread) -> None:
+        # A reader that died (unparseable CSV) stops draining; drop data rather than block
+        while reader.is_alive():
+            try:
+                self._queue.put(data, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+
+class UploadSink:
+    """Writes an upload to disk chunk by chunk as it arrives.
+
+    Compressed uploads are decompressed on the way in, so what lands on
+    disk is always a plain CSV. The same bytes are hashed and fed to a
+    profiler thread (``profile_csv`` over a pipe), so the content hash and
+    the dataset profile are ready as soon as the last chunk is written.
+    ``write`` and ``finish`` block; call them off the event loop.
+    """
+
+    def __init__(self, path: Path, compression: Optional[str] = None):
+        self.path = Path(path)
+        self.bytes_received = 0
+        self.bytes_written = 0
+        self._decoder = _Decoder(compression)
+        self._file = open(self.path, "wb")
+        self._hash = hashlib.sha256()
+        self._pipe = _Pipe()
+        self._profile: Optional[DatasetProfile] = None
+        self._error: Optional[Exception] = None
+        self._reader = threading.Thread(target=self._run_profile, name="upload-profile", daemon=True)
+        self._reader.start()
+
+    def _run_profile(self) -> None:
+        try:
+            self._profile = profile_csv(io.BufferedReader(self._pipe, UPLOAD_CHUNK_BYTES))
+        except Exception as e:
+            self._error = e
+
+    def write(self, data: bytes) -> None:
+        self.bytes_received += len(data)
+        try:
+            decoded = self._decoder.decompress(data)
+        except Exception as e:
+            raise ValueError(f"Could not decompress upload: {e}") from e
+        if decoded:
+            self._file.write(decoded)
+            self._hash.update(decoded)
+            self.bytes_written += len(decoded)
+            self._pipe.feed(decoded, self._reader)
+
+    def finish(self, dest: Path) -> tuple[str, DatasetProfile]:
+        """Close the upload, move it to ``dest`` and return its content hash and profile."""
+        self._decoder.finish()
+        self._file.close()
+        self._pipe.feed(None, self._reader)
+        self._reader.join()
+        if self._error is not None or self._profile is None:
+            raise ValueError(f"Could not parse CSV: {self._error}")
+        os.replace(self.path, dest)
+        return self._hash.hexdigest(), self._profile
+
+    def abort(self) -> None:
+        self._file.close()
+        self._pipe.feed(None, self._reader)
+        self._reader.join()
+        self.path.unlink(missing_ok=True)
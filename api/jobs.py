@@ -0,0 +1,294 @@
+import atexit
+import multiprocessing as mp
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from multiprocessing.connection import wait
+from typing import Any, Callable, Optional
+
+JOB_STATES = ["queued", "running", "succeeded", "failed", "cancelled"]
+TERMINAL_STATES = {"succeeded", "failed", "cancelled"}
+
+MAX_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+MAX_FINISHED_JOBS = 200
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+_events = None
+_current_job: Optional[str] = None
+
+
+def report_progress(fraction: float, message: str = "") -> None:
+    """Report progress from inside a running job. No-op when not run by the job engine."""
+    if _events is not None and _current_job is not None:
+        _events.send((_current_job, "progress", (float(fraction), message)))
+
+
+def _worker_main(tasks, events) -> None:
+    global _events, _current_job
+    _events = events
+    while True:
+        try:
+            task = tasks.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        job_id, fn, kwargs = task
+        _current_job = job_id
+        events.send((job_id, "running", None))
+        try:
+            events.send((job_id, "succeeded", fn(**kwargs)))
+        except Exception as e:
+            events.send((job_id, "failed", str(e)))
+        finally:
+            _current_job = None
+
+
+# ---------------------------------------------------------------------------
+# API side
+# ---------------------------------------------------------------------------
+
+class Job:
+    def __init__(
+        self,
+        stage: str,
+        fn: Callable,
+        kwargs: dict[str, Any],
+        callbacks: dict[str, Callable],
+        owner: Optional[str] = None,
+    ):
+        self.job_id = uuid.uuid4().hex
+        self.stage = stage
+        self.owner = owner
+        self.fn = fn
+        self.kwargs = kwargs
+        self.callbacks = callbacks
+        self.status = "queued"
+        self.progress = 0.0
+        self.message = ""
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def to_dict(self, include_result: bool = True) -> dict[str, Any]:
+        out = {
+            "job_id": self.job_id,
+            "stage": self.stage,
+            "status": self.status,
+            "progress": round(self.progress, 4),
+            "message": self.message,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if include_result:
+            out["result"] = self.result
+        return out
+
+
+class _Worker:
+    def __init__(self, ctx):
+        task_recv, self.tasks = ctx.Pipe(duplex=False)
+        self.events, event_send = ctx.Pipe(duplex=False)
+        self.process = ctx.Process(target=_worker_main, args=(task_recv, event_send), name="pipeline-worker")
+        self.process.start()
+        # The child holds its own copies; closing ours lets recv() see EOF if it dies
+        task_recv.close()
+        event_send.close()
+        self.job: Optional[Job] = None
+
+    def stop(self, force: bool = False) -> None:
+        if force:
+            self.process.terminate()
+        else:
+            try:
+                self.tasks.send(None)
+            except OSError:
+                pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+        self.tasks.close()
+        self.events.close()
+
+
+class JobManager:
+    """Runs pipeline functions in a pool of long-lived worker processes.
+
+    Each worker has its own task and event pipes, so a running job can be
+    cancelled by terminating its worker without disturbing the others; the
+    worker is replaced straight away. Lifecycle callbacks (``on_start``,
+    ``on_success``, ``on_failure``, ``on_cancel``) run in the API process.
+    """
+
+    def __init__(self, max_workers: int = MAX_WORKERS):
+        self.max_workers = max(1, max_workers)
+        self._ctx = mp.get_context("spawn")
+        self._lock = threading.RLock()
+        self._workers: list[_Worker] = []
+        self._pending: list[Job] = []
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._listener: Optional[threading.Thread] = None
+        self._closed = False
+        atexit.register(self.shutdown)
+
+    # -- public ---------------------------------------------------------------
+
+    def submit(
+        self,
+        stage: str,
+        fn: Callable,
+        kwargs: dict[str, Any],
+        on_start: Optional[Callable[[Job], None]] = None,
+        on_success: Optional[Callable[[Job], None]] = None,
+        on_failure: Optional[Callable[[Job], None]] = None,
+        on_cancel: Optional[Callable[[Job], None]] = None,
+        owner: Optional[str] = None,
+    ) -> Job:
+        callbacks = {"running": on_start, "succeeded": on_success, "failed": on_failure, "cancelled": on_cancel}
+        job = Job(stage, fn, kwargs, {k: v for k, v in callbacks.items() if v}, owner)
+        with self._lock:
+            self._ensure_started()
+            self._jobs[job.job_id] = job
+            self._pending.append(job)
+            self._dispatch()
+            self._prune()
+        return job
+
+    def get(self, job_id: str, owner: Optional[str] = None) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is not None and owner is not None and job.owner != owner:
+            return None
+        return job
+
+    def list(self, owner: Optional[str] = None) -> list[Job]:
+        return [j for j in self._jobs.values() if owner is None or j.owner == owner]
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in TERMINAL_STATES:
+                return job
+            if job in self._pending:
+                self._pending.remove(job)
+            else:
+                for i, w in enumerate(self._workers):
+                    if w.job is job:
+                        w.stop(force=True)
+                        self._workers[i] = _Worker(self._ctx)
+                        break
+            self._finish(job, "cancelled", None)
+            self._dispatch()
+        return job
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            for w in self._workers:
+                w.stop(force=w.job is not None)
+            self._workers = []
+
+    # -- internals ------------------------------------------------------------
+
+    def _ensure_started(self) -> None:
+        if self._closed:
+            raise RuntimeError("Job manager has been shut down")
+        while len(self._workers) < self.max_workers:
+            self._workers.append(_Worker(self._ctx))
+        if self._listener is None:
+            self._listener = threading.Thread(target=self._listen, name="job-listener", daemon=True)
+            self._listener.start()
+
+    def _dispatch(self) -> None:
+        for w in self._workers:
+            if not self._pending:
+                return
+            if w.job is None:
+                job = self._pending.pop(0)
+                w.job = job
+                w.tasks.send((job.job_id, job.fn, job.kwargs))
+
+    def _prune(self) -> None:
+        finished = [j for j in self._jobs.values() if j.status in TERMINAL_STATES]
+        for job in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job.job_id]
+
+    def _finish(self, job: Job, status: str, payload: Any) -> None:
+        job.status = status
+        job.finished_at = time.time()
+        if status == "succeeded":
+            job.result = payload
+            job.progress = 1.0
+        elif status == "failed":
+            job.error = payload
+        self._fire(job, status)
+
+    def _fire(self, job: Job, event: str) -> None:
+        cb = job.callbacks.get(event)
+        if cb is not None:
+            try:
+                cb(job)
+            except Exception as e:
+                job.error = job.error or f"Lifecycle callback failed: {e}"
+
+    def _handle(self, worker: _Worker, job_id: str, kind: str, payload: Any) -> None:
+        job = worker.job
+        if job is None or job.job_id != job_id or job.status in TERMINAL_STATES:
+            return
+        if kind == "progress":
+            job.progress, job.message = payload
+        elif kind == "running":
+            job.status = "running"
+            job.started_at = time.time()
+            self._fire(job, "running")
+        else:
+            worker.job = None
+            self._finish(job, kind, payload)
+            self._dispatch()
+
+    def _listen(self) -> None:
+        while not self._closed:
+            with self._lock:
+                conns = {w.events: w for w in self._workers}
+            try:
+                ready = wait(list(conns), timeout=0.5)
+            except OSError:
+                continue
+            with self._lock:
+                for conn in ready:
+                    w = conns[conn]
+                    if w not in self._workers:
+                        continue  # replaced by a cancel while we were waiting
+                    try:
+                        msg = conn.recv()
+                    except (EOFError, OSError):
+                        self._replace_dead(w)
+                        continue
+                    self._handle(w, *msg)
+                for w in list(self._workers):
+                    if not w.process.is_alive():
+                        self._replace_dead(w)
+
+    def _replace_dead(self, worker: _Worker) -> None:
+        if self._closed or worker not in self._workers:
+            return
+        job = worker.job
+        self._workers[self._workers.index(worker)] = _Worker(self._ctx)
+        worker.stop(force=True)
+        if job is not None and job.status not in TERMINAL_STATES:
+            self._finish(job, "failed", f"Worker exited unexpectedly (code {worker.process.exitcode})")
+        self._dispatch()
+
+
+jobs = JobManager()
@@ -1,37 +1,59 @@
 import json
-import shutil
+import uuid
 from pathlib import Path
+from typing import AsyncIterator, Optional
 
-from fastapi import FastAPI, UploadFile, HTTPException
+from fastapi import Depends, FastAPI, UploadFile, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-
-from api.state import session, STAGES
+from starlette.concurrency import run_in_threadpool
+
+from api.dataset_store import prune_stores, remember_source_hash, source_hash
+from api.downloads import ScoredExport, etag_matches, negotiate_compression, wants_parquet
+from api.ingest import UPLOAD_CHUNK_BYTES, UploadSink, csv_name, upload_compression
+from api.jobs import jobs, Job
+from api.model_registry import forget_models, latest_version, list_models, model_info, resolve_version
+from api.predictor import drop_predictor, get_predictor
+from api.result_cache import results
+from api.scored_index import MAX_QUERY_ROWS, ScoredIndex, decode_cursor
+from api.stats_engine import MI_MODES, THRESHOLD_METRICS
+from api.state import sessions, SessionState, STAGES, SESSION_COOKIE, SESSION_HEADER
 from api.schemas import (
     StatusResponse,
     UploadResponse,
     ETLConfirm,
     StatsConfirm,
+    StatsRequest,
     ModelConfirm,
+    ModelSearchRequest,
     EvaluateConfirm,
+    PredictRequest,
+    DescriptivesRequest,
     TargetRequest,
 )
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 
 from api.pipeline_runner import (
     get_dataset_summary,
     get_column_details,
+    remember_profile,
     run_target_stats,
     apply_etl_decisions,
     run_stats,
     run_model,
+    run_model_search,
+    run_gradient_boosting,
+    MODEL_TYPES,
+    LOGISTIC_SOLVERS,
+    SEARCH_PARAMS,
+    SEARCH_RESOURCES,
     run_evaluate,
     run_scoring,
     run_descriptives,
     run_logistic_regression,
     generate_html_report,
     DATA,
+    SEGMENT_NAMES,
 )
-
 app = FastAPI(title="Agentic ML Pipeline API")
 
 app.add_middleware(
@@ -39,34 +61,173 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[SESSION_HEADER],
 )
 
 
+def get_session(request: Request, response: Response) -> SessionState:
+    """Resolve the caller's session from the X-Session-ID header, cookie or ?session_id=, creating one if needed."""
+    if sessions.evict_idle(before_delete=_release_session):
+        removed = prune_stores(DATA / "store", keep=_live_hashes() | _model_store_hashes())
+        results.invalidate(removed)
+    sid = (
+        request.headers.get(SESSION_HEADER)
+        or request.cookies.get(SESSION_COOKIE)
+        or request.query_params.get(SESSION_COOKIE)
+    )
+    session = sessions.get_or_create(sid)
+    response.headers[SESSION_HEADER] = session.session_id
+    if sid != session.session_id:
+        response.set_cookie(SESSION_COOKIE, session.session_id, httponly=True, samesite="lax")
+    return session
+
+
+def _dataset_hash(session: SessionState) -> Optional[str]:
+    path = session.dataset_path
+    return source_hash(path) if path and Path(path).exists() else None
+
+
+def _live_hashes(exclude: Optional[SessionState] = None) -> set[str]:
+    """Source and cleaned-store hashes still referenced by a session."""
+    live = set()
+    for s in sessions.all():
+        if s is not exclude:
+            live |= {_dataset_hash(s), s.confirmed_outputs.get("etl", {}).get("dataset_hash")}
+    return {h for h in live if h}
+
+
+def _model_store_hashes() -> set[str]:
+    """Cleaned stores that live sessions' models were trained on (their vocabularies encode /predict rows)."""
+    return {info.get("dataset_hash") for s in sessions.all() for info in list_models(s.artifact_dir)} - {None}
+
+
+def _invalidate_results(session: SessionState, hashes: set[Optional[str]]) -> None:
+    """Drop cached stage results for datasets this session no longer uses, unless another session does."""
+    results.invalidate({h for h in hashes if h} - _live_hashes(exclude=session))
+
+
+def _enqueue_stage(
+    session: SessionState,
+    stage: str,
+    fn,
+    kwargs: dict,
+    error_prefix: str,
+    done_status: str = "awaiting_review",
+    done_stage: str | None = None,
+) -> dict:
+    """Submit a pipeline function as a background job whose lifecycle drives session.stage_status."""
+    if session.stage_status[stage] in ("queued", "running"):
+        raise HTTPException(409, f"Stage {stage} is already running")
+
+    def on_start(job: Job):
+        session.stage_status[stage] = "running"
+
+    def on_success(job: Job):
+        session.stage_outputs[stage] = job.result
+        session.stage_status[stage] = done_status
+        session.current_stage = done_stage or stage
+
+    def on_failure(job: Job):
+        job.error = f"{error_prefix}: {job.error}"
+        session.stage_status[stage] = "pending"
+
+    def on_cancel(job: Job):
+        session.stage_status[stage] = "pending"
+
+    session.stage_status[stage] = "queued"
+    kwargs = {**kwargs, "artifact_dir": str(session.artifact_dir)}
+    job = jobs.submit(stage, fn, kwargs, on_start, on_success, on_failure, on_cancel, owner=session.session_id)
+    return job.to_dict(include_result=False)
+
+
+def _model_version(session: SessionState, requested: Optional[str]) -> str:
+    """The requested model version, else the confirmed one, else the latest — checked to exist."""
+    version = requested or session.confirmed_outputs.get("model", {}).get("model_version")
+    try:
+        return resolve_version(session.artifact_dir, version)
+    except KeyError as e:
+        raise HTTPException(404, str(e.args[0]))
+
+
+def _cancel_jobs(session: SessionState) -> None:
+    for job in jobs.list(owner=session.session_id):
+        jobs.cancel(job.job_id)
+
+
+def _release_session(session: SessionState) -> None:
+    """Stop an evicted session's workers and unload its models before its directory is deleted."""
+    _cancel_jobs(session)
+    drop_predictor(session.artifact_dir)
+    forget_models(session.artifact_dir)
+
+
 @app.get("/status", response_model=StatusResponse)
-def get_status():
+def get_status(session: SessionState = Depends(get_session)):
     return StatusResponse(**session.to_dict())
 
 
-@app.post("/upload", response_model=UploadResponse)
-async def upload_dataset(file: UploadFile):
-    if not file.filename or not file.filename.endswith(".csv"):
-        raise HTTPException(400, "Only CSV files are accepted")
+async def _upload_file_chunks(file: UploadFile) -> AsyncIterator[bytes]:
+    while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+        yield chunk
 
-    DATA.mkdir(exist_ok=True)
-    dest = DATA / file.filename
-    with open(dest, "wb") as f:
-        shutil.copyfileobj(file.file, f)
 
+async def _ingest_upload(session: SessionState, filename: Optional[str], chunks: AsyncIterator[bytes]) -> UploadResponse:
+    """Stream an upload to the session dir, decompressing, hashing and profiling it off the event loop."""
+    try:
+        compression = upload_compression(filename or "")
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    session.artifact_dir.mkdir(parents=True, exist_ok=True)
+    previous = {_dataset_hash(session), session.confirmed_outputs.get("etl", {}).get("dataset_hash")}
+    dest = session.artifact_dir / csv_name(filename)
+    sink = await run_in_threadpool(UploadSink, dest.with_name(f".{dest.name}.upload-{uuid.uuid4().hex[:8]}"), compression)
+    try:
+        pending: list[bytes] = []
+        size = 0
+        async for chunk in chunks:
+            pending.append(chunk)
+            size += len(chunk)
+            # Hop to the thread pool per megabyte, not per network read
+            if size >= UPLOAD_CHUNK_BYTES:
+                await run_in_threadpool(sink.write, b"".join(pending))
+                pending, size = [], 0
+        if pending:
+            await run_in_threadpool(sink.write, b"".join(pending))
+        digest, profile = await run_in_threadpool(sink.finish, dest)
+    except ValueError as e:
+        await run_in_threadpool(sink.abort)
+        raise HTTPException(400, str(e))
+    except BaseException:
+        await run_in_threadpool(sink.abort)
+        raise
+    remember_source_hash(str(dest), digest)
+    remember_profile(str(dest), profile)
+
+    _cancel_jobs(session)
     session.reset()
     session.dataset_path = str(dest)
-    summary = get_dataset_summary(str(dest))
+    _invalidate_results(session, previous - {digest})
+    summary = await run_in_threadpool(get_dataset_summary, str(dest))
     session.dataset_summary = summary
     session.current_stage = "etl"
     return UploadResponse(**summary)
 
 
+@app.post("/upload", response_model=UploadResponse)
+async def upload_dataset(file: UploadFile, session: SessionState = Depends(get_session)):
+    """Multipart upload of a .csv, .csv.gz or .csv.zst file."""
+    return await _ingest_upload(session, file.filename, _upload_file_chunks(file))
+
+
+@app.post("/upload/stream", response_model=UploadResponse)
+async def upload_dataset_stream(request: Request, filename: str, session: SessionState = Depends(get_session)):
+    """Raw-body upload (``?filename=`` names the file): bytes go to disk as they arrive."""
+    return await _ingest_upload(session, filename, request.stream())
+
+
 @app.get("/columns")
-def get_columns():
+def get_columns(session: SessionState = Depends(get_session)):
     """Detailed per-column stats for the uploaded dataset."""
     if not session.dataset_path:
         raise HTTPException(400, "No dataset uploaded")
@@ -74,12 +235,14 @@ def get_columns():
 
 
 @app.post("/analyze/target")
-def analyze_target(payload: TargetRequest):
+def analyze_target(payload: TargetRequest, session: SessionState = Depends(get_session)):
     """Run statistical tests for all columns against the selected target."""
     if not session.dataset_path:
         raise HTTPException(400, "No dataset uploaded")
+    if payload.sample_size is not None and payload.sample_size < 1:
+        raise HTTPException(400, "sample_size must be a positive number of rows")
     try:
-        results = run_target_stats(session.dataset_path, payload.target)
+        results = run_target_stats(session.dataset_path, payload.target, sample_size=payload.sample_size)
         session.stage_status["etl"] = "awaiting_review"
         session.current_stage = "etl"
         return results
@@ -92,17 +255,21 @@ def analyze_target(payload: TargetRequest):
 # ---------------------------------------------------------------------------
 
 @app.post("/confirm/etl")
-def confirm_etl(payload: ETLConfirm):
+def confirm_etl(payload: ETLConfirm, session: SessionState = Depends(get_session)):
     if not session.dataset_path:
         raise HTTPException(400, "No dataset uploaded")
     try:
-        result = apply_etl_decisions(session.dataset_path, payload)
+        previous = session.confirmed_outputs.get("etl", {}).get("dataset_hash")
+        result = apply_etl_decisions(session.dataset_path, payload, str(session.artifact_dir))
+        if previous != result["dataset_hash"]:
+            _invalidate_results(session, {previous})
         session.confirmed_outputs["etl"] = {
             "target": payload.target,
             "columns_kept": result["columns_kept"],
             "columns_dropped": result["columns_dropped"],
             "cleaned_shape": result["cleaned_shape"],
             "cleaned_path": result["cleaned_path"],
+            "dataset_hash": result["dataset_hash"],
         }
         session.stage_status["etl"] = "confirmed"
         return {"status": "confirmed", "stage": "etl", **result}
@@ -115,7 +282,7 @@ def confirm_etl(payload: ETLConfirm):
 # ---------------------------------------------------------------------------
 
 @app.post("/run/stats")
-def run_stats_stage():
+def run_stats_stage(payload: Optional[StatsRequest] = None, session: SessionState = Depends(get_session)):
     if session.stage_status["etl"] not in ("confirmed", "complete"):
         raise HTTPException(400, "ETL stage must be confirmed first")
     target = session.confirmed_outputs.get("etl", {}).get("target")
@@ -124,20 +291,21 @@ def run_stats_stage():
         raise HTTPException(400, "No target variable set")
     if not cleaned_path:
         raise HTTPException(400, "Cleaned dataset path not found — re-confirm ETL")
-    try:
-        session.stage_status["stats"] = "running"
-        result = run_stats(target, cleaned_path)
-        session.stage_outputs["stats"] = result
-        session.stage_status["stats"] = "awaiting_review"
-        session.current_stage = "stats"
-        return result
-    except Exception as e:
-        session.stage_status["stats"] = "pending"
-        raise HTTPException(500, f"Stats failed: {str(e)}")
+    payload = payload or StatsRequest()
+    if payload.mi_mode not in MI_MODES:
+        raise HTTPException(400, f"mi_mode must be one of: {', '.join(MI_MODES)}")
+    if payload.mi_sample_size < 1000:
+        raise HTTPException(400, "mi_sample_size must be at least 1000")
+    return _enqueue_stage(session, "stats", run_stats, {
+        "target": target,
+        "cleaned_path": cleaned_path,
+        "mi_mode": payload.mi_mode,
+        "mi_sample_size": payload.mi_sample_size,
+    }, "Stats failed")
 
 
 @app.post("/confirm/stats")
-def confirm_stats(payload: StatsConfirm):
+def confirm_stats(payload: StatsConfirm, session: SessionState = Depends(get_session)):
     if session.stage_status["stats"] != "awaiting_review":
         raise HTTPException(400, "Stats is not awaiting review")
     session.confirmed_outputs["stats"] = payload.model_dump()
@@ -150,69 +318,140 @@ def confirm_stats(payload: StatsConfirm):
 # ---------------------------------------------------------------------------
 
 @app.post("/run/model")
-def run_model_stage(payload: ModelConfirm):
+def run_model_stage(payload: ModelConfirm, session: SessionState = Depends(get_session)):
     if session.stage_status["stats"] not in ("confirmed", "complete"):
         raise HTTPException(400, "Stats stage must be confirmed first")
     target = session.confirmed_outputs["etl"]["target"]
     features = session.confirmed_outputs["stats"]["selected_features"]
     cleaned_path = session.confirmed_outputs["etl"]["cleaned_path"]
     hp = payload.hyperparameters
-    try:
-        session.stage_status["model"] = "running"
-        result = run_model(
-            target=target,
-            selected_features=features,
-            cleaned_path=cleaned_path,
-            n_estimators=hp.get("n_estimators", 100),
-            max_depth=hp.get("max_depth", 10),
-            class_weight_mode=hp.get("class_weight", "balanced"),
-            test_split=hp.get("test_split", 0.2),
-        )
-        session.stage_outputs["model"] = result
-        session.stage_status["model"] = "awaiting_review"
-        session.current_stage = "model"
-        return result
-    except Exception as e:
-        session.stage_status["model"] = "pending"
-        raise HTTPException(500, f"Model training failed: {str(e)}")
+    if payload.model_type == "LogisticRegression":
+        return run_logistic_stage(payload, session)
+    if payload.model_type == "HistGradientBoosting":
+        return _enqueue_stage(session, "model", run_gradient_boosting, {
+            "target": target,
+            "selected_features": features,
+            "cleaned_path": cleaned_path,
+            "max_iter": hp.get("max_iter", 300),
+            "learning_rate": hp.get("learning_rate", 0.1),
+            "max_leaf_nodes": hp.get("max_leaf_nodes", 31),
+            "max_depth": hp.get("max_depth"),
+            "l2_regularization": hp.get("l2_regularization", 0.0),
+            "class_weight_mode": hp.get("class_weight", "balanced"),
+            "early_stopping": hp.get("early_stopping", True),
+            "test_split": hp.get("test_split", 0.2),
+        }, "Model training failed")
+    if payload.model_type != "RandomForest":
+        raise HTTPException(400, f"model_type must be one of: {', '.join(MODEL_TYPES)}")
+    n_estimators = hp.get("n_estimators", 100)
+    if n_estimators != "auto" and not (isinstance(n_estimators, int) and n_estimators >= 1):
+        raise HTTPException(400, "n_estimators must be a positive integer or \"auto\"")
+    return _enqueue_stage(session, "model", run_model, {
+        "target": target,
+        "selected_features": features,
+        "cleaned_path": cleaned_path,
+        "n_estimators": n_estimators,
+        "max_depth": hp.get("max_depth", 10),
+        "class_weight_mode": hp.get("class_weight", "balanced"),
+        "test_split": hp.get("test_split", 0.2),
+    }, "Model training failed")
+
+
+@app.post("/run/model/search")
+def run_model_search_stage(payload: Optional[ModelSearchRequest] = None, session: SessionState = Depends(get_session)):
+    """Successive-halving hyperparameter search; the best model is registered like a /run/model run."""
+    if session.stage_status["stats"] not in ("confirmed", "complete"):
+        raise HTTPException(400, "Stats stage must be confirmed first")
+    payload = payload or ModelSearchRequest()
+    unknown = set(payload.search_space) - set(SEARCH_PARAMS)
+    if unknown:
+        raise HTTPException(400, f"Unknown search parameters: {', '.join(sorted(unknown))} (allowed: {', '.join(SEARCH_PARAMS)})")
+    for name, values in payload.search_space.items():
+        if isinstance(values, dict) and not {"min", "max"} <= set(values):
+            raise HTTPException(400, f"Range for '{name}' needs 'min' and 'max'")
+    if payload.resource not in SEARCH_RESOURCES:
+        raise HTTPException(400, f"resource must be one of: {', '.join(SEARCH_RESOURCES)}")
+    if payload.factor < 2:
+        raise HTTPException(400, "factor must be at least 2")
+    if payload.n_candidates is not None and payload.n_candidates < 2:
+        raise HTTPException(400, "n_candidates must be at least 2")
+    if not 0 < payload.test_split < 1:
+        raise HTTPException(400, "test_split must be between 0 and 1")
+    return _enqueue_stage(session, "model", run_model_search, {
+        "target": session.confirmed_outputs["etl"]["target"],
+        "selected_features": session.confirmed_outputs["stats"]["selected_features"],
+        "cleaned_path": session.confirmed_outputs["etl"]["cleaned_path"],
+        "search_space": payload.search_space,
+        "n_candidates": payload.n_candidates,
+        "resource": payload.resource,
+        "max_trees": payload.max_trees,
+        "factor": payload.factor,
+        "test_split": payload.test_split,
+    }, "Model search failed")
 
 
 @app.post("/confirm/model")
-def confirm_model(payload: ModelConfirm):
+def confirm_model(payload: ModelConfirm, session: SessionState = Depends(get_session)):
     if session.stage_status["model"] != "awaiting_review":
         raise HTTPException(400, "Model is not awaiting review")
-    session.confirmed_outputs["model"] = payload.model_dump()
+    session.confirmed_outputs["model"] = {
+        **payload.model_dump(),
+        "model_version": session.stage_outputs.get("model", {}).get("model_version"),
+    }
     session.stage_status["model"] = "confirmed"
     return {"status": "confirmed", "stage": "model"}
 
 
+@app.get("/models")
+def get_models(session: SessionState = Depends(get_session)):
+    return {"latest": latest_version(session.artifact_dir), "models": list_models(session.artifact_dir)}
+
+
+@app.get("/models/{version}")
+def get_model(version: str, session: SessionState = Depends(get_session)):
+    try:
+        return model_info(session.artifact_dir, version)
+    except KeyError as e:
+        raise HTTPException(404, str(e.args[0]))
+
+
 # ---------------------------------------------------------------------------
 # Evaluate — direct computation
 # ---------------------------------------------------------------------------
 
 @app.post("/run/evaluate")
-def run_evaluate_stage():
+def run_evaluate_stage(
+    payload: Optional[EvaluateConfirm] = None,
+    model_version: Optional[str] = None,
+    session: SessionState = Depends(get_session),
+):
     if session.stage_status["model"] not in ("confirmed", "complete"):
         raise HTTPException(400, "Model stage must be confirmed first")
     target = session.confirmed_outputs["etl"]["target"]
     features = session.confirmed_outputs["stats"]["selected_features"]
     cleaned_path = session.confirmed_outputs["etl"]["cleaned_path"]
-    try:
-        session.stage_status["evaluate"] = "running"
-        result = run_evaluate(target=target, selected_features=features, cleaned_path=cleaned_path)
-        session.stage_outputs["evaluate"] = result
-        session.stage_status["evaluate"] = "awaiting_review"
-        session.current_stage = "evaluate"
-        return result
-    except Exception as e:
-        session.stage_status["evaluate"] = "pending"
-        raise HTTPException(500, f"Evaluation failed: {str(e)}")
+    payload = payload or EvaluateConfirm()
+    if payload.primary_metric not in THRESHOLD_METRICS:
+        raise HTTPException(400, f"primary_metric must be one of: {', '.join(THRESHOLD_METRICS)}")
+    if payload.cost_fp < 0 or payload.cost_fn < 0:
+        raise HTTPException(400, "cost_fp and cost_fn must be non-negative")
+    return _enqueue_stage(session, "evaluate", run_evaluate, {
+        "target": target,
+        "selected_features": features,
+        "cleaned_path": cleaned_path,
+        "primary_metric": payload.primary_metric,
+        "cost_fp": payload.cost_fp,
+        "cost_fn": payload.cost_fn,
+        "model_version": _model_version(session, model_version),
+    }, "Evaluation failed")
 
 
 @app.post("/confirm/evaluate")
-def confirm_evaluate(payload: EvaluateConfirm):
+def confirm_evaluate(payload: EvaluateConfirm, session: SessionState = Depends(get_session)):
     if session.stage_status["evaluate"] != "awaiting_review":
         raise HTTPException(400, "Evaluate is not awaiting review")
+    if payload.primary_metric not in THRESHOLD_METRICS:
+        raise HTTPException(400, f"primary_metric must be one of: {', '.join(THRESHOLD_METRICS)}")
     session.confirmed_outputs["evaluate"] = payload.model_dump()
     session.stage_status["evaluate"] = "confirmed"
     return {"status": "confirmed", "stage": "evaluate"}
@@ -223,30 +462,132 @@ def confirm_evaluate(payload: EvaluateConfirm):
 # ---------------------------------------------------------------------------
 
 @app.post("/run/scoring")
-def run_scoring_stage():
+def run_scoring_stage(model_version: Optional[str] = None, session: SessionState = Depends(get_session)):
     if session.stage_status["evaluate"] not in ("confirmed", "complete"):
         raise HTTPException(400, "Evaluate stage must be confirmed first")
     target = session.confirmed_outputs["etl"]["target"]
     features = session.confirmed_outputs["stats"]["selected_features"]
     cleaned_path = session.confirmed_outputs["etl"]["cleaned_path"]
-    try:
-        session.stage_status["scoring"] = "running"
-        result = run_scoring(target=target, selected_features=features, cleaned_path=cleaned_path)
-        session.stage_outputs["scoring"] = result
-        session.stage_status["scoring"] = "complete"
-        session.current_stage = "complete"
-        return result
-    except Exception as e:
-        session.stage_status["scoring"] = "pending"
-        raise HTTPException(500, f"Scoring failed: {str(e)}")
+    return _enqueue_stage(session, "scoring", run_scoring, {
+        "target": target,
+        "selected_features": features,
+        "cleaned_path": cleaned_path,
+        "model_version": _model_version(session, model_version),
+    }, "Scoring failed", done_status="complete", done_stage="complete")
 
 
 @app.get("/download/scored")
-def download_scored():
-    path = DATA / "scored_output.csv"
+def download_scored(
+    request: Request,
+    format: Optional[str] = None,
+    compression: Optional[str] = None,
+    columns: Optional[str] = None,
+    session: SessionState = Depends(get_session),
+):
+    """Scored output as CSV or Parquet, optionally compressed and limited to ``columns`` (comma-separated).
+
+    Without ``format``, Parquet is chosen when the Accept header asks for it.
+    Without ``compression``, CSV is sent with the best Content-Encoding the
+    client accepts; an explicit ``compression`` downloads a .csv.gz/.csv.zst
+    file instead. Range requests are served from the cached representation
+    (waiting for it if it is still being generated); If-None-Match and
+    If-Range are checked against the representation's ETag.
+    """
+    path = session.artifact_dir / "scored_output.csv"
+    if not path.exists():
+        raise HTTPException(404, "Scored output not found")
+    fmt = format or ("parquet" if wants_parquet(request.headers.get("accept")) else "csv")
+    encoding = None
+    if compression is None and fmt == "csv":
+        encoding = negotiate_compression(request.headers.get("accept-encoding"))
+    selected = [c.strip() for c in columns.split(",") if c.strip()] if columns else None
+    try:
+        export = ScoredExport(path, fmt, compression or encoding or "none", selected)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    headers = {"Vary": "Accept, Accept-Encoding", "ETag": export.etag}
+    if etag_matches(request.headers.get("if-none-match"), export.etag):
+        return Response(status_code=304, headers=headers)
+    filename = "scored_output" + export.suffix
+    media_type = export.media_type
+    if encoding and encoding != "none":
+        headers["Content-Encoding"] = encoding
+        filename = "scored_output.csv"
+    elif compression in ("gzip", "zstd"):
+        media_type = {"gzip": "application/gzip", "zstd": "application/zstd"}[compression]
+    if export.is_source:
+        return FileResponse(path, media_type=media_type, filename=filename, headers=headers)
+    # A Range applies only while If-Range (if sent) still names this representation
+    ranged = "range" in request.headers and request.headers.get("if-range", export.etag) == export.etag
+    if export.is_cached() or ranged:
+        return FileResponse(export.build(), media_type=media_type, filename=filename, headers=headers)
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    headers["Accept-Ranges"] = "bytes"
+    return StreamingResponse(export.stream(), media_type=media_type, headers=headers)
+
+
+@app.get("/scored")
+def query_scored(
+    segment_number: Optional[list[int]] = Query(None),
+    prob_min: Optional[float] = None,
+    prob_max: Optional[float] = None,
+    top_k: Optional[int] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    session: SessionState = Depends(get_session),
+):
+    """Scored rows by descending probability, filtered by segment and probability range.
+
+    ``top_k`` caps the result at the k riskiest matching rows; pages of
+    ``limit`` rows are fetched by passing back ``next_cursor``. Served from
+    the index ``run_scoring`` builds, without scanning the scored file.
+    """
+    path = session.artifact_dir / "scored_output.csv"
     if not path.exists():
         raise HTTPException(404, "Scored output not found")
-    return FileResponse(path, media_type="text/csv", filename="scored_output.csv")
+    if not 1 <= limit <= MAX_QUERY_ROWS:
+        raise HTTPException(400, f"limit must be between 1 and {MAX_QUERY_ROWS}")
+    if top_k is not None and top_k < 1:
+        raise HTTPException(400, "top_k must be positive")
+    if segment_number and not all(1 <= k <= len(SEGMENT_NAMES) for k in segment_number):
+        raise HTTPException(400, f"segment_number must be between 1 and {len(SEGMENT_NAMES)}")
+    try:
+        index = ScoredIndex(session.artifact_dir, path)
+    except FileNotFoundError as e:
+        raise HTTPException(404, str(e))
+    try:
+        offset = decode_cursor(cursor, index.id) if cursor else 0
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return index.query(segment_number or None, prob_min, prob_max, top_k, offset, limit)
+
+
+# ---------------------------------------------------------------------------
+# Predict — online scoring with a resident model
+# ---------------------------------------------------------------------------
+
+@app.post("/predict")
+async def predict(
+    payload: PredictRequest,
+    model_version: Optional[str] = None,
+    session: SessionState = Depends(get_session),
+):
+    if latest_version(session.artifact_dir) is None:
+        raise HTTPException(400, "No trained model — run the model stage first")
+    if "etl" not in session.confirmed_outputs:
+        raise HTTPException(400, "ETL stage must be confirmed first")
+    if not payload.rows:
+        raise HTTPException(400, "No rows to score")
+    try:
+        # Loading a model is slow disk work; never do it on the event loop
+        predictor = await run_in_threadpool(get_predictor, session.artifact_dir, model_version)
+    except KeyError as e:
+        raise HTTPException(404, str(e.args[0]))
+    try:
+        return {"model_version": predictor.version, "predictions": await predictor.predict(payload.rows)}
+    except ValueError as e:
+        raise HTTPException(400, str(e))
 
 
 # ---------------------------------------------------------------------------
@@ -254,11 +595,20 @@ def download_scored():
 # ---------------------------------------------------------------------------
 
 @app.post("/run/descriptives")
-def run_descriptives_stage(payload: TargetRequest):
+def run_descriptives_stage(payload: DescriptivesRequest, session: SessionState = Depends(get_session)):
     if not session.dataset_path:
         raise HTTPException(400, "No dataset uploaded")
+    if min(payload.numeric_offset, payload.crosstab_offset) < 0 or min(payload.numeric_limit, payload.crosstab_limit) < 1:
+        raise HTTPException(400, "Offsets must be non-negative and limits positive")
     try:
-        result = run_descriptives(session.dataset_path, payload.target)
+        result = run_descriptives(
+            session.dataset_path,
+            payload.target,
+            numeric_offset=payload.numeric_offset,
+            numeric_limit=payload.numeric_limit,
+            crosstab_offset=payload.crosstab_offset,
+            crosstab_limit=payload.crosstab_limit,
+        )
         return result
     except Exception as e:
         raise HTTPException(500, str(e))
@@ -269,29 +619,24 @@ def run_descriptives_stage(payload: TargetRequest):
 # ---------------------------------------------------------------------------
 
 @app.post("/run/logistic")
-def run_logistic_stage(payload: ModelConfirm):
+def run_logistic_stage(payload: ModelConfirm, session: SessionState = Depends(get_session)):
     if session.stage_status["stats"] not in ("confirmed", "complete"):
         raise HTTPException(400, "Stats stage must be confirmed first")
     target = session.confirmed_outputs["etl"]["target"]
     features = session.confirmed_outputs["stats"]["selected_features"]
     cleaned_path = session.confirmed_outputs["etl"]["cleaned_path"]
     hp = payload.hyperparameters
-    try:
-        session.stage_status["model"] = "running"
-        result = run_logistic_regression(
-            target=target,
-            selected_features=features,
-            cleaned_path=cleaned_path,
-            test_split=hp.get("test_split", 0.2),
-            max_iter=hp.get("max_iter", 1000),
-        )
-        session.stage_outputs["model"] = result
-        session.stage_status["model"] = "awaiting_review"
-        session.current_stage = "model"
-        return result
-    except Exception as e:
-        session.stage_status["model"] = "pending"
-        raise HTTPException(500, f"Logistic regression failed: {str(e)}")
+    solver = hp.get("solver", "auto")
+    if solver not in LOGISTIC_SOLVERS:
+        raise HTTPException(400, f"solver must be one of: {', '.join(LOGISTIC_SOLVERS)}")
+    return _enqueue_stage(session, "model", run_logistic_regression, {
+        "target": target,
+        "selected_features": features,
+        "cleaned_path": cleaned_path,
+        "test_split": hp.get("test_split", 0.2),
+        "max_iter": hp.get("max_iter", 1000),
+        "solver": solver,
+    }, "Logistic regression failed")
 
 
 # ---------------------------------------------------------------------------
@@ -299,30 +644,58 @@ def run_logistic_stage(payload: ModelConfirm):
 # ---------------------------------------------------------------------------
 
 @app.get("/download/report")
-def download_report():
+def download_report(session: SessionState = Depends(get_session)):
     report_data = {
         "session": session.to_dict(),
         "stage_outputs": {k: v for k, v in session.stage_outputs.items()},
     }
     for fname in ["model_metrics", "eval_report", "selected_features"]:
-        path = DATA / f"{fname}.json"
+        path = session.artifact_dir / f"{fname}.json"
         if path.exists():
             with open(path) as f:
                 report_data[fname] = json.load(f)
 
     html = generate_html_report(report_data)
-    report_path = DATA / "pipeline_report.html"
+    session.artifact_dir.mkdir(parents=True, exist_ok=True)
+    report_path = session.artifact_dir / "pipeline_report.html"
     with open(report_path, "w") as f:
         f.write(html)
     return FileResponse(report_path, media_type="text/html", filename="ml_pipeline_report.html")
 
 
+# ---------------------------------------------------------------------------
+# Jobs — background execution of the /run/* stages
+# ---------------------------------------------------------------------------
+
+@app.get("/jobs")
+def list_jobs(session: SessionState = Depends(get_session)):
+    return [j.to_dict(include_result=False) for j in jobs.list(owner=session.session_id)]
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str, session: SessionState = Depends(get_session)):
+    job = jobs.get(job_id, owner=session.session_id)
+    if job is None:
+        raise HTTPException(404, f"Unknown job: {job_id}")
+    return job.to_dict()
+
+
+@app.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: str, session: SessionState = Depends(get_session)):
+    if jobs.get(job_id, owner=session.session_id) is None:
+        raise HTTPException(404, f"Unknown job: {job_id}")
+    job = jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(404, f"Unknown job: {job_id}")
+    return job.to_dict(include_result=False)
+
+
 # ---------------------------------------------------------------------------
 # Utility
 # ---------------------------------------------------------------------------
 
 @app.get("/output/{stage}")
-def get_output(stage: str):
+def get_output(stage: str, session: SessionState = Depends(get_session)):
     if stage not in STAGES:
         raise HTTPException(400, f"Unknown stage: {stage}")
     if stage not in session.stage_outputs:
@@ -331,6 +704,8 @@ def get_output(stage: str):
 
 
 @app.post("/reset")
-def reset_session():
+def reset_session(session: SessionState = Depends(get_session)):
+    _cancel_jobs(session)
+    drop_predictor(session.artifact_dir)
     session.reset()
     return {"status": "reset"}
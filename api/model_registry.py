@@ -0,0 +1,146 @@
+import datetime
+import json
+import os
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+import joblib
+
+MODELS_DIR = "models"
+LATEST_FILE = "LATEST"
+MODEL_CACHE_BYTES = int(os.environ.get("MODEL_CACHE_MB", "1024")) * (1 << 20)
+
+_VERSION_RE = re.compile(r"^v(\d+)$")
+
+
+# ---------------------------------------------------------------------------
+# Versioned storage — <artifact_dir>/models/<version>/{model.pkl, info.json}
+# ---------------------------------------------------------------------------
+
+def _root(artifact_dir) -> Path:
+    return Path(artifact_dir) / MODELS_DIR
+
+
+def save_model(artifact_dir, model, info: dict[str, Any]) -> str:
+    """Persist ``model`` with its ``info`` under a new version id and mark it latest.
+
+    ``info`` should carry the model type, features, hyperparameters, metrics
+    and dataset hash. Versions are immutable once written.
+    """
+    root = _root(artifact_dir)
+    root.mkdir(parents=True, exist_ok=True)
+    while True:
+        numbers = [int(m.group(1)) for d in root.iterdir() if (m := _VERSION_RE.match(d.name))]
+        version = f"v{max(numbers, default=0) + 1:04d}"
+        tmp = root / f".{version}.tmp-{uuid.uuid4().hex[:8]}"
+        tmp.mkdir()
+        joblib.dump(model, tmp / "model.pkl")
+        full_info = {
+            **info,
+            "version": version,
+            "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        }
+        with open(tmp / "info.json", "w") as f:
+            json.dump(full_info, f, indent=2)
+        try:
+            tmp.rename(root / version)
+            break
+        except OSError:
+            # Another run claimed this version number first; retry with the next one
+            for p in tmp.iterdir():
+                p.unlink()
+            tmp.rmdir()
+    (root / LATEST_FILE).write_text(version)
+    return version
+
+
+def set_latest(artifact_dir, version: str) -> None:
+    resolve_version(artifact_dir, version)
+    (_root(artifact_dir) / LATEST_FILE).write_text(version)
+
+
+def latest_version(artifact_dir) -> Optional[str]:
+    path = _root(artifact_dir) / LATEST_FILE
+    return path.read_text().strip() if path.exists() else None
+
+
+def resolve_version(artifact_dir, version: Optional[str] = None) -> str:
+    """The given version, or the latest one, checked to exist."""
+    version = version or latest_version(artifact_dir)
+    if not version or not _VERSION_RE.match(version) or not (_root(artifact_dir) / version / "model.pkl").exists():
+        raise KeyError(f"Model version '{version}' not found" if version else "No trained model")
+    return version
+
+
+def model_info(artifact_dir, version: Optional[str] = None) -> dict[str, Any]:
+    version = resolve_version(artifact_dir, version)
+    with open(_root(artifact_dir) / version / "info.json") as f:
+        return json.load(f)
+
+
+def list_models(artifact_dir) -> list[dict[str, Any]]:
+    root = _root(artifact_dir)
+    if not root.exists():
+        return []
+    versions = sorted(d.name for d in root.iterdir() if _VERSION_RE.match(d.name))
+    return [model_info(artifact_dir, v) for v in versions]
+
+
+# ---------------------------------------------------------------------------
+# In-memory LRU of deserialized models
+# ---------------------------------------------------------------------------
+
+class ModelCache:
+    """Size-bounded LRU of loaded models, keyed by their pickle path.
+
+    Sizes are approximated by the pickle's size on disk. The most recently
+    used model is always kept, even if it alone exceeds the budget.
+    """
+
+    def __init__(self, max_bytes: int = MODEL_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._models: "OrderedDict[str, tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, path: Path):
+        key = str(path)
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                return self._models[key][0]
+        model = joblib.load(path)
+        size = path.stat().st_size
+        with self._lock:
+            if key not in self._models:
+                self._models[key] = (model, size)
+                self._bytes += size
+            self._models.move_to_end(key)
+            while self._bytes > self.max_bytes and len(self._models) > 1:
+                _, (_, evicted) = self._models.popitem(last=False)
+                self._bytes -= evicted
+            return self._models[key][0]
+
+    def forget(self, prefix: Path) -> None:
+        """Drop every cached model stored under ``prefix`` (e.g. an evicted session)."""
+        prefix = str(prefix)
+        with self._lock:
+            for key in [k for k in self._models if k.startswith(prefix)]:
+                self._bytes -= self._models.pop(key)[1]
+
+
+_cache = ModelCache()
+
+
+def load_model(artifact_dir, version: Optional[str] = None):
+    """Deserialized model for ``version`` (default: latest), served from the LRU when possible."""
+    version = resolve_version(artifact_dir, version)
+    return _cache.get(_root(artifact_dir) / version / "model.pkl")
+
+
+def forget_models(artifact_dir) -> None:
+    _cache.forget(_root(artifact_dir))
@@ -1,94 +1,296 @@
+import copy
 import json 
 import os
 import datetime
+import tempfile
 import warnings
 import numpy as np
 import pandas as pd
-import joblib
 from pathlib import Path
 from typing import Any
+from scipy import special as scipy_special
 from scipy import stats as scipy_stats
 from sklearn.utils.class_weight import compute_class_weight
-from sklearn.linear_model import LinearRegression
 from sklearn.linear_model import LogisticRegression as SklearnLR
-from sklearn.feature_selection import mutual_info_classif
-from sklearn.preprocessing import LabelEncoder
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.inspection import permutation_importance
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import HalvingGridSearchCV, HalvingRandomSearchCV, PredefinedSplit
 from sklearn.metrics import (
     confusion_matrix,
     classification_report,
     roc_auc_score,
     recall_score,
-    f1_score,
+)
+
+from api.dataset_store import (
+    dataset_key,
+    source_hash,
+    store_hash,
+    column_array,
+    is_store,
+    iter_chunks,
+    iter_matrix,
+    load_columns,
+    load_matrix,
+    read_meta,
+    write_store,
+)
+from api.encoding import apply_encodings, fit_encodings, null_code
+from api.jobs import report_progress
+from api.model_registry import list_models, load_model, model_info, resolve_version, save_model, set_latest
+from api.result_cache import cached
+from api.scored_index import ScoredIndexWriter
+from api.profiler import DatasetProfile, QuantileSketch, profile_csv
+from api.stats_engine import (
+    chi2_pvalues,
+    correlation_scan,
+    mutual_info_scores,
+    rank_tests,
+    stratified_sample,
+    THRESHOLD_METRICS,
+    best_threshold_index,
+    threshold_objective,
+    curve_auc,
+    downsample_curve,
+    threshold_curve,
+    vif_from_corr,
+    weighted_gram,
 )
 
 ROOT = Path(__file__).resolve().parent.parent
 DATA = ROOT / "data"
 
 
+def _artifacts(artifact_dir: str | None) -> Path:
+    """Directory for a session's artifacts (model, metrics, scored output); DATA if not given."""
+    path = Path(artifact_dir) if artifact_dir else DATA
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Result caching — replay artifact side effects on cache hits
+# ---------------------------------------------------------------------------
+
+def _source_of(args: dict[str, Any]) -> str | None:
+    # The content hash identifies the file, so callers cache with exclude=("csv_path",):
+    # the same upload under another session's path reuses the results
+    path = args.get("csv_path")
+    return source_hash(path) if path and os.path.exists(path) else None
+
+
+def _store_of(args: dict[str, Any]) -> str | None:
+    return store_hash(args.get("cleaned_path"))
+
+
+def _replay_stats(result: dict[str, Any], args: dict[str, Any]) -> bool:
+    with open(_artifacts(args["artifact_dir"]) / "selected_features.json", "w") as f:
+        json.dump({k: result[k] for k in ("selected_features", "feature_metrics")}, f, indent=2)
+    return True
+
+
+def _replay_model(result: dict[str, Any], args: dict[str, Any]) -> bool:
+    """Point the registry back at the cached run's model version, if it still exists."""
+    out_dir = _artifacts(args["artifact_dir"])
+    try:
+        set_latest(out_dir, resolve_version(out_dir, result.get("model_version")))
+    except KeyError:
+        return False
+    with open(out_dir / "model_metrics.json", "w") as f:
+        json.dump(result["model_metrics"], f, indent=2)
+    return True
+
+
 # ---------------------------------------------------------------------------
 # ETL helpers (user-driven, no agent)
 # ---------------------------------------------------------------------------
 
+_PROFILE_CACHE: dict[tuple, DatasetProfile] = {}
+_PROFILE_CACHE_SIZE = 4
+
+
+def _profile_key(csv_path: str) -> tuple:
+    st = os.stat(csv_path)
+    return (str(Path(csv_path).resolve()), st.st_size, st.st_mtime_ns)
+
+
+def remember_profile(csv_path: str, profile: DatasetProfile) -> None:
+    """Seed ``get_profile`` with a profile computed while the file was uploaded."""
+    if len(_PROFILE_CACHE) >= _PROFILE_CACHE_SIZE:
+        _PROFILE_CACHE.pop(next(iter(_PROFILE_CACHE)))
+    _PROFILE_CACHE[_profile_key(csv_path)] = profile
+
+
+def get_profile(csv_path: str) -> DatasetProfile:
+    """Whole-file profile of a CSV, computed in one streaming pass and reused until the file changes."""
+    key = _profile_key(csv_path)
+    if key not in _PROFILE_CACHE:
+        remember_profile(csv_path, profile_csv(csv_path))
+    return _PROFILE_CACHE[key]
+
+
+@cached(dataset=_source_of, exclude=("csv_path",))
 def get_column_details(csv_path: str) -> list[dict[str, Any]]:
     """Return detailed stats for every column in the dataset."""
-    df = pd.read_csv(csv_path, nrows=2000)
-    full_len = len(pd.read_csv(csv_path, usecols=[0]))
+    profile = get_profile(csv_path)
 
     columns = []
-    for col in df.columns:
-        s = df[col]
+    for col, cp in profile.columns.items():
         info: dict[str, Any] = {
             "name": col,
-            "dtype": str(s.dtype),
-            "null_count": int(s.isnull().sum()),
-            "null_pct": round(float(s.isnull().mean()) * 100, 2),
-            "n_unique": int(s.nunique()),
-            "total_rows": full_len,
-            "sample_values": [str(v) for v in s.dropna().head(5).tolist()],
+            "dtype": cp.dtype,
+            "null_count": cp.null_count,
+            "null_pct": round(100 * cp.null_count / profile.rows, 2) if profile.rows else 0.0,
+            "n_unique": cp.n_unique,
+            "n_unique_exact": cp.distinct.is_exact,
+            "total_rows": profile.rows,
+            "sample_values": profile.sample_values(col, 5),
+            "memory": cp.memory_report(),
         }
-        if pd.api.types.is_numeric_dtype(s):
+        if cp.is_numeric:
+            st = cp.numeric_stats()
             info["stats"] = {
-                "mean": round(float(s.mean()), 4) if not s.isnull().all() else None,
-                "median": round(float(s.median()), 4) if not s.isnull().all() else None,
-                "std": round(float(s.std()), 4) if not s.isnull().all() else None,
-                "min": float(s.min()) if not s.isnull().all() else None,
-                "max": float(s.max()) if not s.isnull().all() else None,
+                "mean": round(st["mean"], 4) if st["mean"] is not None else None,
+                "median": round(st["median"], 4) if st["median"] is not None else None,
+                "std": round(st["std"], 4) if st["std"] is not None else None,
+                "min": st["min"],
+                "max": st["max"],
             }
         else:
-            vc = s.value_counts().head(5)
-            info["top_values"] = {str(k): int(v) for k, v in vc.items()}
+            top = sorted(cp.top_counts.items(), key=lambda kv: kv[1], reverse=True)[:5]
+            info["top_values"] = {k: v for k, v in top}
         columns.append(info)
     return columns
 
 
-def run_target_stats(csv_path: str, target: str) -> dict[str, Any]:
-    """Run statistical tests for every column against the target variable."""
-    df = pd.read_csv(csv_path, nrows=50000)
-    if target not in df.columns:
-        raise ValueError(f"Target column '{target}' not found in dataset")
+TARGET_STATS_CHUNK_ROWS = 200_000
+# Numeric columns with more distinct values than this get a rank test, the rest chi-squared
+RANK_TEST_MIN_LEVELS = 10
+
+
+def _target_sample_rows(csv_path: str, target: str, sample_size: int, chunk_rows: int) -> np.ndarray:
+    """Sorted file row numbers of a class-stratified sample (rows with a null target excluded)."""
+    labels = pd.concat(
+        [c[target] for c in pd.read_csv(csv_path, usecols=[target], chunksize=chunk_rows)],
+        ignore_index=True,
+    )
+    present = np.flatnonzero(labels.notna().to_numpy())
+    y_codes, _ = pd.factorize(labels.iloc[present])
+    return present[stratified_sample(y_codes.astype(np.int64), sample_size)]
+
+
+def _merge_pair_counts(counts: pd.Series | None, values: pd.Series, y: pd.Series) -> pd.Series | None:
+    """Add one chunk's (value, class) counts to ``counts``; None once past ``MAX_CROSSTAB_LEVELS`` values.
+
+    Values are counted as strings. Numeric ones are counted as float64 and
+    labelled without a trailing ".0" when integral, so a chunk pandas read
+    as int64 and one it read as float64 (because of a blank) share levels.
+    """
+    s = values.dropna()
+    numeric = pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s)
+    keys = s.to_numpy(dtype=np.float64) + 0.0 if numeric else s.astype(str)  # + 0.0 folds -0.0 into 0.0
+    pairs = pd.DataFrame({"value": keys, "cls": y[s.index].to_numpy()}).value_counts()
+    if numeric:
+        labels = [str(int(v)) if v.is_integer() else repr(v) for v in pairs.index.levels[0].tolist()]
+        pairs.index = pairs.index.set_levels(labels, level=0)
+    merged = pairs if counts is None else counts.add(pairs, fill_value=0)
+    return merged if merged.index.get_level_values(0).nunique() <= MAX_CROSSTAB_LEVELS else None
+
+
+@cached(dataset=_source_of, exclude=("csv_path",))
+def run_target_stats(
+    csv_path: str,
+    target: str,
+    sample_size: int | None = None,
+    chunk_rows: int = TARGET_STATS_CHUNK_ROWS,
+) -> dict[str, Any]:
+    """Run statistical tests for every column against the target variable.
+
+    Uses every row by default, read in chunks: numeric columns are spilled
+    to flat files as they stream past and then ranked in batches (see
+    ``stats_engine.rank_tests``), while low-cardinality columns accumulate
+    (value, class) counts for chi-squared. ``sample_size`` restricts the
+    tests to a class-stratified sample of that many rows instead.
+    """
+    rows = _target_sample_rows(csv_path, target, sample_size, chunk_rows) if sample_size else None
+    columns: list[str] = []
+    numeric: dict[str, bool] = {}
+    levels: dict[str, np.ndarray] = {}
+    counts: dict[str, pd.Series | None] = {}
+    mixed: set[str] = set()
+    class_ids: dict[Any, int] = {}
+    y_parts: list[np.ndarray] = []
+
+    DATA.mkdir(exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=DATA, prefix=".target-stats-") as spill:
+        spill_files: dict[str, Any] = {}
+        try:
+            for chunk in pd.read_csv(csv_path, chunksize=chunk_rows):
+                if target not in chunk.columns:
+                    raise ValueError(f"Target column '{target}' not found in dataset")
+                if not columns:
+                    columns = [c for c in chunk.columns if c != target]
+                if rows is not None:
+                    start = chunk.index[0] if len(chunk) else 0
+                    picked = rows[np.searchsorted(rows, start):np.searchsorted(rows, start + len(chunk))]
+                    chunk = chunk.iloc[picked - start]
+                chunk = chunk[chunk[target].notna()]
+                y = chunk[target]
+                for label in pd.unique(y):
+                    class_ids.setdefault(label, len(class_ids))
+                codes = y.map(class_ids).to_numpy(dtype=np.int64)
+                y_parts.append(codes)
+
+                for col in columns:
+                    was_numeric = numeric.get(col, True)
+                    numeric[col] = was_numeric and pd.api.types.is_numeric_dtype(chunk[col])
+                    if was_numeric and not numeric[col] and col in spill_files:
+                        spill_files.pop(col).close()
+                        # Too many levels to have been counted as categories
+                        if len(levels[col]) > RANK_TEST_MIN_LEVELS:
+                            mixed.add(col)
+                    if numeric[col]:
+                        values = chunk[col].to_numpy(dtype=np.float64, na_value=np.nan)
+                        if col not in spill_files:
+                            spill_files[col] = open(Path(spill) / f"{columns.index(col)}.f8", "wb")
+                        spill_files[col].write(values.tobytes())
+                        if len(levels.get(col, ())) <= RANK_TEST_MIN_LEVELS:
+                            seen = np.concatenate([levels.get(col, np.empty(0)), pd.unique(values[~np.isnan(values)])])
+                            levels[col] = np.unique(seen)[:RANK_TEST_MIN_LEVELS + 1]
+                    continuous = numeric[col] and len(levels[col]) > RANK_TEST_MIN_LEVELS
+                    if continuous or (col in counts and counts[col] is None):
+                        counts[col] = None
+                        continue
+                    counts[col] = _merge_pair_counts(counts.get(col), chunk[col], y)
+        finally:
+            paths = {col: f.name for col, f in spill_files.items()}
+            for f in spill_files.values():
+                f.close()
+
+        y_codes = np.concatenate(y_parts) if y_parts else np.empty(0, dtype=np.int64)
+        ranked = [c for c in columns if numeric[c] and len(levels[c]) > RANK_TEST_MIN_LEVELS]
+        arrays = [np.memmap(paths[c], dtype=np.float64, mode="r") if len(y_codes) else np.empty(0) for c in ranked]
+        rank_results = dict(zip(ranked, rank_tests(arrays, y_codes, len(class_ids))))
+        del arrays
 
-    y = df[target]
     results = []
-    for col in df.columns:
-        if col == target:
-            continue
-        s = df[col].dropna()
-        y_clean = y[s.index]
+    for col in columns:
         entry: dict[str, Any] = {"column": col}
         try:
-            if pd.api.types.is_numeric_dtype(s) and s.nunique() > 10:
-                groups = [s[y_clean == v] for v in y.unique()]
-                if len(groups) == 2:
-                    stat, p = scipy_stats.mannwhitneyu(groups[0], groups[1], alternative="two-sided")
-                    entry["test"] = "Mann-Whitney U"
-                else:
-                    stat, p = scipy_stats.kruskal(*groups)
-                    entry["test"] = "Kruskal-Wallis"
-                entry["statistic"] = round(float(stat), 4)
-                entry["p_value"] = float(p)
+            if col in rank_results:
+                outcome = rank_results[col]
+                if "error" in outcome:
+                    raise ValueError(outcome["error"])
+                entry["test"] = outcome["test"]
+                entry["statistic"] = round(outcome["statistic"], 4)
+                entry["p_value"] = outcome["p_value"]
             else:
-                ct = pd.crosstab(s, y_clean)
+                if col in mixed:
+                    raise ValueError("Mixed numeric and non-numeric values")
+                if counts.get(col) is None:
+                    raise ValueError(f"More than {MAX_CROSSTAB_LEVELS} categories")
+                ct = counts[col].unstack(fill_value=0).astype(np.int64)
                 stat, p, dof, _ = scipy_stats.chi2_contingency(ct)
                 entry["test"] = "Chi-squared"
                 entry["statistic"] = round(float(stat), 4)
@@ -100,62 +302,92 @@ def run_target_stats(csv_path: str, target: str) -> dict[str, Any]:
             entry["significant"] = False
             entry["error"] = str(e)
         results.append(entry)
-    return {"target": target, "tests": results}
+    return {"target": target, "n_rows": int(len(y_codes)), "sampled": rows is not None, "tests": results}
 
 
-def apply_etl_decisions(csv_path: str, decisions) -> dict[str, Any]:
-    """Drop user-marked columns, encode strings, save cleaned CSV + class weights."""
-    df = pd.read_csv(csv_path)
+def training_encodings(info: dict[str, Any]) -> dict[str, list[str]]:
+    """Vocabularies of the cleaned store a model was trained on (``info["dataset_hash"]``).
+
+    A model keeps the codes of its own training data, whatever the session
+    has confirmed since, so rows for it must be encoded with these.
+    """
+    key = info.get("dataset_hash")
+    store = DATA / "store" / str(key)
+    if not key or not is_store(str(store)):
+        raise KeyError(f"Training data for model {info.get('version')} is no longer available — retrain it")
+    return read_meta(str(store)).get("encodings", {})
 
-    columns_to_drop = [c.column for c in decisions.columns if c.decision == "drop"]
-    columns_to_keep = [c for c in df.columns if c not in columns_to_drop]
-    if decisions.target not in columns_to_keep:
-        columns_to_keep.append(decisions.target)
 
-    cleaned = df[columns_to_keep].copy()
+def apply_etl_decisions(csv_path: str, decisions, artifact_dir: str | None = None) -> dict[str, Any]:
+    """Drop user-marked columns, encode strings, persist cleaned columns + class weights.
 
-    # Encode string/object columns with LabelEncoder
-    for col in cleaned.columns:
-        if cleaned[col].dtype == "object" or str(cleaned[col].dtype) == "string":
-            cleaned[col] = LabelEncoder().fit_transform(cleaned[col].astype(str))
+    The cleaned data is keyed by the source file's content hash and the ETL
+    decisions, so confirming the same file with the same decisions again
+    reuses the existing store instead of re-parsing the CSV.
+    """
+    columns_to_drop = [c.column for c in decisions.columns if c.decision == "drop"]
+    key = dataset_key(source_hash(csv_path), decisions.target, columns_to_drop)
+    store = DATA / "store" / key
+
+    if not is_store(str(store)):
+        df = pd.read_csv(csv_path)
+        columns_to_keep = [c for c in df.columns if c not in columns_to_drop]
+        if decisions.target not in columns_to_keep:
+            columns_to_keep.append(decisions.target)
+
+        cleaned = df[columns_to_keep].copy()
+
+        # Encode string/object columns once; later stages and /predict reuse the vocabularies
+        cleaned, encodings = fit_encodings(cleaned)
+
+        # Compute class weights
+        target_vals = cleaned[decisions.target]
+        classes = np.unique(target_vals)
+        weights = compute_class_weight("balanced", classes=classes, y=target_vals)
+        class_weights = {int(c): round(float(w), 6) for c, w in zip(classes, weights)}
+
+        (DATA / "store").mkdir(parents=True, exist_ok=True)
+        write_store(cleaned, store, {
+            "dataset_hash": key,
+            "source": Path(csv_path).name,
+            "target": decisions.target,
+            "class_weights": class_weights,
+            "encodings": encodings,
+        })
 
-    # Compute class weights
-    target_vals = cleaned[decisions.target]
-    classes = np.unique(target_vals)
-    weights = compute_class_weight("balanced", classes=classes, y=target_vals)
-    class_weights = {int(c): round(float(w), 6) for c, w in zip(classes, weights)}
+    meta = read_meta(str(store))
+    class_weights = {int(k): v for k, v in meta["class_weights"].items()}
 
-    DATA.mkdir(exist_ok=True)
-    cleaned_name = f"cleaned_{Path(csv_path).name}"
-    cleaned.to_csv(DATA / cleaned_name, index=False)
-    with open(DATA / "class_weights.json", "w") as f:
+    with open(_artifacts(artifact_dir) / "class_weights.json", "w") as f:
         json.dump(class_weights, f)
+    with open(_artifacts(artifact_dir) / "encodings.json", "w") as f:
+        json.dump(meta.get("encodings", {}), f)
 
     return {
-        "columns_kept": list(columns_to_keep),
+        "columns_kept": meta["columns"],
         "columns_dropped": columns_to_drop,
-        "cleaned_shape": [len(cleaned), len(cleaned.columns)],
+        "cleaned_shape": [meta["n_rows"], len(meta["columns"])],
         "class_weights": class_weights,
-        "cleaned_path": str(DATA / cleaned_name),
+        "cleaned_path": str(store),
+        "dataset_hash": key,
     }
 
 
 def get_dataset_summary(csv_path: str) -> dict[str, Any]:
-    df = pd.read_csv(csv_path, nrows=5000)
-    full_len = len(pd.read_csv(csv_path, usecols=[0]))
+    profile = get_profile(csv_path)
     column_info = []
-    for col in df.columns:
+    for col, cp in profile.columns.items():
         column_info.append({
             "name": col,
-            "dtype": str(df[col].dtype),
-            "null_pct": round(float(df[col].isnull().mean()) * 100, 2),
-            "n_unique": int(df[col].nunique()),
-            "sample_values": [str(v) for v in df[col].dropna().head(3).tolist()],
+            "dtype": cp.dtype,
+            "null_pct": round(100 * cp.null_count / profile.rows, 2) if profile.rows else 0.0,
+            "n_unique": cp.n_unique,
+            "sample_values": profile.sample_values(col, 3),
         })
     return {
         "filename": os.path.basename(csv_path),
-        "rows": full_len,
-        "columns": len(df.columns),
+        "rows": profile.rows,
+        "columns": len(profile.columns),
         "column_info": column_info,
     }
 
@@ -164,52 +396,39 @@ def get_dataset_summary(csv_path: str) -> dict[str, Any]:
 # Stats stage — correlation, VIF, mutual information, feature selection
 # ---------------------------------------------------------------------------
 
-def run_stats(target: str, cleaned_path: str) -> dict[str, Any]:
+@cached(dataset=_store_of, on_hit=_replay_stats)
+def run_stats(
+    target: str,
+    cleaned_path: str,
+    mi_mode: str = "auto",
+    mi_sample_size: int = 200_000,
+    artifact_dir: str | None = None,
+) -> dict[str, Any]:
     """Run full statistical feature analysis on cleaned data."""
-    df = pd.read_csv(cleaned_path)
-
-    # Encode any remaining string columns so numeric ops work
-    for col in df.columns:
-        if not pd.api.types.is_numeric_dtype(df[col]):
-            df[col] = LabelEncoder().fit_transform(df[col].astype(str))
+    df = load_columns(cleaned_path, exact=True)
 
     y = df[target]
     X = df.drop(columns=[target])
+    report_progress(0.05, "Computing correlations")
 
-    # Correlation — flag pairs > 0.85
-    corr_matrix = X.corr().abs()
-    upper = corr_matrix.where(np.triu(np.ones(corr_matrix.shape), k=1).astype(bool))
-    high_corr_pairs = []
-    high_corr_drop = set()
-    for col in upper.columns:
-        for row in upper.index:
-            if upper.loc[row, col] > 0.85:
-                high_corr_pairs.append({"a": row, "b": col, "corr": round(float(upper.loc[row, col]), 4)})
-                high_corr_drop.add(col)
-
-    # Chi-squared p-values for all features
-    p_values = {}
-    for col in X.columns:
-        try:
-            ct = pd.crosstab(X[col], y)
-            _, p, _, _ = scipy_stats.chi2_contingency(ct)
-            p_values[col] = float(p)
-        except Exception:
-            p_values[col] = 1.0
+    # Correlation — flag pairs > 0.85 and assemble the VIF input in one pass over column blocks
+    col_arrays = [X[c].to_numpy() for c in X.columns]
+    high_corr_pairs, corr = correlation_scan(col_arrays, list(X.columns), threshold=0.85)
+    high_corr_drop = {pair["b"] for pair in high_corr_pairs}
 
-    # VIF via sklearn LinearRegression
-    vif_data = {}
-    for col in X.columns:
-        try:
-            X_others = X.drop(columns=[col])
-            r2 = LinearRegression().fit(X_others, X[col]).score(X_others, X[col])
-            vif_data[col] = round(1.0 / (1.0 - r2), 4) if r2 < 1.0 else float("inf")
-        except Exception:
-            vif_data[col] = float("inf")
+    # VIF for all features at once from the inverse correlation matrix
+    vif_values = vif_from_corr(corr)
+    vif_data = {col: round(float(v), 4) if np.isfinite(v) else float("inf") for col, v in zip(X.columns, vif_values)}
+
+    # Chi-squared p-values for all features (continuous columns quantile-binned)
+    report_progress(0.2, "Chi-squared tests")
+    chi2_results = chi2_pvalues(col_arrays, list(X.columns), y.to_numpy())
+    p_values = {col: r["p_value"] for col, r in chi2_results.items()}
 
     # Mutual information
-    mi_scores = mutual_info_classif(X, y, random_state=42)
-    mi_dict = {col: round(float(s), 6) for col, s in zip(X.columns, mi_scores)}
+    report_progress(0.6, "Mutual information")
+    mi_results = mutual_info_scores(col_arrays, list(X.columns), y.to_numpy(), mode=mi_mode, sample_size=mi_sample_size)
+    mi_dict = {col: r["mutual_info"] for col, r in mi_results.items()}
 
     # Build per-feature metrics and auto-select
     feature_metrics = {}
@@ -218,8 +437,9 @@ def run_stats(target: str, cleaned_path: str) -> dict[str, Any]:
     for col in X.columns:
         feature_metrics[col] = {
             "p_value": p_values[col],
+            "chi2_binned": chi2_results[col]["binned"],
             "vif": vif_data[col],
-            "mutual_info": mi_dict[col],
+            **mi_results[col],
         }
         if col in high_corr_drop:
             excluded[col] = "high correlation (>0.85)"
@@ -238,7 +458,7 @@ def run_stats(target: str, cleaned_path: str) -> dict[str, Any]:
         "selected_features": selected,
         "feature_metrics": feature_metrics,
     }
-    with open(DATA / "selected_features.json", "w") as f:
+    with open(_artifacts(artifact_dir) / "selected_features.json", "w") as f:
         json.dump(output, f, indent=2)
 
     return {
@@ -254,44 +474,166 @@ def run_stats(target: str, cleaned_path: str) -> dict[str, Any]:
 # Model stage — train with user-configurable hyperparameters
 # ---------------------------------------------------------------------------
 
+# Models are registered per session, so the artifact dir is part of the key
+@cached(dataset=_store_of, exclude=(), on_hit=_replay_model)
 def run_model(
     target: str,
     selected_features: list[str],
     cleaned_path: str,
-    n_estimators: int = 100,
+    n_estimators: int | str = 100,
     max_depth: int = 10,
     class_weight_mode: str = "balanced",
     test_split: float = 0.2,
+    artifact_dir: str | None = None,
 ) -> dict[str, Any]:
-    """Train a Random Forest on cleaned data with the given config."""
-    df = pd.read_csv(cleaned_path)
-    for col in df.columns:
-        if not pd.api.types.is_numeric_dtype(df[col]):
-            df[col] = LabelEncoder().fit_transform(df[col].astype(str))
+    """Train a Random Forest on cleaned data with the given config.
+
+    If the session already has a forest trained on the same data, features
+    and settings with fewer trees, it is grown to ``n_estimators`` instead
+    of retrained (the result is identical: tree seeds do not depend on how
+    the forest was grown). ``n_estimators="auto"`` adds batches of trees
+    until the out-of-bag ROC-AUC stops improving.
+    """
+    out_dir = _artifacts(artifact_dir)
+    # Trees work in float32 internally, so a compact float32 matrix loses nothing
+    X = load_matrix(cleaned_path, selected_features, dtype=np.float32)
+    y = np.asarray(column_array(cleaned_path, target))
 
-    with open(DATA / "class_weights.json") as f:
-        raw_weights = json.load(f)
-    class_weights = {int(k): v for k, v in raw_weights.items()}
+    # Chronological split (no shuffle)
+    split_idx = int(len(X) * (1 - test_split))
+    X_train, X_val = X[:split_idx], X[split_idx:]
+    y_train, y_val = y[:split_idx], y[split_idx:]
 
-    y = df[target]
-    X = df[selected_features]
+    auto = n_estimators == "auto"
+    settings = {"max_depth": max_depth, "class_weight": class_weight_mode, "test_split": test_split}
+    reused_from, model = _reusable_forest(
+        out_dir, target, selected_features, cleaned_path, settings,
+        max_trees=AUTO_MAX_TREES if auto else n_estimators,
+    )
+    trees_reused = len(model.estimators_) if model is not None else 0
+    if model is None:
+        model = RandomForestClassifier(
+            n_estimators=n_estimators if not auto else AUTO_TREE_BATCH,
+            max_depth=max_depth,
+            class_weight=_class_weight(out_dir, class_weight_mode),
+            random_state=42,
+        )
+    model.set_params(warm_start=True, n_jobs=-1)
+
+    oob_history = []
+    if auto:
+        model.set_params(oob_score=True)
+        n_trees = max(trees_reused, AUTO_TREE_BATCH)
+        while True:
+            report_progress(0.1 + 0.7 * n_trees / AUTO_MAX_TREES, f"Growing forest to {n_trees} trees")
+            model.set_params(n_estimators=n_trees)
+            with warnings.catch_warnings():
+                # A reused forest already at n_trees only needs its OOB score
+                warnings.simplefilter("ignore", UserWarning)
+                model.fit(X_train, y_train)
+            oob_history.append({"n_estimators": n_trees, "oob_roc_auc": round(_oob_auc(model, y_train), 6)})
+            gain = oob_history[-1]["oob_roc_auc"] - oob_history[-2]["oob_roc_auc"] if len(oob_history) > 1 else np.inf
+            if gain < AUTO_MIN_GAIN or n_trees >= AUTO_MAX_TREES:
+                break
+            n_trees = min(n_trees + AUTO_TREE_BATCH, AUTO_MAX_TREES)
+        # OOB predictions are only needed while growing; keep them out of the pickle
+        model.set_params(oob_score=False)
+        for attr in ("oob_score_", "oob_decision_function_"):
+            if hasattr(model, attr):
+                delattr(model, attr)
+    else:
+        report_progress(0.1, "Fitting Random Forest" if not trees_reused else f"Adding {n_estimators - trees_reused} trees")
+        model.set_params(n_estimators=n_estimators)
+        model.fit(X_train, y_train)
+    model.set_params(warm_start=False)
+    report_progress(0.8, "Scoring validation split")
+
+    return _register_model(model, "RandomForest", model.feature_importances_, X_train, X_val, y_val, target, selected_features, cleaned_path, out_dir, {
+        "n_estimators": len(model.estimators_),
+        **settings,
+    }, {
+        "forest": {
+            "n_estimators": len(model.estimators_),
+            "auto": auto,
+            "reused_from": reused_from,
+            "trees_reused": trees_reused,
+            "oob_history": oob_history,
+        },
+    })
 
-    # Chronological split (no shuffle)
-    split_idx = int(len(df) * (1 - test_split))
-    X_train, X_val = X.iloc[:split_idx], X.iloc[split_idx:]
-    y_train, y_val = y.iloc[:split_idx], y.iloc[split_idx:]
 
-    cw = class_weights if class_weight_mode == "balanced" else class_weight_mode
+# ---------------------------------------------------------------------------
+# Incremental forests — warm start from a registered model, OOB-driven size
+# ---------------------------------------------------------------------------
 
-    model = RandomForestClassifier(
-        n_estimators=n_estimators,
-        max_depth=max_depth,
-        class_weight=cw,
-        random_state=42,
-        n_jobs=-1,
-    )
-    model.fit(X_train, y_train)
+AUTO_TREE_BATCH = 50
+AUTO_MAX_TREES = 1000
+# Stop adding trees once a batch improves OOB ROC-AUC by less than this
+AUTO_MIN_GAIN = 1e-3
 
+
+def _reusable_forest(
+    out_dir: Path,
+    target: str,
+    features: list[str],
+    cleaned_path: str,
+    settings: dict[str, Any],
+    max_trees: int,
+) -> tuple[str | None, RandomForestClassifier | None]:
+    """Largest registered ``run_model`` forest with the same data, features and settings and at most ``max_trees`` trees.
+
+    Returns a private copy, since the registry's loaded models are shared.
+    """
+    dataset_hash = read_meta(cleaned_path).get("dataset_hash")
+    best = None
+    for info in list_models(out_dir):
+        hp = dict(info.get("hyperparameters", {}))
+        n = hp.pop("n_estimators", None)
+        if (
+            info.get("model_type") == "RandomForest"
+            and info.get("dataset_hash") == dataset_hash
+            and info.get("target") == target
+            and info.get("features") == features
+            and hp == settings
+            and isinstance(n, int) and n <= max_trees
+            and (best is None or n > best[1])
+        ):
+            best = (info["version"], n)
+    if best is None:
+        return None, None
+    return best[0], copy.deepcopy(load_model(out_dir, best[0]))
+
+
+def _oob_auc(model: RandomForestClassifier, y_train: np.ndarray) -> float:
+    """ROC-AUC of the out-of-bag probabilities (rows never out of bag are skipped)."""
+    proba = model.oob_decision_function_[:, 1]
+    seen = ~np.isnan(proba)
+    return float(roc_auc_score(y_train[seen], proba[seen]))
+
+
+def _class_weight(out_dir: Path, mode: str):
+    """``"balanced"`` means the weights computed at ETL; other modes go to sklearn as-is."""
+    if mode != "balanced":
+        return mode
+    with open(out_dir / "class_weights.json") as f:
+        return {int(k): v for k, v in json.load(f).items()}
+
+
+def _register_model(
+    model,
+    model_type: str,
+    feature_importances: np.ndarray,
+    X_train: np.ndarray,
+    X_val: np.ndarray,
+    y_val: np.ndarray,
+    target: str,
+    selected_features: list[str],
+    cleaned_path: str,
+    out_dir: Path,
+    hyperparameters: dict[str, Any],
+    extra: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Validation metrics for a fitted tree model; registers it as a new model version."""
     y_pred = model.predict(X_val)
     y_prob = model.predict_proba(X_val)[:, 1]
 
@@ -301,14 +643,14 @@ def run_model(
     target_recall = float(recall_score(y_val, y_pred, pos_label=1))
 
     importances = sorted(
-        zip(selected_features, model.feature_importances_),
+        zip(selected_features, feature_importances),
         key=lambda x: x[1],
         reverse=True,
     )
 
     # Save model + metrics
-    joblib.dump(model, DATA / "model.pkl")
     metrics = {
+        "model_type": model_type,
         "roc_auc": roc_auc,
         "target_recall": target_recall,
         "confusion_matrix": cm.tolist(),
@@ -317,84 +659,384 @@ def run_model(
         "train_shape": list(X_train.shape),
         "val_shape": list(X_val.shape),
     }
-    with open(DATA / "model_metrics.json", "w") as f:
+    version = save_model(out_dir, model, {
+        "model_type": model_type,
+        "features": selected_features,
+        "target": target,
+        "hyperparameters": hyperparameters,
+        "dataset_hash": read_meta(cleaned_path).get("dataset_hash"),
+        "metrics": {"roc_auc": roc_auc, "target_recall": target_recall},
+    })
+    metrics["model_version"] = version
+    with open(out_dir / "model_metrics.json", "w") as f:
         json.dump(metrics, f, indent=2)
 
     return {
         "model_metrics": metrics,
         "model_saved": True,
+        "model_version": version,
+        **(extra or {}),
     }
 
 
+# ---------------------------------------------------------------------------
+# Gradient boosting — histogram-based alternative to the forest
+# ---------------------------------------------------------------------------
+
+MODEL_TYPES = ("RandomForest", "HistGradientBoosting", "LogisticRegression")
+# HistGradientBoosting bins categories directly, up to max_bins levels
+MAX_NATIVE_CATEGORIES = 255
+PERMUTATION_ROWS = 50_000
+
+
+def _categorical_mask(cleaned_path: str, features: list[str]) -> np.ndarray:
+    """ETL-encoded columns with few enough codes (nulls included) to split on as categories."""
+    encodings = read_meta(cleaned_path).get("encodings", {})
+    return np.array([
+        col in encodings and null_code(encodings[col]) < MAX_NATIVE_CATEGORIES
+        for col in features
+    ])
+
+
+@cached(dataset=_store_of, exclude=(), on_hit=_replay_model)
+def run_gradient_boosting(
+    target: str,
+    selected_features: list[str],
+    cleaned_path: str,
+    max_iter: int = 300,
+    learning_rate: float = 0.1,
+    max_leaf_nodes: int = 31,
+    max_depth: int | None = None,
+    l2_regularization: float = 0.0,
+    class_weight_mode: str = "balanced",
+    early_stopping: bool = True,
+    test_split: float = 0.2,
+    artifact_dir: str | None = None,
+) -> dict[str, Any]:
+    """Train a HistGradientBoostingClassifier with the same split and outputs as ``run_model``.
+
+    Encoded categorical columns are split on natively rather than as
+    ordered codes. Boosting stops once the class-weighted validation loss
+    on the chronological split has not improved for 10 rounds. Boosted trees have no impurity
+    importances, so importances are validation ROC-AUC permutation drops
+    (negatives clipped), normalised to sum to 1 like the forest's.
+    """
+    out_dir = _artifacts(artifact_dir)
+    X = load_matrix(cleaned_path, selected_features, dtype=np.float32)
+    y = np.asarray(column_array(cleaned_path, target))
+
+    split_idx = int(len(X) * (1 - test_split))
+    X_train, X_val = X[:split_idx], X[split_idx:]
+    y_train, y_val = y[:split_idx], y[split_idx:]
+
+    categorical = _categorical_mask(cleaned_path, selected_features)
+    cw = _class_weight(out_dir, class_weight_mode) if class_weight_mode != "none" else None
+    report_progress(0.1, "Fitting gradient boosting")
+    model = HistGradientBoostingClassifier(
+        max_iter=max_iter,
+        learning_rate=learning_rate,
+        max_leaf_nodes=max_leaf_nodes,
+        max_depth=max_depth,
+        l2_regularization=l2_regularization,
+        categorical_features=categorical if categorical.any() else None,
+        class_weight=cw,
+        early_stopping=early_stopping,
+        n_iter_no_change=10,
+        random_state=42,
+    )
+    if early_stopping:
+        # class_weight only reweights the training loss; without the same weights
+        # on the validation rows the stopping criterion measures a different objective
+        weight_val = pd.Series(y_val).map(cw).to_numpy(dtype=np.float64) if isinstance(cw, dict) else None
+        model.fit(X_train, y_train, X_val=X_val, y_val=y_val, sample_weight_val=weight_val)
+    else:
+        model.fit(X_train, y_train)
+
+    report_progress(0.7, "Permutation importances")
+    perm = permutation_importance(
+        model, X_val, y_val,
+        scoring="roc_auc",
+        n_repeats=5,
+        max_samples=min(len(X_val), PERMUTATION_ROWS),
+        random_state=42,
+    )
+    drops = np.clip(perm.importances_mean, 0, None)
+    importances = drops / drops.sum() if drops.sum() > 0 else drops
+
+    report_progress(0.9, "Scoring validation split")
+    return _register_model(model, "HistGradientBoosting", importances, X_train, X_val, y_val, target, selected_features, cleaned_path, out_dir, {
+        "max_iter": max_iter,
+        "learning_rate": learning_rate,
+        "max_leaf_nodes": max_leaf_nodes,
+        "max_depth": max_depth,
+        "l2_regularization": l2_regularization,
+        "class_weight": class_weight_mode,
+        "early_stopping": early_stopping,
+        "test_split": test_split,
+    }, {
+        "boosting": {
+            "n_iterations": int(model.n_iter_),
+            "stopped_early": bool(early_stopping and model.n_iter_ < max_iter),
+            "categorical_features": [f for f, c in zip(selected_features, categorical) if c],
+            "permutation_importances": {
+                f: {"mean": round(float(m), 6), "std": round(float(sd), 6)}
+                for f, m, sd in zip(selected_features, perm.importances_mean, perm.importances_std)
+            },
+        },
+    })
+
+
+# ---------------------------------------------------------------------------
+# Model search — successive halving over a grid or sampled distributions
+# ---------------------------------------------------------------------------
+
+SEARCH_PARAMS = ("n_estimators", "max_depth", "class_weight", "min_samples_leaf", "max_features")
+SEARCH_RESOURCES = ("n_samples", "n_estimators")
+DEFAULT_SEARCH_SPACE = {
+    "n_estimators": [100, 200],
+    "max_depth": [6, 10, 16, None],
+    "class_weight": ["balanced", "balanced_subsample"],
+    "min_samples_leaf": [1, 10],
+}
+
+
+def _search_space(space: dict[str, Any], class_weights: dict[int, float]) -> tuple[dict[str, Any], bool]:
+    """sklearn parameter grid/distributions from the request's search space.
+
+    A list is a set of candidate values; ``{"min": a, "max": b}`` is a
+    uniform range (integers if both bounds are). Returns the space and
+    whether it contains ranges, which need random rather than grid search.
+    """
+    out, sampled = {}, False
+    for name, values in space.items():
+        if isinstance(values, dict):
+            lo, hi = values["min"], values["max"]
+            if isinstance(lo, int) and isinstance(hi, int):
+                out[name] = scipy_stats.randint(lo, hi + 1)
+            else:
+                out[name] = scipy_stats.uniform(lo, hi - lo)
+            sampled = True
+        else:
+            values = values if isinstance(values, list) else [values]
+            # The precomputed ETL weights stand in for "balanced", as in run_model
+            out[name] = [class_weights if name == "class_weight" and v == "balanced" else v for v in values]
+    return out, sampled
+
+
+def _param_labels(params: dict[str, Any]) -> dict[str, Any]:
+    labels = {}
+    for k, v in params.items():
+        if isinstance(v, dict):
+            v = "balanced"
+        elif isinstance(v, np.generic):
+            v = v.item()
+        labels[k] = v
+    return labels
+
+
+@cached(dataset=_store_of, exclude=(), on_hit=_replay_model)
+def run_model_search(
+    target: str,
+    selected_features: list[str],
+    cleaned_path: str,
+    search_space: dict[str, Any] | None = None,
+    n_candidates: int | None = None,
+    resource: str = "n_samples",
+    max_trees: int = 300,
+    factor: int = 3,
+    test_split: float = 0.2,
+    artifact_dir: str | None = None,
+) -> dict[str, Any]:
+    """Successive-halving search over Random Forest hyperparameters.
+
+    Every round scores the surviving candidates on the chronological
+    validation split and keeps the best ``1/factor`` of them, giving the
+    survivors ``factor`` times the budget: more training rows
+    (``resource="n_samples"``) or more trees (``"n_estimators"``, up to
+    ``max_trees``). The winner is refit on the full training split and
+    registered like a ``run_model`` run.
+    """
+    out_dir = _artifacts(artifact_dir)
+    X = load_matrix(cleaned_path, selected_features, dtype=np.float32)
+    y = np.asarray(column_array(cleaned_path, target))
+
+    split_idx = int(len(X) * (1 - test_split))
+    X_train, X_val = X[:split_idx], X[split_idx:]
+    y_train, y_val = y[:split_idx], y[split_idx:]
+    # One fixed fold: train on the earlier rows, validate on the later ones
+    fold = np.where(np.arange(len(X)) < split_idx, -1, 0)
+
+    space = dict(DEFAULT_SEARCH_SPACE if not search_space else search_space)
+    if resource == "n_estimators":
+        space.pop("n_estimators", None)
+    class_weights = _class_weight(out_dir, "balanced")
+    space, sampled = _search_space(space, class_weights)
+
+    # Candidates run in parallel, so each forest gets a single core
+    base = RandomForestClassifier(class_weight=class_weights, random_state=42, n_jobs=1)
+    common = dict(
+        resource=resource,
+        factor=factor,
+        cv=PredefinedSplit(fold),
+        scoring="roc_auc",
+        refit=False,
+        random_state=42,
+        n_jobs=-1,
+    )
+    if resource == "n_estimators":
+        common.update(max_resources=max_trees, min_resources=max(10, max_trees // factor ** 3))
+    if sampled or n_candidates:
+        search = HalvingRandomSearchCV(base, space, n_candidates=n_candidates or 20, **common)
+    else:
+        search = HalvingGridSearchCV(base, space, **common)
+
+    report_progress(0.05, "Searching hyperparameters")
+    search.fit(X, y)
+
+    res = search.cv_results_
+    # A candidate's standing is its score in the last round it reached; with a
+    # tree budget the round's n_estimators is the resource, not part of the candidate
+    params = [
+        {k: v for k, v in _param_labels(p).items() if not (resource == "n_estimators" and k == "n_estimators")}
+        for p in res["params"]
+    ]
+    last = {repr(sorted(params[i].items())): i for i in range(len(params))}
+    leaderboard = sorted(
+        (
+            {
+                "params": params[i],
+                "rounds": int(res["iter"][i]) + 1,
+                "n_resources": int(res["n_resources"][i]),
+                "roc_auc": round(float(res["mean_test_score"][i]), 6),
+            }
+            for i in last.values()
+        ),
+        key=lambda r: (-r["rounds"], -np.nan_to_num(r["roc_auc"], nan=-1.0)),
+    )
+    for rank, row in enumerate(leaderboard, 1):
+        row["rank"] = rank
+
+    best = {"class_weight": class_weights, **search.best_params_}
+    if resource == "n_estimators":
+        best["n_estimators"] = max_trees
+    report_progress(0.8, "Refitting best configuration")
+    model = RandomForestClassifier(**best, random_state=42, n_jobs=-1)
+    model.fit(X_train, y_train)
+
+    best_labels = _param_labels({k: best[k] for k in search.best_params_})
+    hyperparameters = {
+        **_param_labels({k: v for k, v in model.get_params().items() if k in SEARCH_PARAMS}),
+        "test_split": test_split,
+    }
+    return _register_model(model, "RandomForest", model.feature_importances_, X_train, X_val, y_val, target, selected_features, cleaned_path, out_dir, hyperparameters, {
+        "search": {
+            "best_params": best_labels,
+            "resource": resource,
+            "factor": factor,
+            "n_candidates": int(search.n_candidates_[0]),
+            "n_rounds": int(search.n_iterations_),
+            "n_resources": [int(r) for r in search.n_resources_],
+            "leaderboard": leaderboard,
+        },
+    })
+
+
 # ---------------------------------------------------------------------------
 # Evaluate stage — threshold tuning on validation or test data
 # ---------------------------------------------------------------------------
 
+def predict_dtype(model) -> type:
+    """Matrix dtype to predict ``model`` on: float32 for trees (what they split on), else float64."""
+    if isinstance(model, (RandomForestClassifier, HistGradientBoostingClassifier)):
+        return np.float32
+    return np.float64
+
+
 def run_evaluate(
     target: str,
     selected_features: list[str],
     cleaned_path: str,
     test_csv_path: str | None = None,
+    primary_metric: str = "recall",
+    cost_fp: float = 1.0,
+    cost_fn: float = 1.0,
+    model_version: str | None = None,
+    artifact_dir: str | None = None,
 ) -> dict[str, Any]:
-    """Evaluate the trained model. Uses validation split from training data if no test CSV."""
-    model = joblib.load(DATA / "model.pkl")
+    """Evaluate a trained model (default: latest). Uses validation split from training data if no test CSV.
+
+    The threshold is chosen over every distinct predicted probability for
+    ``primary_metric`` (see ``best_threshold_index``).
+    """
+    out_dir = _artifacts(artifact_dir)
+    info = model_info(out_dir, model_version)
+    model = load_model(out_dir, info["version"])
+    selected_features = info.get("features", selected_features)
 
     if test_csv_path and Path(test_csv_path).exists():
         df = pd.read_csv(test_csv_path)
+        # Encode with the model's training vocabularies so codes match
+        df = apply_encodings(df, training_encodings(info))
+        y_test = df[target]
+        # Only use features the model was trained on
+        available = [f for f in selected_features if f in df.columns]
+        X_test = df[available].to_numpy(dtype=predict_dtype(model))
     else:
-        df = pd.read_csv(cleaned_path)
-        split_idx = int(len(df) * 0.8)
-        df = df.iloc[split_idx:]
-
-    # Encode non-numeric columns
-    for col in df.columns:
-        if not pd.api.types.is_numeric_dtype(df[col]):
-            df[col] = LabelEncoder().fit_transform(df[col].astype(str))
-
-    y_test = df[target]
-    # Only use features the model was trained on
-    available = [f for f in selected_features if f in df.columns]
-    X_test = df[available].values
+        split_idx = int(read_meta(cleaned_path)["n_rows"] * 0.8)
+        X_test = load_matrix(cleaned_path, selected_features, start=split_idx, dtype=predict_dtype(model))
+        y_test = pd.Series(np.asarray(column_array(cleaned_path, target)[split_idx:]))
 
     y_probs = model.predict_proba(X_test)[:, 1]
+    report_progress(0.5, "Tuning threshold")
 
     # Default threshold 0.5
     y_pred_default = (y_probs >= 0.5).astype(int)
     cm_default = confusion_matrix(y_test, y_pred_default).tolist()
     report_default = classification_report(y_test, y_pred_default, output_dict=True, zero_division=0)
-    roc_auc = float(roc_auc_score(y_test, y_probs))
-
-    # Threshold tuning
-    best_f1 = -1.0
-    best_threshold = 0.5
-    for t in np.arange(0.1, 0.95, 0.05):
-        preds = (y_probs >= t).astype(int)
-        f = float(f1_score(y_test, preds, pos_label=1))
-        if f > best_f1:
-            best_f1 = f
-            best_threshold = float(t)
+
+    # Threshold tuning — exact metrics at every distinct probability from one sort
+    curve = threshold_curve(y_test.to_numpy() == 1, y_probs, cost_fp=cost_fp, cost_fn=cost_fn)
+    aucs = curve_auc(curve)
+    best_by_metric = {m: best_threshold_index(curve, m) for m in THRESHOLD_METRICS}
+    best = best_by_metric[primary_metric]
+    best_threshold = float(curve["threshold"][best])
+    objective = threshold_objective(primary_metric)
 
     y_pred_opt = (y_probs >= best_threshold).astype(int)
     cm_opt = confusion_matrix(y_test, y_pred_opt).tolist()
     report_opt = classification_report(y_test, y_pred_opt, output_dict=True, zero_division=0)
 
     eval_report = {
-        "roc_auc": roc_auc,
+        "model_version": info["version"],
+        "roc_auc": aucs["roc_auc"],
+        "average_precision": round(aucs["average_precision"], 6),
         "default_threshold_0.5": {
             "confusion_matrix": cm_default,
             "classification_report": report_default,
             "target_recall": float(report_default.get("1", {}).get("recall", 0)),
         },
         "optimal_threshold_tuning": {
-            "optimal_threshold": round(best_threshold, 2),
+            "primary_metric": primary_metric,
+            **objective,
+            "objective_value": round(float(curve[objective["objective"]][best]), 6),
+            "optimal_threshold": round(best_threshold, 6),
             "confusion_matrix": cm_opt,
             "classification_report": report_opt,
             "target_recall": float(report_opt.get("1", {}).get("recall", 0)),
-            "best_f1_score": round(best_f1, 6),
+            "best_f1_score": round(float(curve["f1"][best]), 6),
+            "cost": float(curve["cost"][best]),
+            "cost_fp": cost_fp,
+            "cost_fn": cost_fn,
+        },
+        "optimal_by_metric": {m: round(float(curve["threshold"][i]), 6) for m, i in best_by_metric.items()},
+        "objective_by_metric": {m: threshold_objective(m)["objective"] for m in best_by_metric},
+        "threshold_curve": {
+            "n_thresholds": len(curve["threshold"]),
+            "points": downsample_curve(curve, keep=list(best_by_metric.values())),
         },
     }
 
-    with open(DATA / "eval_report.json", "w") as f:
+    with open(out_dir / "eval_report.json", "w") as f:
         json.dump(eval_report, f, indent=2)
 
     return {"eval_report": eval_report}
@@ -408,78 +1050,121 @@ SEGMENT_BOUNDS = [0.0, 0.25, 0.5, 0.75, 1.0]
 SEGMENT_NAMES = ["Low", "Medium", "High", "Very High"]
 
 
+def assign_segments(probs: np.ndarray) -> np.ndarray:
+    """Segment number (1-4) for each probability."""
+    return np.clip(np.digitize(probs, SEGMENT_BOUNDS[1:], right=False) + 1, 1, 4)
+
+
 def run_scoring(
     target: str,
     selected_features: list[str],
     cleaned_path: str,
+    chunk_rows: int = 250_000,
+    model_version: str | None = None,
+    artifact_dir: str | None = None,
 ) -> dict[str, Any]:
-    """Score every row in cleaned data: probability + segment columns. Return histogram data."""
-    model = joblib.load(DATA / "model.pkl")
-    df = pd.read_csv(cleaned_path)
-
-    # Encode non-numeric
-    encoders: dict[str, LabelEncoder] = {}
-    for col in df.columns:
-        if not pd.api.types.is_numeric_dtype(df[col]):
-            le = LabelEncoder()
-            df[col] = le.fit_transform(df[col].astype(str))
-            encoders[col] = le
-
-    available = [f for f in selected_features if f in df.columns]
-    X = df[available].values
-    y = df[target]
-
-    probs = model.predict_proba(X)[:, 1]
+    """Score every row in cleaned data: probability + segment columns. Return histogram data.
+
+    Rows are scored in chunks of ``chunk_rows`` and appended to the output
+    CSV; the histogram and segment summary are accumulated with bincount, so
+    memory stays bounded by the chunk size rather than the dataset. Each
+    row's byte offset and probability also feed the index behind ``/scored``
+    (see ``api.scored_index``).
+    """
+    out_dir = _artifacts(artifact_dir)
+    info = model_info(out_dir, model_version)
+    model = load_model(out_dir, info["version"])
+    selected_features = info.get("features", selected_features)
+    meta = read_meta(cleaned_path)
+    total = meta["n_rows"]
+    available = [f for f in selected_features if f in meta["columns"]]
+    dtype = predict_dtype(model)
 
-    # Assign segments
-    seg_numbers = np.digitize(probs, SEGMENT_BOUNDS[1:], right=False) + 1  # 1-4
-    seg_numbers = np.clip(seg_numbers, 1, 4)
-    seg_names = [SEGMENT_NAMES[n - 1] for n in seg_numbers]
-
-    # Build output CSV
-    df_out = pd.read_csv(cleaned_path)  # original (pre-encode) for readability
-    df_out["probability"] = np.round(probs, 6)
-    df_out["segment_name"] = seg_names
-    df_out["segment_number"] = seg_numbers
-    df_out.to_csv(DATA / "scored_output.csv", index=False)
-
-    # Build histogram data for the frontend (binned by probability)
     n_bins = 40
     bin_edges = np.linspace(0, 1, n_bins + 1)
+    hist_counts = np.zeros((n_bins, 2), dtype=np.int64)  # [bin, no/yes]
+    seg_count = np.zeros(len(SEGMENT_NAMES), dtype=np.int64)
+    seg_prob = np.zeros(len(SEGMENT_NAMES))
+    seg_target = np.zeros(len(SEGMENT_NAMES))
+
+    out_path = out_dir / "scored_output.csv"
+    tmp_path = out_path.with_suffix(".csv.tmp")
+    index = ScoredIndexWriter(out_dir, total)
+    done = 0
+    written = 0
+    out = open(tmp_path, "wb")
+    try:
+        for chunk in iter_chunks(cleaned_path, chunk_rows=chunk_rows):
+            probs = model.predict_proba(chunk[available].to_numpy(dtype=dtype))[:, 1]
+            y = chunk[target].to_numpy()
+
+            seg_numbers = assign_segments(probs)
+
+            chunk["probability"] = np.round(probs, 6)
+            chunk["segment_name"] = np.asarray(SEGMENT_NAMES, dtype=object)[seg_numbers - 1]
+            chunk["segment_number"] = seg_numbers
+            # Written as bytes so the index can record where each row's line starts
+            data = chunk.to_csv(index=False, header=done == 0).encode()
+            out.write(data)
+            index.add(data, written, probs, header=done == 0)
+            written += len(data)
+
+            # Histogram bins match the [lo, hi) edges, with the last bin closed
+            bins = np.clip(np.searchsorted(bin_edges, probs, side="right") - 1, 0, n_bins - 1)
+            hist_counts[:, 0] += np.bincount(bins[y == 0], minlength=n_bins)
+            hist_counts[:, 1] += np.bincount(bins[y == 1], minlength=n_bins)
+            seg_idx = seg_numbers - 1
+            seg_count += np.bincount(seg_idx, minlength=len(SEGMENT_NAMES))
+            seg_prob += np.bincount(seg_idx, weights=probs, minlength=len(SEGMENT_NAMES))
+            seg_target += np.bincount(seg_idx, weights=y.astype(np.float64), minlength=len(SEGMENT_NAMES))
+
+            done += len(chunk)
+            report_progress(0.05 + 0.9 * done / max(total, 1), f"Scored {done:,} of {total:,} rows")
+
+        if done == 0:
+            out.write(pd.DataFrame(columns=list(meta["columns"]) + ["probability", "segment_name", "segment_number"]).to_csv(index=False).encode())
+        out.close()
+        os.replace(tmp_path, out_path)
+        report_progress(0.97, "Indexing scored rows")
+        index.finish(out_path, assign_segments, len(SEGMENT_NAMES))
+    except BaseException:
+        out.close()
+        index.abort()
+        raise
+
+    # Build histogram data for the frontend (binned by probability)
     hist_data = []
     for i in range(n_bins):
-        lo, hi = float(bin_edges[i]), float(bin_edges[i + 1])
-        mask = (probs >= lo) & (probs < hi) if i < n_bins - 1 else (probs >= lo) & (probs <= hi)
-        count_no = int(((y[mask] == 0).sum()))
-        count_yes = int(((y[mask] == 1).sum()))
+        count_no, count_yes = int(hist_counts[i, 0]), int(hist_counts[i, 1])
         hist_data.append({
-            "bin_start": round(lo, 4),
-            "bin_end": round(hi, 4),
+            "bin_start": round(float(bin_edges[i]), 4),
+            "bin_end": round(float(bin_edges[i + 1]), 4),
             "count_no": count_no,
             "count_yes": count_yes,
             "count_total": count_no + count_yes,
         })
 
-    avg_prob = float(np.mean(probs))
+    avg_prob = float(seg_prob.sum() / done) if done else float("nan")
 
     # Segment summary
     segment_summary = []
-    for seg_num in range(1, 5):
-        mask = seg_numbers == seg_num
+    for i, name in enumerate(SEGMENT_NAMES):
+        n = int(seg_count[i])
         segment_summary.append({
-            "segment_number": seg_num,
-            "segment_name": SEGMENT_NAMES[seg_num - 1],
-            "count": int(mask.sum()),
-            "avg_probability": round(float(probs[mask].mean()), 4) if mask.any() else 0,
-            "target_rate": round(float(y[mask].mean()), 4) if mask.any() else 0,
+            "segment_number": i + 1,
+            "segment_name": name,
+            "count": n,
+            "avg_probability": round(float(seg_prob[i] / n), 4) if n else 0,
+            "target_rate": round(float(seg_target[i] / n), 4) if n else 0,
         })
 
     return {
-        "total_rows": len(df),
+        "total_rows": done,
         "avg_probability": round(avg_prob, 4),
         "histogram": hist_data,
         "segments": segment_summary,
-        "output_path": str(DATA / "scored_output.csv"),
+        "output_path": str(out_path),
+        "model_version": info["version"],
     }
 
 
@@ -487,57 +1172,167 @@ def run_scoring(
 # Descriptives — SPSS-style class comparison
 # ---------------------------------------------------------------------------
 
-def run_descriptives(csv_path: str, target: str) -> dict[str, Any]:
-    """Per-column descriptive statistics split by target class."""
-    df = pd.read_csv(csv_path, nrows=50000)
-    if target not in df.columns:
-        raise ValueError(f"Target '{target}' not found")
+DESCRIPTIVES_CHUNK_ROWS = 200_000
+# Numeric columns with more distinct values than this are compared by class; the rest get crosstabs
+CONTINUOUS_MIN_LEVELS = 6
+# Categorical columns with more levels than this are listed as skipped rather than crosstabbed
+MAX_CROSSTAB_LEVELS = 1000
+# Medians are exact up to this many rows per column and class, sketched beyond
+EXACT_MEDIAN_ROWS = 100_000
+_MOMENTS = ("n", "mean", "m2", "min", "max")
+
+
+class _Median:
+    """Running median: exact while small, a mergeable KLL sketch once past ``EXACT_MEDIAN_ROWS``."""
+
+    def __init__(self):
+        self.parts: list[np.ndarray] = []
+        self.n = 0
+        self.sketch: QuantileSketch | None = None
+
+    def update(self, values: np.ndarray) -> None:
+        values = values[~np.isnan(values)]
+        if self.sketch is None and self.n + len(values) > EXACT_MEDIAN_ROWS:
+            self.sketch = QuantileSketch()
+            for part in self.parts:
+                self.sketch.update(part)
+            self.parts = []
+        if self.sketch is not None:
+            self.sketch.update(values)
+        else:
+            self.parts.append(values)
+        self.n += len(values)
+
+    def value(self) -> float:
+        if self.sketch is not None:
+            return self.sketch.quantiles([0.5])[0]
+        return float(np.median(np.concatenate(self.parts))) if self.n else float("nan")
+
+
+def _merge_moments(acc: dict[str, pd.DataFrame] | None, chunk: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """Fold one chunk's per-class count/mean/var/min/max into running (class × column) frames.
+
+    Means and sums of squared deviations are combined with Chan et al.'s
+    pairwise update, so the variance is exact and numerically stable
+    however the file is chunked.
+    """
+    stat = lambda name: chunk.xs(name, axis=1, level=1)
+    b = {
+        "n": stat("count").astype(np.float64),
+        "mean": stat("mean"),
+        "m2": (stat("var") * (stat("count") - 1)).fillna(0.0),
+        "min": stat("min"),
+        "max": stat("max"),
+    }
+    if acc is None:
+        return b
+    index = acc["n"].index.union(b["n"].index)
+    columns = acc["n"].columns.union(b["n"].columns, sort=False)
+    fills = {"n": 0.0, "mean": 0.0, "m2": 0.0, "min": np.inf, "max": -np.inf}
+    a = {k: acc[k].reindex(index=index, columns=columns, fill_value=fills[k]).fillna(fills[k]) for k in _MOMENTS}
+    b = {k: b[k].reindex(index=index, columns=columns, fill_value=fills[k]).fillna(fills[k]) for k in _MOMENTS}
+    n = a["n"] + b["n"]
+    delta = b["mean"] - a["mean"]
+    share = (b["n"] / n.where(n > 0)).fillna(0.0)
+    return {
+        "n": n,
+        "mean": a["mean"] + delta * share,
+        "m2": a["m2"] + b["m2"] + delta ** 2 * a["n"] * share,
+        "min": np.minimum(a["min"], b["min"]),
+        "max": np.maximum(a["max"], b["max"]),
+    }
+
 
-    y = df[target]
+@cached(dataset=_source_of, exclude=("csv_path",))
+def _descriptives_summary(csv_path: str, target: str, chunk_rows: int = DESCRIPTIVES_CHUNK_ROWS) -> dict[str, Any]:
+    """Full, unpaginated descriptives from one chunked pass over the whole file.
+
+    Each chunk contributes one groupby aggregation (count, mean, var, min,
+    max by class) for its numeric columns, per-class medians (see
+    ``_Median``; approximate only past ``EXACT_MEDIAN_ROWS`` rows) and
+    (value, class) counts for crosstab candidates.
+    """
+    n_rows = 0
+    target_counts = pd.Series(dtype=np.float64)
+    columns: list[str] = []
+    numeric: dict[str, bool] = {}
+    levels: dict[str, np.ndarray] = {}
+    counts: dict[str, pd.Series | None] = {}
+    moments = None
+    medians: dict[tuple[str, Any], _Median] = {}
+
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_rows):
+        if target not in chunk.columns:
+            raise ValueError(f"Target '{target}' not found")
+        if not columns:
+            columns = [c for c in chunk.columns if c != target]
+        y = chunk[target]
+        n_rows += len(chunk)
+        target_counts = target_counts.add(y.value_counts(), fill_value=0)
+        chunk = chunk[y.notna()]
+        y = y[y.notna()]
+        groups = y.groupby(y).indices
+
+        for col in columns:
+            numeric[col] = numeric.get(col, True) and pd.api.types.is_numeric_dtype(chunk[col])
+        num_cols = [c for c in columns if numeric[c]]
+        for col in num_cols:
+            if len(levels.get(col, ())) < CONTINUOUS_MIN_LEVELS:
+                seen = np.concatenate([levels.get(col, np.empty(0)), pd.unique(chunk[col].dropna().to_numpy())])
+                levels[col] = np.unique(seen)[:CONTINUOUS_MIN_LEVELS]
+
+        if num_cols and len(chunk):
+            values = chunk[num_cols].astype(np.float64)
+            moments = _merge_moments(moments, values.groupby(y).agg(["count", "mean", "var", "min", "max"]))
+            matrix = values.to_numpy()
+            for cls, rows in groups.items():
+                part = matrix[rows]
+                for j, col in enumerate(num_cols):
+                    medians.setdefault((col, cls), _Median()).update(part[:, j])
+
+        for col in columns:
+            continuous = numeric[col] and len(levels[col]) >= CONTINUOUS_MIN_LEVELS
+            if continuous or (col in counts and counts[col] is None):
+                counts[col] = None
+                continue
+            counts[col] = _merge_pair_counts(counts.get(col), chunk[col], y)
 
     # Target distribution
-    vc = y.value_counts().sort_index()
+    target_counts = target_counts.sort_index()
     target_dist = [
-        {"value": str(k), "count": int(v), "pct": round(100 * v / len(y), 2)}
-        for k, v in vc.items()
+        {"value": str(k), "count": int(v), "pct": round(100 * v / n_rows, 2)}
+        for k, v in target_counts.items()
     ]
+    classes = list(target_counts.index)
 
-    classes = sorted(y.unique())
     numeric_comparisons = []
     crosstabs = []
-
-    for col in df.columns:
-        if col == target:
-            continue
-        s = df[col].dropna()
-        y_clean = y[s.index]
-
-        if pd.api.types.is_numeric_dtype(s) and s.nunique() > 5:
+    skipped = []
+    for col in columns:
+        if numeric[col] and len(levels[col]) >= CONTINUOUS_MIN_LEVELS:
             by_class = []
             for cls in classes:
-                subset = s[y_clean == cls]
-                if len(subset) == 0:
+                n = moments["n"].at[cls, col] if cls in moments["n"].index else 0
+                if n == 0:
                     continue
+                sd = np.sqrt(moments["m2"].at[cls, col] / (n - 1)) if n > 1 else np.nan
                 by_class.append({
                     "class": str(cls),
-                    "n": int(len(subset)),
-                    "mean": round(float(subset.mean()), 4),
-                    "sd": round(float(subset.std()), 4),
-                    "median": round(float(subset.median()), 4),
-                    "min": round(float(subset.min()), 4),
-                    "max": round(float(subset.max()), 4),
+                    "n": int(n),
+                    "mean": round(float(moments["mean"].at[cls, col]), 4),
+                    "sd": round(float(sd), 4),
+                    "median": round(float(medians[(col, cls)].value()), 4),
+                    "min": round(float(moments["min"].at[cls, col]), 4),
+                    "max": round(float(moments["max"].at[cls, col]), 4),
                 })
             numeric_comparisons.append({"column": col, "by_class": by_class})
-            if len(numeric_comparisons) >= 20:
-                break
-
-    for col in df.columns:
-        if col == target or (pd.api.types.is_numeric_dtype(df[col]) and df[col].nunique() > 5):
             continue
-        s = df[col].dropna().astype(str)
-        y_clean = y[s.index]
+        if counts.get(col) is None:
+            skipped.append(col)
+            continue
         try:
-            ct = pd.crosstab(s, y_clean)
+            ct = counts[col].unstack(fill_value=0).astype(np.int64).sort_index()
+            ct = ct[[c for c in classes if c in ct.columns]]
             chi2, p, dof, _ = scipy_stats.chi2_contingency(ct)
             n = ct.values.sum()
             cramers_v = np.sqrt(chi2 / (n * (min(ct.shape) - 1))) if min(ct.shape) > 1 else 0.0
@@ -554,21 +1349,47 @@ def run_descriptives(csv_path: str, target: str) -> dict[str, Any]:
                 "chi2": round(float(chi2), 4),
                 "p_value": float(p),
                 "cramers_v": round(float(cramers_v), 4),
-                "n_categories": int(s.nunique()),
+                "n_categories": int(len(ct)),
                 "classes": [str(c) for c in ct.columns],
                 "rows": rows,
             })
         except Exception:
             pass
-        if len(crosstabs) >= 8:
-            break
 
     return {
         "target": target,
-        "n": int(len(df)),
+        "n": n_rows,
         "target_distribution": target_dist,
         "numeric_comparisons": numeric_comparisons,
         "crosstabs": crosstabs,
+        "skipped_columns": skipped,
+    }
+
+
+def run_descriptives(
+    csv_path: str,
+    target: str,
+    numeric_offset: int = 0,
+    numeric_limit: int = 20,
+    crosstab_offset: int = 0,
+    crosstab_limit: int = 8,
+) -> dict[str, Any]:
+    """Per-column descriptive statistics split by target class, one page at a time.
+
+    The full summary is computed once per file and target (and cached);
+    pages are slices of it.
+    """
+    summary = _descriptives_summary(csv_path, target)
+    numeric = summary["numeric_comparisons"]
+    crosstabs = summary["crosstabs"]
+    return {
+        **summary,
+        "numeric_comparisons": numeric[numeric_offset:numeric_offset + numeric_limit],
+        "crosstabs": crosstabs[crosstab_offset:crosstab_offset + crosstab_limit],
+        "pagination": {
+            "numeric": {"offset": numeric_offset, "limit": numeric_limit, "total": len(numeric)},
+            "crosstabs": {"offset": crosstab_offset, "limit": crosstab_limit, "total": len(crosstabs)},
+        },
     }
 
 
@@ -610,52 +1431,150 @@ def _hosmer_lemeshow(y_true: np.ndarray, y_prob: np.ndarray, n_groups: int = 10)
     }
 
 
+LOGISTIC_SOLVERS = ("auto", "lbfgs", "out_of_core")
+# "auto" streams once the float64 design matrix would exceed this
+LOGISTIC_MEMORY_BYTES = int(os.environ.get("LOGISTIC_MEMORY_MB", "2048")) * (1 << 20)
+LOGISTIC_C = 1e4
+
+
+def _scaling_stats(cleaned_path: str, features: list[str], stop: int, chunk_rows: int) -> tuple[np.ndarray, np.ndarray]:
+    """Mean and standard deviation of rows ``:stop`` in one streaming pass (Chan et al. merge)."""
+    n, mean, m2 = 0, np.zeros(len(features)), np.zeros(len(features))
+    for _, X in iter_matrix(cleaned_path, features, 0, stop, chunk_rows):
+        nc = len(X)
+        mc = X.mean(axis=0)
+        delta = mc - mean
+        m2 += ((X - mc) ** 2).sum(axis=0) + delta ** 2 * n * nc / (n + nc)
+        mean += delta * nc / (n + nc)
+        n += nc
+    sd = np.sqrt(m2 / max(n, 1))
+    sd[sd == 0] = 1.0
+    return mean, sd
+
+
+def _fit_logistic_out_of_core(
+    cleaned_path: str,
+    features: list[str],
+    y: np.ndarray,
+    split_idx: int,
+    max_iter: int,
+    chunk_rows: int,
+) -> tuple[SklearnLR, np.ndarray, np.ndarray]:
+    """Penalised logistic MLE by Newton (IRLS) passes over chunks of the training rows.
+
+    Only one chunk plus the k×k Hessian is ever in memory. Features are
+    standardised with statistics from a first pass; the L2 penalty matches
+    ``LogisticRegression(C=LOGISTIC_C)`` on the unscaled coefficients, so
+    the fit agrees with the in-memory solver. Returns the model, the
+    unpenalised information matrix X'WX on the original scale (intercept
+    first) and the training-row probabilities.
+    """
+    mean, sd = _scaling_stats(cleaned_path, features, split_idx, chunk_rows)
+    k = len(features)
+    # Coefficients in the standardised space; x = mean + z·sd, so [1, x] = [1, z] @ A
+    A = np.eye(k + 1)
+    A[0, 1:] = mean
+    A[1:, 1:] = np.diag(sd)
+    ridge = np.concatenate([[0.0], 1 / (LOGISTIC_C * sd ** 2)])
+    prior = float(np.clip(np.mean(y[:split_idx]), 1e-6, 1 - 1e-6))
+    w = np.zeros(k + 1)
+    w[0] = np.log(prior / (1 - prior))
+
+    def newton_pass(w, keep_probs=False):
+        grad, hess = np.zeros(k + 1), np.zeros((k + 1, k + 1))
+        probs = np.empty(split_idx) if keep_probs else None
+        for lo, X in iter_matrix(cleaned_path, features, 0, split_idx, chunk_rows):
+            Z = np.empty((len(X), k + 1))
+            Z[:, 0] = 1.0
+            Z[:, 1:] = (X - mean) / sd
+            p = scipy_special.expit(Z @ w)
+            grad += Z.T @ (y[lo:lo + len(X)] - p)
+            hess += weighted_gram(Z[:, 1:], p * (1 - p))
+            if keep_probs:
+                probs[lo:lo + len(X)] = p
+        return grad, hess, probs
+
+    n_iter = 0
+    for n_iter in range(1, max_iter + 1):
+        report_progress(0.1 + 0.5 * min(n_iter / 10, 1), f"Newton pass {n_iter}")
+        grad, hess, _ = newton_pass(w)
+        step = np.linalg.solve(hess + np.diag(ridge), grad - ridge * w)
+        w += step
+        if np.max(np.abs(step)) < 1e-8:
+            break
+    _, hess, p_hat = newton_pass(w, keep_probs=True)
+
+    # Back to the original scale: w = A @ b
+    b = np.linalg.solve(A, w)
+    model = SklearnLR(C=LOGISTIC_C, max_iter=max_iter, solver="lbfgs", random_state=42)
+    model.classes_ = np.unique(y[:split_idx])
+    model.coef_ = b[None, 1:]
+    model.intercept_ = b[:1]
+    model.n_features_in_ = k
+    model.n_iter_ = np.array([n_iter], dtype=np.int32)
+    return model, A.T @ hess @ A, p_hat
+
+
+@cached(dataset=_store_of, exclude=(), on_hit=_replay_model)
 def run_logistic_regression(
     target: str,
     selected_features: list[str],
     cleaned_path: str,
     test_split: float = 0.2,
     max_iter: int = 1000,
+    solver: str = "auto",
+    chunk_rows: int = 250_000,
+    artifact_dir: str | None = None,
 ) -> dict[str, Any]:
-    """Fit logistic regression and return SPSS-style output."""
-    df = pd.read_csv(cleaned_path)
-    for col in df.columns:
-        if not pd.api.types.is_numeric_dtype(df[col]):
-            df[col] = LabelEncoder().fit_transform(df[col].astype(str))
-
-    y = df[target].values
-    X = df[selected_features].values
-
-    split_idx = int(len(df) * (1 - test_split))
-    X_train, X_val = X[:split_idx], X[split_idx:]
+    """Fit logistic regression and return SPSS-style output.
+
+    ``solver="lbfgs"`` fits in memory; ``"out_of_core"`` streams the
+    cleaned store in ``chunk_rows`` blocks (see ``_fit_logistic_out_of_core``)
+    so only O(rows) probabilities, never the design matrix, are held.
+    ``"auto"`` streams when the float64 matrix would exceed
+    ``LOGISTIC_MEMORY_MB``.
+    """
+    out_dir = _artifacts(artifact_dir)
+    n_rows = read_meta(cleaned_path)["n_rows"]
+    y = np.asarray(column_array(cleaned_path, target))
+    split_idx = int(n_rows * (1 - test_split))
     y_train, y_val = y[:split_idx], y[split_idx:]
+    if solver == "auto":
+        too_big = n_rows * (len(selected_features) + 1) * 8 > LOGISTIC_MEMORY_BYTES
+        solver = "out_of_core" if too_big else "lbfgs"
+
+    if solver == "out_of_core":
+        model, info_matrix, p_hat = _fit_logistic_out_of_core(
+            cleaned_path, selected_features, y, split_idx, max_iter, chunk_rows,
+        )
+        report_progress(0.7, "Scoring validation split")
+        y_prob_val = np.concatenate([
+            model.predict_proba(X)[:, 1]
+            for _, X in iter_matrix(cleaned_path, selected_features, split_idx, n_rows, chunk_rows)
+        ] or [np.empty(0)])
+    else:
+        # float64 here: the standard errors come from inverting X'WX
+        X = load_matrix(cleaned_path, selected_features, dtype=np.float64)
+        X_train, X_val = X[:split_idx], X[split_idx:]
 
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore")
-        model = SklearnLR(C=1e4, max_iter=max_iter, solver="lbfgs", random_state=42)
-        model.fit(X_train, y_train)
-
-    p_hat = model.predict_proba(X_train)[:, 1]
+        report_progress(0.1, "Fitting logistic regression")
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            model = SklearnLR(C=LOGISTIC_C, max_iter=max_iter, solver="lbfgs", random_state=42)
+            model.fit(X_train, y_train)
 
-    # Subsample for Hessian if large dataset
-    if len(X_train) > 100_000:
-        rng = np.random.default_rng(42)
-        idx = rng.choice(len(X_train), 100_000, replace=False)
-        X_sub = X_train[idx]
-        p_sub = p_hat[idx]
-    else:
-        X_sub = X_train
-        p_sub = p_hat
+        p_hat = model.predict_proba(X_train)[:, 1]
+        report_progress(0.6, "Computing standard errors")
 
-    X_aug = np.column_stack([np.ones(len(X_sub)), X_sub])
-    W = p_sub * (1 - p_sub)
-    info_matrix = (X_aug * W[:, np.newaxis]).T @ X_aug
+        # Exact information matrix over every training row, one chunk at a time
+        info_matrix = weighted_gram(X_train, p_hat * (1 - p_hat))
+        y_prob_val = model.predict_proba(X_val)[:, 1]
 
     try:
         cov_matrix = np.linalg.inv(info_matrix)
         ses = np.sqrt(np.clip(np.diag(cov_matrix), 0, None))
     except np.linalg.LinAlgError:
-        ses = np.full(X_aug.shape[1], np.nan)
+        ses = np.full(info_matrix.shape[0], np.nan)
 
     coefs = np.concatenate([model.intercept_, model.coef_[0]])
     with np.errstate(invalid="ignore", divide="ignore"):
@@ -705,7 +1624,6 @@ def run_logistic_regression(
 
     hl_result = _hosmer_lemeshow(y_train, p_hat)
 
-    y_prob_val = model.predict_proba(X_val)[:, 1]
     y_pred_val = (y_prob_val >= 0.5).astype(int)
     cm = confusion_matrix(y_val, y_pred_val)
     roc_auc = float(roc_auc_score(y_val, y_prob_val))
@@ -718,8 +1636,6 @@ def run_logistic_regression(
         "overall_pct_correct": round(100 * (tn + tp) / (tn + fp + fn + tp), 1),
     }
 
-    joblib.dump(model, DATA / "model.pkl")
-
     metrics = {
         "model_type": "LogisticRegression",
         "roc_auc": roc_auc,
@@ -730,13 +1646,24 @@ def run_logistic_regression(
         "model_fit": model_fit,
         "hosmer_lemeshow": hl_result,
         "classification_table": classification_table,
-        "train_shape": [len(X_train), len(selected_features)],
-        "val_shape": [len(X_val), len(selected_features)],
+        "train_shape": [len(y_train), len(selected_features)],
+        "val_shape": [len(y_val), len(selected_features)],
+        "solver": solver,
+        "n_iter": int(model.n_iter_[0]),
     }
-    with open(DATA / "model_metrics.json", "w") as f:
+    version = save_model(out_dir, model, {
+        "model_type": "LogisticRegression",
+        "features": selected_features,
+        "target": target,
+        "hyperparameters": {"max_iter": max_iter, "test_split": test_split, "solver": solver},
+        "dataset_hash": read_meta(cleaned_path).get("dataset_hash"),
+        "metrics": {"roc_auc": roc_auc, "target_recall": metrics["target_recall"]},
+    })
+    metrics["model_version"] = version
+    with open(out_dir / "model_metrics.json", "w") as f:
         json.dump(metrics, f, indent=2)
 
-    return {"model_metrics": metrics, "model_saved": True}
+    return {"model_metrics": metrics, "model_saved": True, "model_version": version}
 
 
 # ---------------------------------------------------------------------------
@@ -766,7 +1693,7 @@ def generate_html_report(data: dict[str, Any]) -> str:
     cl_table = metrics.get("classification_table", {})
 
     opt = eval_data.get("optimal_threshold_tuning", {})
-    eval_threshold = opt.get("optimal_threshold", "—")
+    eval_threshold = opt.get("optimal_threshold")
     eval_recall = opt.get("target_recall")
     eval_precision = (opt.get("classification_report") or {}).get("1", {}).get("precision")
     eval_f1 = opt.get("best_f1_score")
@@ -892,9 +1819,9 @@ def generate_html_report(data: dict[str, Any]) -> str:
       </table>
     </div>"""
 
-    # Feature importances (RF)
+    # Feature importances (tree models)
     importances_section = ""
-    if importances and model_type == "RandomForest":
+    if importances and model_type != "LogisticRegression":
         top = list(importances.items())[:15]
         max_imp = top[0][1] if top else 1
         rows_html = ""
@@ -931,7 +1858,7 @@ def generate_html_report(data: dict[str, Any]) -> str:
         <thead><tr><th>Threshold</th><th class="num">ROC-AUC</th><th class="num">Recall (1)</th><th class="num">Precision (1)</th><th class="num">F1 (1)</th></tr></thead>
         <tbody>
           <tr>
-            <td>{eval_threshold}</td>
+            <td>{fmt_f(eval_threshold, 3)}</td>
             <td class="num">{fmt_f(roc_auc)}</td>
             <td class="num">{fmt_f(eval_recall)}</td>
             <td class="num">{fmt_f(eval_precision)}</td>
@@ -0,0 +1,210 @@
+import asyncio
+import copy
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from api.encoding import encode_value, value_lookup
+from api.model_registry import load_model, model_info, resolve_version
+from api.pipeline_runner import SEGMENT_NAMES, assign_segments, training_encodings
+
+MAX_BATCH_ROWS = 512
+
+
+# ---------------------------------------------------------------------------
+# Resident model + row encoding
+# ---------------------------------------------------------------------------
+
+class Predictor:
+    """A loaded model plus the encoding its training data went through.
+
+    Rows arrive as dicts of raw values. Categorical columns are mapped
+    through the vocabulary the ETL stage stored with the dataset the model
+    was trained on (see ``api.encoding``).
+    """
+
+    def __init__(self, artifact_dir: Path, version: str):
+        info = model_info(artifact_dir, version)
+        self.version = version
+        self.model = load_model(artifact_dir, version)
+        # Single-row batches are dominated by thread start-up cost; predict on one core.
+        # A shallow copy, so the instance shared through the model cache keeps its n_jobs.
+        if hasattr(self.model, "n_jobs"):
+            self.model = copy.copy(self.model)
+            self.model.n_jobs = 1
+        self.features = list(info["features"])
+        vocab = training_encodings(info)
+        self.lookups = {col: value_lookup(vocab[col]) for col in self.features if col in vocab}
+        self.batcher = MicroBatcher(self._predict)
+
+    def encode(self, rows: list[dict[str, Any]]) -> np.ndarray:
+        X = np.empty((len(rows), len(self.features)), dtype=np.float64)
+        for j, col in enumerate(self.features):
+            lookup = self.lookups.get(col)
+            for i, row in enumerate(rows):
+                if col not in row:
+                    raise ValueError(f"Row {i} is missing feature '{col}'")
+                v = row[col]
+                if lookup is not None:
+                    X[i, j] = encode_value(v, lookup)
+                elif v is None:
+                    X[i, j] = np.nan
+                else:
+                    try:
+                        X[i, j] = float(v)
+                    except (TypeError, ValueError):
+                        raise ValueError(f"Row {i}: feature '{col}' must be numeric, got {v!r}")
+        return X
+
+    def _predict(self, X: np.ndarray) -> np.ndarray:
+        trees = getattr(self.model, "estimators_", None)
+        if isinstance(self.model, RandomForestClassifier) and trees and not np.isnan(X).any():
+            # Same average as RandomForestClassifier.predict_proba, minus the joblib
+            # dispatch and input validation that dominate small batches
+            X32 = np.ascontiguousarray(X, dtype=np.float32)
+            total = np.zeros(len(X))
+            for tree in trees:
+                total += tree.predict_proba(X32, check_input=False)[:, 1]
+            return total / len(trees)
+        return self.model.predict_proba(X)[:, 1]
+
+    async def predict(self, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        # Encoding is a per-cell Python loop; keep it off the event loop
+        probs = await self.batcher.submit(await asyncio.to_thread(self.encode, rows))
+        segments = assign_segments(probs)
+        return [
+            {
+                "probability": round(float(p), 6),
+                "segment_name": SEGMENT_NAMES[s - 1],
+                "segment_number": int(s),
+            }
+            for p, s in zip(probs, segments)
+        ]
+
+
+# ---------------------------------------------------------------------------
+# Micro-batching
+# ---------------------------------------------------------------------------
+
+class MicroBatcher:
+    """Coalesces concurrent predict calls into single ``predict_proba`` batches.
+
+    A batch is cut as soon as the inference thread is free: whatever requests
+    queued up while the previous batch ran go out together (up to
+    ``max_rows``), so an idle server adds no wait and a busy one amortises
+    per-call overhead across requests.
+
+    ``close`` (callable from any thread) lets queued and in-flight requests
+    finish; calls submitted after it run unbatched in a worker thread.
+    """
+
+    def __init__(self, fn, max_rows: int = MAX_BATCH_ROWS):
+        self.fn = fn
+        self.max_rows = max_rows
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="predict")
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    def _ensure_running(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+
+    async def submit(self, X: np.ndarray) -> np.ndarray:
+        if self._closed:
+            return await asyncio.to_thread(self.fn, X)
+        self._ensure_running()
+        fut = self._loop.create_future()
+        self._queue.put_nowait((X, fut))
+        return await fut
+
+    async def _run(self) -> None:
+        while not (self._closed and self._queue.empty()):
+            item = await self._queue.get()
+            if item is None:  # woken by close()
+                continue
+            batch = [item]
+            rows = len(item[0])
+            while rows < self.max_rows and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is None:
+                    continue
+                batch.append(item)
+                rows += len(item[0])
+            X = np.vstack([x for x, _ in batch]) if len(batch) > 1 else batch[0][0]
+            try:
+                probs = await self._loop.run_in_executor(self._executor, self.fn, X)
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            start = 0
+            for x, fut in batch:
+                if not fut.done():
+                    fut.set_result(probs[start:start + len(x)])
+                start += len(x)
+
+        self._executor.shutdown(wait=False)
+
+    def close(self) -> None:
+        self._closed = True
+        if self._task is None:
+            self._executor.shutdown(wait=False)
+            return
+        try:
+            # Wake the batch loop so it can drain the queue and stop
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, None)
+        except RuntimeError:  # event loop already closed
+            self._executor.shutdown(wait=False)
+
+
+# ---------------------------------------------------------------------------
+# Cache of resident predictors, keyed by session dir and model version
+# ---------------------------------------------------------------------------
+
+MAX_PREDICTORS = 8
+
+_PREDICTORS: "OrderedDict[tuple[str, str], Predictor]" = OrderedDict()
+_LOCK = threading.Lock()
+
+
+def get_predictor(artifact_dir: Path, version: Optional[str] = None) -> Predictor:
+    """Resident predictor for a session's model version (default: latest).
+
+    Blocks while a new predictor's model is loaded; call it off the event
+    loop. The load happens outside the lock, so other sessions are not held up.
+    """
+    version = resolve_version(artifact_dir, version)
+    key = (str(artifact_dir), version)
+    with _LOCK:
+        pred = _PREDICTORS.get(key)
+        if pred is not None:
+            _PREDICTORS.move_to_end(key)
+            return pred
+    built = Predictor(Path(artifact_dir), version)
+    with _LOCK:
+        pred = _PREDICTORS.setdefault(key, built)
+        _PREDICTORS.move_to_end(key)
+        while len(_PREDICTORS) > MAX_PREDICTORS:
+            _PREDICTORS.popitem(last=False)[1].batcher.close()
+    if pred is not built:
+        built.batcher.close()  # another request loaded it first
+    return pred
+
+
+def drop_predictor(artifact_dir: Path) -> None:
+    with _LOCK:
+        keys = [k for k in _PREDICTORS if k[0] == str(artifact_dir)]
+        dropped = [_PREDICTORS.pop(k) for k in keys]
+    for pred in dropped:
+        pred.batcher.close()
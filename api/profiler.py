@@ -0,0 +1,321 @@
+from typing import Any, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from api.dataset_store import compact_dtype, float32_safe, int_dtype_for
+
+# ---------------------------------------------------------------------------
+# Mergeable sketches
+# ---------------------------------------------------------------------------
+
+
+def hash_values(s: pd.Series) -> np.ndarray:
+    """64-bit hashes of a Series' non-null values.
+
+    Numeric values are hashed as float64, so a chunk pandas read as int64
+    and one it read as float64 (because of a blank) hash 1 and 1.0 alike.
+    """
+    s = s.dropna()
+    if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+        s = pd.Series(s.to_numpy(dtype=np.float64) + 0.0)  # + 0.0 folds -0.0 into 0.0
+    return pd.util.hash_pandas_object(s, index=False).to_numpy(dtype=np.uint64)
+
+
+class DistinctCounter:
+    """HyperLogLog distinct counter that stays exact for low-cardinality columns.
+
+    Hashes are kept in an exact set until ``exact_limit`` distinct values have
+    been seen; after that only the HLL registers are maintained.
+    """
+
+    def __init__(self, precision: int = 14, exact_limit: int = 10_000):
+        self.p = precision
+        self.m = 1 << precision
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+        self.exact_limit = exact_limit
+        self.exact: Optional[np.ndarray] = np.empty(0, dtype=np.uint64)
+
+    def add_hashes(self, h: np.ndarray) -> None:
+        if len(h) == 0:
+            return
+        idx = (h >> np.uint64(64 - self.p)).astype(np.int64)
+        rest = h << np.uint64(self.p)
+        # Leading zeros of the remaining bits, computed exactly from 32-bit halves
+        hi = (rest >> np.uint64(32)).astype(np.float64)
+        lo = (rest & np.uint64(0xFFFFFFFF)).astype(np.float64)
+        hi_len = np.frexp(hi)[1]
+        lo_len = np.frexp(lo)[1]
+        bit_len = np.where(hi_len > 0, hi_len + 32, lo_len)
+        rank = np.minimum(64 - bit_len + 1, 64 - self.p + 1).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+        if self.exact is not None:
+            self.exact = np.union1d(self.exact, h)
+            if len(self.exact) > self.exact_limit:
+                self.exact = None
+
+    def merge(self, other: "DistinctCounter") -> None:
+        np.maximum(self.registers, other.registers, out=self.registers)
+        if self.exact is not None and other.exact is not None:
+            self.exact = np.union1d(self.exact, other.exact)
+            if len(self.exact) > self.exact_limit:
+                self.exact = None
+        else:
+            self.exact = None
+
+    @property
+    def is_exact(self) -> bool:
+        return self.exact is not None
+
+    def count(self) -> int:
+        if self.exact is not None:
+            return int(len(self.exact))
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m ** 2 / float(np.sum(np.ldexp(1.0, -self.registers.astype(np.int64))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * self.m and zeros:
+            estimate = self.m * np.log(self.m / zeros)  # linear counting for small ranges
+        return int(round(estimate))
+
+
+class QuantileSketch:
+    """KLL-style mergeable quantile sketch over float values.
+
+    Level ``i`` holds items of weight ``2**i``; a level that exceeds its
+    capacity is sorted and every other item (random offset) is promoted.
+    """
+
+    def __init__(self, k: int = 400, seed: int = 0):
+        self.k = k
+        self.n = 0
+        self.levels: list[np.ndarray] = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self) -> None:
+        lvl = 0
+        while lvl < len(self.levels):
+            if len(self.levels[lvl]) > self._capacity(lvl):
+                if lvl + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                buf = np.sort(self.levels[lvl])
+                if len(buf) % 2:
+                    self.levels[lvl], buf = buf[-1:], buf[:-1]
+                else:
+                    self.levels[lvl] = np.empty(0)
+                promoted = buf[int(self.rng.integers(2))::2]
+                self.levels[lvl + 1] = np.concatenate([self.levels[lvl + 1], promoted])
+            lvl += 1
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for i, lvl in enumerate(other.levels):
+            self.levels[i] = np.concatenate([self.levels[i], lvl])
+        self.n += other.n
+        self._compress()
+
+    def quantiles(self, qs: Iterable[float]) -> list[Optional[float]]:
+        qs = list(qs)
+        if self.n == 0:
+            return [None] * len(qs)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(l), 2.0 ** i) for i, l in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cum = items[order], np.cumsum(weights[order])
+        pos = np.searchsorted(cum, np.asarray(qs) * cum[-1], side="left")
+        return [float(items[min(p, len(items) - 1)]) for p in pos]
+
+
+class Reservoir:
+    """Uniform row sample of fixed size over a stream of DataFrame chunks (Algorithm R)."""
+
+    def __init__(self, size: int = 1000, seed: int = 0):
+        self.size = size
+        self.seen = 0
+        self.columns: Optional[list] = None
+        self.values: Optional[np.ndarray] = None
+        self.rng = np.random.default_rng(seed)
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        if self.values is None:
+            self.columns = list(chunk.columns)
+            self.values = np.empty((self.size, len(self.columns)), dtype=object)
+        rows = chunk.to_numpy(dtype=object)
+        n = len(rows)
+        fill = max(0, min(self.size - self.seen, n))
+        self.values[self.seen:self.seen + fill] = rows[:fill]
+        if n > fill:
+            t = self.seen + np.arange(fill, n) + 1
+            slots = (self.rng.random(n - fill) * t).astype(np.int64)
+            hit = slots < self.size
+            picked = np.arange(fill, n)[hit]
+            slots = slots[hit]
+            # Later rows win when the same slot is hit more than once
+            _, last = np.unique(slots[::-1], return_index=True)
+            keep = len(slots) - 1 - last
+            self.values[slots[keep]] = rows[picked[keep]]
+        self.seen += n
+
+    @property
+    def sample(self) -> Optional[pd.DataFrame]:
+        if self.values is None:
+            return None
+        filled = self.values[: min(self.seen, self.size)]
+        return pd.DataFrame(filled, columns=self.columns).infer_objects()
+
+
+# ---------------------------------------------------------------------------
+# Per-column and per-dataset profiles
+# ---------------------------------------------------------------------------
+
+class ColumnProfile:
+    def __init__(self, name: str, top_k_limit: int = 10_000):
+        self.name = name
+        self.dtypes: list[Any] = []
+        self.count = 0
+        self.null_count = 0
+        self.distinct = DistinctCounter()
+        self.quantiles = QuantileSketch()
+        # Running moments (Chan et al. parallel merge)
+        self.n_num = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.top_counts: dict[str, int] = {}
+        self.top_k_limit = top_k_limit
+        # Inputs for the compact-dtype memory estimate
+        self.bytes_default = 0
+        self.integral = True
+        self.f32_ok = True
+
+    def update(self, s: pd.Series) -> None:
+        if s.dtype not in self.dtypes:
+            self.dtypes.append(s.dtype)
+        n = len(s)
+        nulls = int(s.isnull().sum())
+        self.count += n
+        self.null_count += nulls
+        self.bytes_default += int(s.memory_usage(index=False, deep=True))
+        self.distinct.add_hashes(hash_values(s))
+
+        if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+            vals = s.to_numpy(dtype=np.float64, na_value=np.nan)
+            vals = vals[~np.isnan(vals)]
+            if len(vals):
+                self.quantiles.update(vals)
+                n_b = len(vals)
+                mean_b = float(vals.mean())
+                m2_b = float(((vals - mean_b) ** 2).sum())
+                total = self.n_num + n_b
+                delta = mean_b - self.mean
+                self.mean += delta * n_b / total
+                self.m2 += m2_b + delta ** 2 * self.n_num * n_b / total
+                self.n_num = total
+                if self.integral:
+                    self.integral = bool(np.all(vals == np.round(vals)))
+                if self.f32_ok and s.dtype.kind == "f":
+                    self.f32_ok = float32_safe(vals)
+                lo, hi = float(vals.min()), float(vals.max())
+                self.min = lo if self.min is None else min(self.min, lo)
+                self.max = hi if self.max is None else max(self.max, hi)
+        else:
+            for k, v in s.dropna().astype(str).value_counts().items():
+                self.top_counts[k] = self.top_counts.get(k, 0) + int(v)
+            if len(self.top_counts) > self.top_k_limit:
+                keep = sorted(self.top_counts.items(), key=lambda kv: kv[1], reverse=True)
+                self.top_counts = dict(keep[: self.top_k_limit // 2])
+
+    @property
+    def dtype(self) -> str:
+        if len(self.dtypes) == 1:
+            return str(self.dtypes[0])
+        if all(pd.api.types.is_numeric_dtype(d) for d in self.dtypes):
+            return str(np.result_type(*[np.dtype(d) for d in self.dtypes]))
+        return "object"
+
+    @property
+    def n_unique(self) -> int:
+        # An HLL estimate can overshoot slightly; it never exceeds the non-null count
+        return min(self.distinct.count(), self.count - self.null_count)
+
+    @property
+    def is_numeric(self) -> bool:
+        return all(pd.api.types.is_numeric_dtype(d) for d in self.dtypes)
+
+    def memory_report(self) -> dict[str, Any]:
+        """In-memory size with pandas defaults vs. the narrowest safe dtype.
+
+        Strings are costed as a categorical: per-row integer codes plus one
+        copy of each distinct value (at the column's average value size).
+        """
+        if all(pd.api.types.is_bool_dtype(d) for d in self.dtypes):
+            name, compact = "bool", self.count
+        elif self.is_numeric:
+            dt = compact_dtype(self.min, self.max, self.integral, self.null_count > 0, self.f32_ok)
+            name, compact = str(dt), self.count * dt.itemsize
+        else:
+            codes = int_dtype_for(-1, self.n_unique)
+            avg_value = self.bytes_default / self.count if self.count else 0
+            name, compact = "category", self.count * codes.itemsize + avg_value * self.n_unique
+        compact = int(min(compact, self.bytes_default))
+        return {
+            "dtype_compact": name,
+            "bytes_default": self.bytes_default,
+            "bytes_compact": compact,
+            "bytes_saved": self.bytes_default - compact,
+        }
+
+    def numeric_stats(self) -> Optional[dict[str, Optional[float]]]:
+        if self.n_num == 0:
+            return {"mean": None, "median": None, "std": None, "min": None, "max": None}
+        std = float(np.sqrt(self.m2 / (self.n_num - 1))) if self.n_num > 1 else float("nan")
+        return {
+            "mean": self.mean,
+            "median": self.quantiles.quantiles([0.5])[0],
+            "std": std,
+            "min": self.min,
+            "max": self.max,
+        }
+
+
+class DatasetProfile:
+    def __init__(self, sample_size: int = 1000):
+        self.rows = 0
+        self.columns: dict[str, ColumnProfile] = {}
+        self.reservoir = Reservoir(sample_size)
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        self.rows += len(chunk)
+        for col in chunk.columns:
+            if col not in self.columns:
+                self.columns[col] = ColumnProfile(col)
+            self.columns[col].update(chunk[col])
+        self.reservoir.update(chunk)
+
+    def sample_values(self, col: str, n: int) -> list[str]:
+        sample = self.reservoir.sample
+        if sample is None or col not in sample.columns:
+            return []
+        return [str(v) for v in sample[col].dropna().head(n).tolist()]
+
+
+def profile_csv(source, chunksize: int = 100_000, sample_size: int = 1000) -> DatasetProfile:
+    """Profile a CSV (path or file-like) in one chunked pass with bounded memory."""
+    profile = DatasetProfile(sample_size)
+    for chunk in pd.read_csv(source, chunksize=chunksize):
+        profile.update(chunk)
+    return profile
@@ -0,0 +1,171 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / "data" / "cache"
+CACHE_BYTES = int(os.environ.get("RESULT_CACHE_MB", "512")) * (1 << 20)
+MEMORY_BYTES = int(os.environ.get("RESULT_CACHE_MEMORY_MB", "64")) * (1 << 20)
+# Bumped when cached result formats change, so stale entries are never served
+CACHE_FORMAT = 1
+
+_MISS = object()
+
+
+class ResultCache:
+    """Disk cache of pickled results with an in-memory LRU front.
+
+    Entries live under ``<root>/<dataset hash>/<key>.pkl`` so everything
+    derived from one dataset can be invalidated at once. The disk tier is an
+    LRU bounded by ``max_bytes`` (recency tracked by file mtime, so it is
+    shared between the API and worker processes); the memory tier keeps the
+    most recent pickles up to ``memory_bytes`` in this process.
+    """
+
+    def __init__(self, root: Path = CACHE_DIR, max_bytes: int = CACHE_BYTES, memory_bytes: int = MEMORY_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        self._memory: "OrderedDict[tuple[str, str], bytes]" = OrderedDict()
+        self._memory_used = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(fn_name: str, params: dict[str, Any]) -> str:
+        payload = json.dumps({"fn": fn_name, "params": params, "format": CACHE_FORMAT}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+    def _path(self, dataset_hash: str, key: str) -> Path:
+        return self.root / dataset_hash / f"{key}.pkl"
+
+    def _remember(self, dataset_hash: str, key: str, blob: bytes) -> None:
+        with self._lock:
+            old = self._memory.pop((dataset_hash, key), None)
+            if old is not None:
+                self._memory_used -= len(old)
+            if len(blob) > self.memory_bytes:
+                return
+            self._memory[(dataset_hash, key)] = blob
+            self._memory_used += len(blob)
+            while self._memory_used > self.memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_used -= len(evicted)
+
+    def get(self, dataset_hash: str, key: str) -> Any:
+        """The cached value, or ``_MISS``."""
+        with self._lock:
+            blob = self._memory.get((dataset_hash, key))
+            if blob is not None:
+                self._memory.move_to_end((dataset_hash, key))
+        path = self._path(dataset_hash, key)
+        if blob is None:
+            try:
+                blob = path.read_bytes()
+            except OSError:
+                return _MISS
+            self._remember(dataset_hash, key, blob)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        try:
+            return pickle.loads(blob)
+        except Exception:
+            self.discard(dataset_hash, key)
+            return _MISS
+
+    def put(self, dataset_hash: str, key: str, value: Any) -> None:
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        path = self._path(dataset_hash, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.tmp-{uuid.uuid4().hex[:8]}")
+        tmp.write_bytes(blob)
+        os.replace(tmp, path)
+        self._remember(dataset_hash, key, blob)
+        self._evict()
+
+    def discard(self, dataset_hash: str, key: str) -> None:
+        with self._lock:
+            blob = self._memory.pop((dataset_hash, key), None)
+            if blob is not None:
+                self._memory_used -= len(blob)
+        self._path(dataset_hash, key).unlink(missing_ok=True)
+
+    def invalidate(self, dataset_hashes: Iterable[str]) -> None:
+        """Drop every entry derived from the given datasets, on disk and in memory."""
+        hashes = {h for h in dataset_hashes if h}
+        with self._lock:
+            for k in [k for k in self._memory if k[0] in hashes]:
+                self._memory_used -= len(self._memory.pop(k))
+        for h in hashes:
+            shutil.rmtree(self.root / h, ignore_errors=True)
+
+    def _evict(self) -> None:
+        if not self.root.exists():
+            return
+        entries = []
+        for path in self.root.glob("*/*.pkl"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            with self._lock:
+                blob = self._memory.pop((path.parent.name, path.stem), None)
+                if blob is not None:
+                    self._memory_used -= len(blob)
+
+
+results = ResultCache()
+
+
+def cached(
+    dataset: Callable[[dict[str, Any]], Optional[str]],
+    exclude: tuple[str, ...] = ("artifact_dir",),
+    on_hit: Optional[Callable[[Any, dict[str, Any]], bool]] = None,
+):
+    """Memoize a pipeline entry point on (dataset hash, function, parameters).
+
+    ``dataset`` maps the bound call arguments to the dataset hash (None
+    bypasses the cache). Arguments in ``exclude`` are left out of the key.
+    ``on_hit(result, args)`` replays the function's side effects (artifact
+    files, model pointers) for a cached result; returning False turns the
+    hit into a miss.
+    """
+    def decorator(fn):
+        sig = inspect.signature(fn)
+        name = f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            call = dict(bound.arguments)
+            dataset_hash = dataset(call)
+            if not dataset_hash:
+                return fn(*args, **kwargs)
+            key = results.make_key(name, {k: v for k, v in call.items() if k not in exclude})
+            value = results.get(dataset_hash, key)
+            if value is not _MISS and (on_hit is None or on_hit(value, call) is not False):
+                return value
+            value = fn(*args, **kwargs)
+            results.put(dataset_hash, key, value)
+            return value
+
+        return wrapper
+
+    return decorator
@@ -18,6 +18,8 @@ class UploadResponse(BaseModel):
 
 class TargetRequest(BaseModel):
     target: str
+    # Test a class-stratified sample of this many rows instead of the full file
+    sample_size: Optional[int] = None
 
 
 class ColumnDecision(BaseModel):
@@ -26,6 +28,35 @@ class ColumnDecision(BaseModel):
     note: str = ""
 
 
+# Run payloads
+class StatsRequest(BaseModel):
+    mi_mode: str = "auto"  # "auto", "exact", "sampled", or "discrete"
+    mi_sample_size: int = 200_000
+
+
+class ModelSearchRequest(BaseModel):
+    # Parameter -> list of values, or {"min": a, "max": b} for a sampled range
+    search_space: dict[str, Any] = {}
+    n_candidates: Optional[int] = None  # sample this many candidates instead of the full grid
+    resource: str = "n_samples"  # budget grown each round: "n_samples" or "n_estimators"
+    max_trees: int = 300
+    factor: int = 3
+    test_split: float = 0.2
+
+
+class DescriptivesRequest(BaseModel):
+    target: str
+    # Pages through the numeric comparisons and crosstabs
+    numeric_offset: int = 0
+    numeric_limit: int = 20
+    crosstab_offset: int = 0
+    crosstab_limit: int = 8
+
+
+class PredictRequest(BaseModel):
+    rows: list[dict[str, Any]]
+
+
 # Confirm payloads
 class ETLConfirm(BaseModel):
     target: str
@@ -43,6 +74,8 @@ class ModelConfirm(BaseModel):
 
 class EvaluateConfirm(BaseModel):
     threshold: float = 0.5
-    primary_metric: str = "recall"
+    primary_metric: str = "recall"  # "f1", "recall" (F2), "precision" (F0.5), or "cost"
+    cost_fp: float = 1.0
+    cost_fn: float = 1.0
 
 
@@ -0,0 +1,217 @@
+import base64
+import bisect
+import io
+import json
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+INDEX_DIR = "scored_index"
+# Bumped when the index layout changes, so old indexes are rebuilt rather than misread
+INDEX_FORMAT = 1
+MAX_QUERY_ROWS = 10_000
+
+
+# ---------------------------------------------------------------------------
+# Building — alongside run_scoring's CSV writes
+# ---------------------------------------------------------------------------
+
+def line_starts(data: bytes, base: int, skip: int = 0) -> np.ndarray:
+    """Byte offsets (from ``base``) of the lines in ``data``, dropping the first ``skip`` lines."""
+    ends = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == 0x0A)
+    starts = np.concatenate([[0], ends[:-1] + 1]).astype(np.int64)
+    return base + starts[skip:]
+
+
+class ScoredIndexWriter:
+    """Collects row offsets and probabilities while the scored CSV is written, then builds the index.
+
+    The index lives in ``<artifact dir>/scored_index/``:
+
+    - ``offsets.npy``: byte offset of every row's line in the CSV, plus the end of file
+    - ``order.npy``: row numbers by descending probability (ties in row order)
+    - ``probability.npy``: the CSV's (rounded) probabilities in that order
+    - ``meta.json``: the CSV's columns and size/mtime stamp, plus each segment's
+      ``[start, stop)`` range in ``order`` (segments are probability bands, so
+      every segment's rows are one contiguous slice of the sorted order)
+
+    Row offsets and probabilities go to memory-mapped files as chunks arrive;
+    only the final argsort holds the full probability column in memory.
+    """
+
+    def __init__(self, artifact_dir, n_rows: int):
+        self.root = Path(artifact_dir)
+        self.tmp = self.root / f".{INDEX_DIR}.tmp-{uuid.uuid4().hex[:8]}"
+        self.tmp.mkdir(parents=True)
+        self.offsets = np.lib.format.open_memmap(self.tmp / "offsets.npy", mode="w+", dtype=np.int64, shape=(n_rows + 1,))
+        self.probs = np.lib.format.open_memmap(self.tmp / "raw_probability.npy", mode="w+", dtype=np.float64, shape=(n_rows,))
+        self.n = 0
+
+    def add(self, data: bytes, base: int, probs: np.ndarray, header: bool = False) -> None:
+        """Record one chunk of CSV text written at byte ``base`` and its unrounded probabilities."""
+        starts = line_starts(data, base, skip=1 if header else 0)
+        if len(starts) != len(probs):
+            raise ValueError("Scored CSV rows do not line up with the index")
+        self.offsets[self.n:self.n + len(probs)] = starts
+        self.probs[self.n:self.n + len(probs)] = probs
+        self.n += len(probs)
+
+    def finish(self, csv_path: Path, segment_of: Callable[[np.ndarray], np.ndarray], n_segments: int) -> None:
+        """Sort, write the metadata and move the index into place."""
+        st = Path(csv_path).stat()
+        self.offsets[self.n] = st.st_size
+        self.offsets.flush()
+        probs = np.asarray(self.probs[:self.n])
+        order = np.argsort(-probs, kind="stable")
+        sorted_probs = probs[order]
+        np.save(self.tmp / "order.npy", order.astype(np.int64))
+        np.save(self.tmp / "probability.npy", np.round(sorted_probs, 6))
+        # Segments are non-increasing along the sorted order, highest first
+        counts = np.bincount(segment_of(sorted_probs) - 1, minlength=n_segments) if self.n else np.zeros(n_segments, dtype=np.int64)
+        segments, start = {}, 0
+        for k in range(n_segments, 0, -1):
+            segments[str(k)] = [start, start + int(counts[k - 1])]
+            start += int(counts[k - 1])
+        del self.offsets, self.probs, probs
+        (self.tmp / "raw_probability.npy").unlink()
+        meta = {
+            "format": INDEX_FORMAT,
+            "id": uuid.uuid4().hex[:12],
+            "n_rows": self.n,
+            "columns": list(pd.read_csv(csv_path, nrows=0).columns),
+            "source": [st.st_size, st.st_mtime_ns],
+            "segments": segments,
+        }
+        with open(self.tmp / "meta.json", "w") as f:
+            json.dump(meta, f, indent=2)
+        final = self.root / INDEX_DIR
+        shutil.rmtree(final, ignore_errors=True)
+        self.tmp.rename(final)
+
+    def abort(self) -> None:
+        self.offsets = self.probs = None
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+
+# ---------------------------------------------------------------------------
+# Querying
+# ---------------------------------------------------------------------------
+
+def encode_cursor(index_id: str, offset: int) -> str:
+    return base64.urlsafe_b64encode(f"{index_id}:{offset}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, index_id: str) -> int:
+    """Result offset stored in ``cursor``; ValueError if malformed or cut from another scoring run."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        cursor_id, offset = raw.rsplit(":", 1)
+        offset = int(offset)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Malformed cursor")
+    if cursor_id != index_id:
+        raise ValueError("Cursor is from a previous scoring run; start the query again")
+    if offset < 0:
+        raise ValueError("Malformed cursor")
+    return offset
+
+
+class ScoredIndex:
+    """Read side of the scored-output index; arrays are memory-mapped, so opening is cheap."""
+
+    def __init__(self, artifact_dir, csv_path: Path):
+        root = Path(artifact_dir) / INDEX_DIR
+        try:
+            with open(root / "meta.json") as f:
+                self.meta = json.load(f)
+        except OSError:
+            raise FileNotFoundError("Scored output has no index — re-run scoring")
+        st = Path(csv_path).stat()
+        if self.meta.get("format") != INDEX_FORMAT or self.meta["source"] != [st.st_size, st.st_mtime_ns]:
+            raise FileNotFoundError("Scored output index is out of date — re-run scoring")
+        self.csv_path = Path(csv_path)
+        self.offsets = np.load(root / "offsets.npy", mmap_mode="r")
+        self.order = np.load(root / "order.npy", mmap_mode="r")
+        self.probability = np.load(root / "probability.npy", mmap_mode="r")
+
+    @property
+    def id(self) -> str:
+        return self.meta["id"]
+
+    def _ranges(self, segments: Optional[Sequence[int]], prob_min: Optional[float], prob_max: Optional[float]) -> list[tuple[int, int]]:
+        """Disjoint ``[start, stop)`` ranges of sorted positions matching the filters, highest probability first."""
+        n = self.meta["n_rows"]
+        # probability is non-increasing, so each bound is a binary search (no full-column copy)
+        lo = 0 if prob_max is None else bisect.bisect_left(self.probability, -prob_max, key=lambda p: -p)
+        hi = n if prob_min is None else bisect.bisect_right(self.probability, -prob_min, key=lambda p: -p)
+        if segments is None:
+            return [(lo, hi)] if lo < hi else []
+        ranges = []
+        for k in sorted(set(segments), reverse=True):
+            start, stop = self.meta["segments"].get(str(k), (0, 0))
+            start, stop = max(start, lo), min(stop, hi)
+            if start < stop:
+                ranges.append((start, stop))
+        return ranges
+
+    def _read_rows(self, rows: np.ndarray) -> list[dict[str, Any]]:
+        if not len(rows):
+            return []
+        # Read in file order, then put the lines back in result order
+        by_file = np.argsort(rows, kind="stable")
+        lines: list[bytes] = [b""] * len(rows)
+        with open(self.csv_path, "rb") as f:
+            header = f.read(int(self.offsets[0])) if self.meta["n_rows"] else b""
+            for i in by_file:
+                r = int(rows[i])
+                f.seek(int(self.offsets[r]))
+                lines[i] = f.read(int(self.offsets[r + 1] - self.offsets[r]))
+        text = header + b"".join(lines)
+        df = pd.read_csv(io.BytesIO(text))
+        records = df.astype(object).where(df.notna(), None).to_dict("records")
+        for record, r in zip(records, rows):
+            record["row"] = int(r)
+        return records
+
+    def query(
+        self,
+        segments: Optional[Sequence[int]] = None,
+        prob_min: Optional[float] = None,
+        prob_max: Optional[float] = None,
+        top_k: Optional[int] = None,
+        offset: int = 0,
+        limit: int = 100,
+    ) -> dict[str, Any]:
+        """Rows matching the filters, by descending probability, one page at a time.
+
+        ``top_k`` caps the whole result (the k riskiest matching rows);
+        ``offset``/``limit`` page through it. Only the returned rows are
+        read from the CSV, each with a single seek.
+        """
+        ranges = self._ranges(segments, prob_min, prob_max)
+        total = sum(stop - start for start, stop in ranges)
+        if top_k is not None:
+            total = min(total, top_k)
+        end = min(offset + limit, total)
+        picked, skip = [], offset
+        for start, stop in ranges:
+            size = stop - start
+            if skip >= size:
+                skip -= size
+                continue
+            take = min(size - skip, end - offset - sum(len(p) for p in picked))
+            if take <= 0:
+                break
+            picked.append(np.asarray(self.order[start + skip:start + skip + take]))
+            skip = 0
+        rows = np.concatenate(picked) if picked else np.empty(0, dtype=np.int64)
+        return {
+            "total": int(total),
+            "offset": offset,
+            "rows": self._read_rows(rows),
+            "next_cursor": encode_cursor(self.id, end) if end < total else None,
+        }
@@ -1,16 +1,29 @@
+import os
+import shutil
+import threading
+import time
 import uuid
-from typing import Any, Optional
+from pathlib import Path
+from typing import Any, Callable, Optional
 
 STAGES = ["etl", "stats", "model", "evaluate", "scoring"]
 STAGE_ORDER = {s: i for i, s in enumerate(STAGES)}
 
+SESSIONS_DIR = Path(__file__).resolve().parent.parent / "data" / "sessions"
+SESSION_HEADER = "X-Session-ID"
+SESSION_COOKIE = "session_id"
+SESSION_TTL = float(os.environ.get("SESSION_TTL_SECONDS", 4 * 3600))
+
 
 class SessionState:
-    def __init__(self):
+    def __init__(self, root: Path = SESSIONS_DIR):
+        # Ids are only ever issued here, so a client cannot choose (or guess its way into) one
+        self.session_id = uuid.uuid4().hex
+        self.artifact_dir = root / self.session_id
+        self.last_seen = time.time()
         self.reset()
 
     def reset(self):
-        self.session_id = str(uuid.uuid4())
         self.current_stage: Optional[str] = None
         self.stage_status: dict[str, str] = {s: "pending" for s in STAGES}
         self.stage_outputs: dict[str, Any] = {}
@@ -19,6 +32,9 @@ class SessionState:
         self.dataset_summary: Optional[dict] = None
         self.agent_logs: dict[str, str] = {}
 
+    def touch(self):
+        self.last_seen = time.time()
+
     def to_dict(self):
         return {
             "session_id": self.session_id,
@@ -32,9 +48,8 @@ class SessionState:
         if idx == 0:
             if self.dataset_path is not None:
                 return True
-            # Allow if dataset already exists on disk
-            from pathlib import Path
-            default_path = next(iter(sorted((Path(__file__).resolve().parent.parent / "data").glob("*.csv"))), None)
+            # Allow if dataset already exists in this session's directory
+            default_path = next(iter(sorted(self.artifact_dir.glob("*.csv"))), None)
             if default_path and default_path.exists():
                 self.dataset_path = str(default_path)
                 return True
@@ -43,4 +58,73 @@ class SessionState:
         return self.stage_status[prev] in ("confirmed", "complete")
 
 
-session = SessionState()
+class SessionRegistry:
+    """Sessions keyed by id, each with its own artifact directory under data/sessions/.
+
+    Sessions idle for longer than ``ttl`` seconds are evicted: dropped from
+    memory, released through ``before_delete`` (cancel their jobs, unload
+    their models) and only then their artifact directory deleted.
+    """
+
+    def __init__(self, root: Path = SESSIONS_DIR, ttl: float = SESSION_TTL, sweep_interval: float = 60.0):
+        self.root = root
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self._sessions: dict[str, SessionState] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.time()
+
+    def get(self, session_id: Optional[str]) -> Optional[SessionState]:
+        return self._sessions.get(session_id) if session_id else None
+
+    def get_or_create(self, session_id: Optional[str] = None) -> SessionState:
+        """Return the live session for ``session_id``; an unknown id gets a new session with a fresh id."""
+        with self._lock:
+            session = self._sessions.get(session_id) if session_id else None
+            if session is None:
+                session = SessionState(self.root)
+                self._sessions[session.session_id] = session
+        session.touch()
+        return session
+
+    def all(self) -> list[SessionState]:
+        return list(self._sessions.values())
+
+    def remove(
+        self,
+        session_id: str,
+        before_delete: Optional[Callable[[SessionState], None]] = None,
+    ) -> Optional[SessionState]:
+        """Drop a session, release it through ``before_delete`` and then delete its artifact directory."""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is not None:
+            if before_delete is not None:
+                before_delete(session)
+            shutil.rmtree(session.artifact_dir, ignore_errors=True)
+        return session
+
+    def evict_idle(
+        self,
+        now: Optional[float] = None,
+        force: bool = False,
+        before_delete: Optional[Callable[[SessionState], None]] = None,
+    ) -> list[SessionState]:
+        """Evict sessions idle past the TTL. Runs at most once per ``sweep_interval`` unless forced."""
+        now = now or time.time()
+        if not force and now - self._last_sweep < self.sweep_interval:
+            return []
+        self._last_sweep = now
+        with self._lock:
+            idle = [s.session_id for s in self._sessions.values() if now - s.last_seen > self.ttl]
+            live = set(self._sessions)
+        evicted = [s for s in (self.remove(sid, before_delete) for sid in idle) if s is not None]
+        # Directories left behind by sessions from a previous server process
+        if self.root.exists():
+            for d in self.root.iterdir():
+                if d.is_dir() and d.name not in live and now - d.stat().st_mtime > self.ttl:
+                    shutil.rmtree(d, ignore_errors=True)
+        return evicted
+
+
+sessions = SessionRegistry()
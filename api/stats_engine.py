@@ -0,0 +1,631 @@
+from typing import Any, Iterator, Sequence
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from scipy import stats as scipy_stats
+from sklearn.feature_selection import mutual_info_classif
+
+MI_MODES = ("auto", "exact", "sampled", "discrete")
+
+# ---------------------------------------------------------------------------
+# Blockwise correlation
+# ---------------------------------------------------------------------------
+
+
+def _standardize(cols: Sequence[np.ndarray], dtype) -> tuple[np.ndarray, np.ndarray, np.ndarray | None]:
+    """Stack columns as z-scores scaled so that Z.T @ Z is the correlation matrix.
+
+    Written straight into a ``dtype`` block, one column at a time. Missing
+    values are mean-imputed (zero after centring); the third item is the
+    block's 0/1 presence mask, or None when nothing is missing. Constant or
+    all-missing columns come back as zeros and are flagged invalid.
+    """
+    n = len(cols[0]) if len(cols) else 0
+    Z = np.empty((n, len(cols)), dtype=dtype, order="F")  # column-major: filled a column at a time
+    valid = np.zeros(len(cols), dtype=bool)
+    present = None
+    for k, c in enumerate(cols):
+        c = np.asarray(c, dtype=np.float64)
+        missing = np.isnan(c)
+        if missing.any():
+            if present is None:
+                present = np.ones((n, len(cols)), dtype=dtype, order="F")
+            present[:, k] = ~missing
+            d = np.where(missing, 0.0, c - (c[~missing].mean() if not missing.all() else 0.0))
+        else:
+            d = c - c.mean() if n else c
+        ss = float(d @ d)
+        valid[k] = n - missing.sum() >= 2 and np.isfinite(ss) and ss > 0
+        Z[:, k] = d / np.sqrt(ss) if valid[k] else 0.0
+    return Z, valid, present
+
+
+def _masked_sums(A: np.ndarray, P: np.ndarray | None) -> np.ndarray:
+    """``A.T @ P``: sums of A's columns over the rows where each column of P is present."""
+    return A.T @ P if P is not None else A.sum(axis=0)[:, None]
+
+
+def _pairwise_block(Zi, Pi, Zj, Pj, C: np.ndarray) -> np.ndarray:
+    """Pairwise-complete correlations between two standardized blocks (``C = Zi.T @ Zj``).
+
+    Sums, sums of squares and counts over the rows both columns have are
+    themselves matrix products with the presence masks, so the block stays
+    vectorized. Without gaps this is ``C`` itself.
+    """
+    if Pi is None and Pj is None:
+        return C
+    n = _masked_sums(Pi, Pj) if Pi is not None else _masked_sums(Pj, Pi).T
+    sx = _masked_sums(Zi, Pj)
+    sy = _masked_sums(Zj, Pi).T
+    sxx = _masked_sums(Zi * Zi, Pj)
+    syy = _masked_sums(Zj * Zj, Pi).T
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r = (C - sx * sy / n) / np.sqrt((sxx - sx * sx / n) * (syy - sy * sy / n))
+    return np.where(n >= 2, r, np.nan)
+
+
+def correlation_blocks(
+    cols: Sequence[np.ndarray],
+    dtype=np.float32,
+    block_size: int = 256,
+) -> Iterator[tuple[int, int, np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+    """Yield the upper block triangle of the correlation matrix one block at a time.
+
+    Each item is ``(i0, j0, C, R, valid_i, valid_j)`` for columns
+    ``i0:i0+bi`` against ``j0:j0+bj`` (``j0 >= i0``): ``C`` holds the
+    correlations of the mean-imputed columns, ``R`` the pairwise-complete
+    ones (what ``DataFrame.corr`` reports; the same array when nothing is
+    missing). Only two standardized column blocks are in memory at once.
+    """
+    p = len(cols)
+    for i0 in range(0, p, block_size):
+        Zi, vi, Pi = _standardize(cols[i0:i0 + block_size], dtype)
+        for j0 in range(i0, p, block_size):
+            if j0 == i0:
+                Zj, vj, Pj = Zi, vi, Pi
+            else:
+                Zj, vj, Pj = _standardize(cols[j0:j0 + block_size], dtype)
+            C = Zi.T @ Zj
+            yield i0, j0, C, _pairwise_block(Zi, Pi, Zj, Pj, C), vi, vj
+
+
+def _pair_corr(a: np.ndarray, b: np.ndarray) -> float:
+    """Exact pairwise-complete Pearson correlation of two columns."""
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    keep = ~(np.isnan(a) | np.isnan(b))
+    a, b = a[keep] - a[keep].mean(), b[keep] - b[keep].mean()
+    denom = np.sqrt((a * a).sum() * (b * b).sum())
+    return float((a * b).sum() / denom) if denom > 0 else float("nan")
+
+
+def correlation_scan(
+    cols: Sequence[np.ndarray],
+    names: Sequence[str],
+    threshold: float = 0.85,
+    dtype=np.float64,
+    block_size: int = 256,
+    margin: float = 1e-3,
+    matrix: bool = True,
+) -> tuple[list[dict[str, Any]], np.ndarray | None]:
+    """High-correlation pairs and (optionally) the full correlation matrix from one blockwise pass.
+
+    Pairs (a, b) have pairwise-complete |corr| above ``threshold``.
+    Candidates are picked with a vectorized mask over each block using a
+    slightly lowered threshold, then confirmed with an exact float64
+    correlation so results do not depend on rounding. Pairs are ordered by
+    ``b`` then ``a``, as a column-major walk of the upper triangle would
+    produce them. The matrix is the mean-imputed one ``vif_from_corr``
+    takes (NaN rows/cols for constant columns); it needs ``dtype`` float64.
+    """
+    p = len(cols)
+    M = np.empty((p, p), dtype=np.float64) if matrix else None
+    found = []
+    for i0, j0, C, R, vi, vj in correlation_blocks(cols, dtype, block_size):
+        if M is not None:
+            C = np.where(vi[:, None] & vj[None, :], C, np.nan)
+            M[i0:i0 + C.shape[0], j0:j0 + C.shape[1]] = C
+            M[j0:j0 + C.shape[1], i0:i0 + C.shape[0]] = C.T
+        with np.errstate(invalid="ignore"):
+            mask = (np.abs(R) > threshold - margin) & vi[:, None] & vj[None, :]
+        if i0 == j0:
+            mask &= np.triu(np.ones(mask.shape, dtype=bool), k=1)
+        for ii, jj in zip(*np.nonzero(mask)):
+            i, j = i0 + int(ii), j0 + int(jj)
+            c = abs(_pair_corr(cols[i], cols[j]))
+            if c > threshold:
+                found.append((j, i, c))
+    found.sort()
+    return [{"a": names[i], "b": names[j], "corr": round(c, 4)} for j, i, c in found], M
+
+
+def high_correlation_pairs(
+    cols: Sequence[np.ndarray],
+    names: Sequence[str],
+    threshold: float = 0.85,
+    block_size: int = 256,
+    margin: float = 1e-3,
+) -> list[dict[str, Any]]:
+    """Pairs (a, b) with |corr| above ``threshold``, streamed from float32 blocks (see ``correlation_scan``)."""
+    return correlation_scan(cols, names, threshold, np.float32, block_size, margin, matrix=False)[0]
+
+
+def correlation_matrix(cols: Sequence[np.ndarray], block_size: int = 256) -> np.ndarray:
+    """Full float64 correlation matrix assembled from blocks; NaN rows/cols for constant columns."""
+    return correlation_scan(cols, [""] * len(cols), threshold=np.inf, block_size=block_size)[1]
+
+
+# ---------------------------------------------------------------------------
+# Variance inflation factors
+# ---------------------------------------------------------------------------
+
+def vif_from_corr(R: np.ndarray) -> np.ndarray:
+    """VIF for every feature in one shot: the diagonal of the inverse correlation matrix.
+
+    VIF_j = 1 / (1 - R²_j) equals [R⁻¹]_jj, so no per-column regressions are
+    needed. Rank-deficient matrices fall back to an eigen-decomposition
+    pseudo-inverse; columns that load on the null space (exact linear
+    combinations of others) get inf, as a perfect-fit regression would.
+    Constant columns (NaN on the diagonal) also get inf.
+    """
+    vif = np.full(len(R), np.inf)
+    valid = np.flatnonzero(np.isfinite(np.diag(R)))
+    if len(valid) == 0:
+        return vif
+    S = np.nan_to_num(R[np.ix_(valid, valid)], nan=0.0)
+    S = (S + S.T) / 2
+
+    try:
+        # Cholesky both tests positive-definiteness and gives the inverse cheaply
+        L_inv = np.linalg.inv(np.linalg.cholesky(S))
+        diag = (L_inv ** 2).sum(axis=0)
+        if not np.all(np.isfinite(diag)) or diag.max() > 1e12:
+            raise np.linalg.LinAlgError("numerically singular correlation matrix")
+        collinear = np.zeros(len(S), dtype=bool)
+    except np.linalg.LinAlgError:
+        w, V = np.linalg.eigh(S)
+        null = w <= len(S) * np.finfo(np.float64).eps * max(w.max(), 1.0)
+        inv_w = np.where(null, 0.0, 1.0 / np.where(null, 1.0, w))
+        diag = (V ** 2) @ inv_w
+        collinear = (np.abs(V[:, null]) > 1e-8).any(axis=1)
+
+    vif[valid] = np.where(collinear | (diag <= 0), np.inf, diag)
+    return vif
+
+
+# ---------------------------------------------------------------------------
+# Weighted Gram matrices (logistic-regression information matrix)
+# ---------------------------------------------------------------------------
+
+def _gram_block(X: np.ndarray, w: np.ndarray, lo: int, hi: int) -> np.ndarray:
+    Xc = np.asarray(X[lo:hi], dtype=np.float64)
+    wc = np.asarray(w[lo:hi], dtype=np.float64)
+    G = np.empty((Xc.shape[1] + 1, Xc.shape[1] + 1))
+    G[0, 0] = wc.sum()
+    G[0, 1:] = G[1:, 0] = wc @ Xc
+    # sqrt(w)·X keeps the temporary at one chunk and the product symmetric
+    Xw = Xc * np.sqrt(wc)[:, None]
+    G[1:, 1:] = Xw.T @ Xw
+    return G
+
+
+def weighted_gram(X: np.ndarray, w: np.ndarray, chunk_rows: int = 65_536, n_jobs: int = -1) -> np.ndarray:
+    """[1, X]ᵀ diag(w) [1, X] over all rows, accumulated in row chunks.
+
+    The intercept column is never materialised and each chunk's weighted
+    copy is the only temporary. Chunks are summed by a thread pool (the
+    matrix products release the GIL, and threads share ``X`` without
+    copying it), each worker returning its partial sum.
+    """
+    n = len(X)
+    bounds = [(lo, min(lo + chunk_rows, n)) for lo in range(0, n, chunk_rows)] or [(0, 0)]
+    n_jobs = _effective_jobs(n, X.shape[1] if X.ndim > 1 else 1, n_jobs)
+    if n_jobs == 1 or len(bounds) == 1:
+        parts = (_gram_block(X, w, lo, hi) for lo, hi in bounds)
+    else:
+        parts = Parallel(n_jobs=n_jobs, prefer="threads")(delayed(_gram_block)(X, w, lo, hi) for lo, hi in bounds)
+    return sum(parts)
+
+
+# ---------------------------------------------------------------------------
+# Chi-squared independence tests
+# ---------------------------------------------------------------------------
+
+def _effective_jobs(n_rows: int, n_cols: int, n_jobs: int) -> int:
+    # Process pools only pay off once there is real work to spread
+    return 1 if n_rows * n_cols < 2_000_000 else n_jobs
+
+
+def chi2_codes(values: np.ndarray, n_bins: int = 10, max_levels: int = 1000) -> tuple[np.ndarray, bool]:
+    """Integer codes for a contingency table (-1 = missing) and whether the column was binned.
+
+    Integer-valued columns with at most ``max_levels`` distinct values keep
+    one level per value (as a crosstab would). Anything continuous or with
+    more levels is cut into ``n_bins`` quantile bins so the table stays
+    small and the test keeps its power.
+    """
+    v = np.asarray(values)
+    if v.dtype.kind in "biu":
+        codes, uniques = pd.factorize(v)
+        if len(uniques) <= max_levels:
+            return codes.astype(np.int64), False
+    v = v.astype(np.float64)
+    finite = ~np.isnan(v)
+    integral = np.all(v[finite] == np.round(v[finite]))
+    if integral:
+        codes, uniques = pd.factorize(v)  # NaN -> -1
+        if len(uniques) <= max_levels:
+            return codes.astype(np.int64), False
+    edges = np.unique(np.quantile(v[finite], np.linspace(0, 1, n_bins + 1))) if finite.any() else np.empty(0)
+    codes = np.searchsorted(edges[1:-1], v, side="right").astype(np.int64)
+    codes[~finite] = -1
+    return codes, True
+
+
+def _chi2_one(values: np.ndarray, y_codes: np.ndarray, n_classes: int, n_bins: int, max_levels: int) -> tuple[float, bool]:
+    codes, binned = chi2_codes(values, n_bins, max_levels)
+    keep = codes >= 0
+    n_levels = int(codes.max()) + 1 if keep.any() else 0
+    table = np.bincount(codes[keep] * n_classes + y_codes[keep], minlength=n_levels * n_classes)
+    table = table.reshape(n_levels, n_classes)
+    table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+    try:
+        _, p, _, _ = scipy_stats.chi2_contingency(table)
+        return float(p), binned
+    except Exception:
+        return 1.0, binned
+
+
+def chi2_pvalues(
+    cols: Sequence[np.ndarray],
+    names: Sequence[str],
+    y: np.ndarray,
+    n_bins: int = 10,
+    max_levels: int = 1000,
+    n_jobs: int = -1,
+) -> dict[str, dict[str, Any]]:
+    """Chi-squared p-value of every column against ``y``, built from bincount tables, run in parallel."""
+    y_codes, y_levels = pd.factorize(np.asarray(y))
+    n_classes = len(y_levels)
+    y_codes = y_codes.astype(np.int64)
+    results = Parallel(n_jobs=_effective_jobs(len(y_codes), len(cols), n_jobs))(
+        delayed(_chi2_one)(c, y_codes, n_classes, n_bins, max_levels) for c in cols
+    )
+    return {name: {"p_value": p, "binned": binned} for name, (p, binned) in zip(names, results)}
+
+
+# ---------------------------------------------------------------------------
+# Rank tests (Mann-Whitney U / Kruskal-Wallis) from grouped rank sums
+# ---------------------------------------------------------------------------
+
+# Cells (rows × columns) ranked per batch; bounds the working memory at
+# roughly 48 bytes per cell
+RANK_BLOCK_CELLS = 4_000_000
+# Below this group size scipy's exact Mann-Whitney distribution is used
+MWU_EXACT_MAX = 8
+
+
+def rank_sums(block: np.ndarray, y_codes: np.ndarray, n_classes: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per-class rank sums, non-null counts and tie terms for every column of ``block``.
+
+    Every column is ranked once (one argsort of the whole block), ties get
+    their average rank and NaNs are left out. Returns ``(R, n, ties)`` with
+    ``R`` and ``n`` shaped (columns, classes) and ``ties[j]`` = Σ(t³ − t)
+    over column ``j``'s tie groups. ``y_codes`` must be in ``[0, n_classes)``.
+    """
+    n_rows, n_cols = block.shape
+    order = np.argsort(block, axis=0, kind="stable")  # NaNs sort last
+    # Column-major flattening: one pass finds the tie groups of all columns
+    values = np.take_along_axis(block, order, axis=0).T.ravel()
+    classes = y_codes[order].T.ravel()
+    col = np.repeat(np.arange(n_cols), n_rows)
+    starts = np.ones(len(values), dtype=bool)
+    starts[1:] = values[1:] != values[:-1]
+    starts[::n_rows] = True
+    group = np.cumsum(starts) - 1
+    first = np.flatnonzero(starts) % n_rows
+    sizes = np.bincount(group).astype(np.float64)
+    ranks = (first + (sizes + 1) / 2)[group]
+    valid = ~np.isnan(values)
+    cell = col * n_classes + classes
+    R = np.bincount(cell[valid], weights=ranks[valid], minlength=n_cols * n_classes)
+    n = np.bincount(cell[valid], minlength=n_cols * n_classes).astype(np.float64)
+    group_valid = valid[starts]
+    ties = np.bincount(col[starts][group_valid], weights=(sizes ** 3 - sizes)[group_valid], minlength=n_cols)
+    return R.reshape(n_cols, n_classes), n.reshape(n_cols, n_classes), ties
+
+
+def _rank_test(R: np.ndarray, n: np.ndarray, ties: float) -> dict[str, Any]:
+    present = n > 0
+    R, n = R[present], n[present]
+    if len(n) < 2:
+        raise ValueError("Fewer than two target classes have values")
+    N = n.sum()
+    if len(n) == 2:
+        n1, n2 = n
+        U1 = R[0] - n1 * (n1 + 1) / 2
+        U = max(U1, n1 * n2 - U1)
+        sd = np.sqrt(n1 * n2 / 12 * ((N + 1) - ties / (N * (N - 1))))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = (U - n1 * n2 / 2 - 0.5) / sd
+        p = min(2 * scipy_stats.norm.sf(z), 1.0)
+        return {"test": "Mann-Whitney U", "statistic": float(U1), "p_value": float(p)}
+    correction = 1 - ties / (N ** 3 - N)
+    if correction <= 0:
+        raise ValueError("All numbers are identical in kruskal")
+    H = (12 / (N * (N + 1)) * np.sum(R ** 2 / n) - 3 * (N + 1)) / correction
+    return {"test": "Kruskal-Wallis", "statistic": float(H), "p_value": float(scipy_stats.chi2.sf(H, len(n) - 1))}
+
+
+def rank_tests(
+    cols: Sequence[np.ndarray],
+    y_codes: np.ndarray,
+    n_classes: int,
+    max_cells: int = RANK_BLOCK_CELLS,
+) -> list[dict[str, Any]]:
+    """Mann-Whitney U (two classes) or Kruskal-Wallis H of every column against ``y_codes``.
+
+    Columns are stacked into blocks of at most ``max_cells`` cells and
+    ranked together (see ``rank_sums``), so memory stays bounded however
+    many columns there are; ``cols`` may be memory-mapped. Statistics and
+    p-values match ``scipy.stats.mannwhitneyu`` / ``kruskal`` with tie
+    correction, including scipy's exact test for small tie-free groups.
+    Per-column failures come back as ``{"error": ...}``.
+    """
+    y_codes = np.asarray(y_codes, dtype=np.int64)
+    per_block = max(1, max_cells // max(len(y_codes), 1))
+    out: list[dict[str, Any]] = []
+    for lo in range(0, len(cols), per_block):
+        group = cols[lo:lo + per_block]
+        block = np.column_stack([np.asarray(c, dtype=np.float64) for c in group])
+        R, n, ties = rank_sums(block, y_codes, n_classes)
+        for j in range(len(group)):
+            try:
+                result = _rank_test(R[j], n[j], ties[j])
+                sizes = n[j][n[j] > 0]
+                if len(sizes) == 2 and sizes.min() <= MWU_EXACT_MAX and ties[j] == 0:
+                    a, b = np.flatnonzero(n[j] > 0)
+                    x = block[:, j]
+                    result["p_value"] = float(scipy_stats.mannwhitneyu(
+                        x[(y_codes == a) & ~np.isnan(x)], x[(y_codes == b) & ~np.isnan(x)],
+                        alternative="two-sided",
+                    ).pvalue)
+            except Exception as e:
+                result = {"error": str(e)}
+            out.append(result)
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Mutual information
+# ---------------------------------------------------------------------------
+
+def stratified_sample(y_codes: np.ndarray, sample_size: int, seed: int = 42) -> np.ndarray:
+    """Sorted row indices of a class-stratified sample of about ``sample_size`` rows.
+
+    Classes small enough to fit in half the budget (the fraud rows) are kept
+    whole; the rest of the budget is split across the larger classes in
+    proportion to their size.
+    """
+    n = len(y_codes)
+    if n <= sample_size:
+        return np.arange(n)
+    rng = np.random.default_rng(seed)
+    counts = np.bincount(y_codes)
+    small = counts <= sample_size // 2
+    budget = max(sample_size - int(counts[small].sum()), 0)
+    large_total = int(counts[~small].sum())
+    picks = []
+    for cls, count in enumerate(counts):
+        idx = np.flatnonzero(y_codes == cls)
+        if small[cls]:
+            picks.append(idx)
+        else:
+            take = max(1, int(round(budget * count / large_total)))
+            picks.append(rng.choice(idx, size=min(take, count), replace=False))
+    return np.sort(np.concatenate(picks))
+
+
+def discrete_mutual_info(codes: np.ndarray, y_codes: np.ndarray, n_classes: int) -> float:
+    """Plug-in mutual information (nats) of two integer-coded variables from a bincount table.
+
+    The Miller-Madow term removes the upward bias the plug-in estimate has
+    for features with many levels.
+    """
+    keep = codes >= 0
+    n = int(keep.sum())
+    if n == 0:
+        return 0.0
+    n_levels = int(codes.max()) + 1
+    joint = np.bincount(codes[keep] * n_classes + y_codes[keep], minlength=n_levels * n_classes)
+    joint = joint.reshape(n_levels, n_classes) / n
+    px = joint.sum(axis=1, keepdims=True)
+    py = joint.sum(axis=0, keepdims=True)
+    nz = joint > 0
+    mi = (joint[nz] * np.log(joint[nz] / (px @ py)[nz])).sum()
+    bias = (np.count_nonzero(px) - 1) * (np.count_nonzero(py) - 1) / (2 * n)
+    return float(max(mi - bias, 0.0))
+
+
+def _entropy(y_codes: np.ndarray) -> float:
+    p = np.bincount(y_codes) / len(y_codes)
+    p = p[p > 0]
+    return float(-(p * np.log(p)).sum())
+
+
+def _plug_in_one(values: np.ndarray, y_codes: np.ndarray, n_classes: int, n_bins: int, max_levels: int) -> float:
+    codes, _ = chi2_codes(values, n_bins, max_levels)
+    return discrete_mutual_info(codes, y_codes, n_classes)
+
+
+def _knn_mi(cols: Sequence[np.ndarray], y: np.ndarray, rows: np.ndarray | None, n_jobs: int, random_state: int) -> np.ndarray:
+    """k-NN mutual information of every column, from one ``mutual_info_classif`` call.
+
+    One call over the stacked (mean-imputed) columns draws the same
+    tie-breaking noise as the baseline ``mutual_info_classif(X, y)``, so
+    full-data scores match it exactly; features are spread over ``n_jobs``.
+    """
+    n = len(y) if rows is None else len(rows)
+    X = np.empty((n, len(cols)), dtype=np.float64, order="F")
+    for k, c in enumerate(cols):
+        x = np.asarray(c, dtype=np.float64)
+        x = x if rows is None else x[rows]
+        missing = np.isnan(x)
+        X[:, k] = np.where(missing, np.nanmean(x) if (~missing).any() else 0.0, x) if missing.any() else x
+    y = y if rows is None else y[rows]
+    return mutual_info_classif(X, y, discrete_features=False, random_state=random_state, n_jobs=n_jobs)
+
+
+def mutual_info_scores(
+    cols: Sequence[np.ndarray],
+    names: Sequence[str],
+    y: np.ndarray,
+    mode: str = "auto",
+    sample_size: int = 200_000,
+    n_bins: int = 10,
+    max_levels: int = 1000,
+    n_jobs: int = -1,
+    random_state: int = 42,
+) -> dict[str, dict[str, Any]]:
+    """Mutual information of every column with ``y``, features spread over ``n_jobs`` workers.
+
+    Modes:
+      - ``exact``: k-NN estimator (``mutual_info_classif``) on every row for every feature.
+      - ``sampled``: k-NN on a stratified subsample that keeps every minority-class row.
+      - ``discrete``: opt-in plug-in estimate from integer codes (continuous columns quantile-binned).
+      - ``auto``: ``exact`` up to ``sample_size`` rows, ``sampled`` beyond.
+
+    Each result carries the method used (``knn``, ``knn_sampled`` or
+    ``plug_in``), the rows it saw, whether it was rescaled and a confidence
+    label: ``exact`` only for the k-NN estimator on every row, otherwise
+    ``approximate``. Subsampled k-NN scores are rescaled by the ratio of
+    population to sample label entropy, which keeps them on the same scale
+    as full-data scores but is only a first-order correction.
+    """
+    if mode not in MI_MODES:
+        raise ValueError(f"Unknown mutual information mode '{mode}' (expected one of {', '.join(MI_MODES)})")
+    y_codes, y_levels = pd.factorize(np.asarray(y))
+    y_codes = y_codes.astype(np.int64)
+    n_classes = len(y_levels)
+    jobs = _effective_jobs(len(y_codes), len(cols), n_jobs)
+    if mode == "discrete":
+        scores = Parallel(n_jobs=jobs)(
+            delayed(_plug_in_one)(c, y_codes, n_classes, n_bins, max_levels) for c in cols
+        )
+        method, n_rows, rescaled = "plug_in", len(y_codes), False
+    else:
+        rows = None
+        if mode == "sampled" or (mode == "auto" and len(y_codes) > sample_size):
+            rows = stratified_sample(y_codes, sample_size, random_state)
+            if len(rows) == len(y_codes):
+                rows = None
+        scores = _knn_mi(cols, y_codes, rows, jobs, random_state) if cols else []
+        method, n_rows, rescaled = "knn", len(y_codes), False
+        if rows is not None:
+            # The sample over-represents the minority class; scale back to the population's label entropy
+            h_sample = _entropy(y_codes[rows])
+            scores = np.asarray(scores) * (_entropy(y_codes) / h_sample if h_sample > 0 else 0.0)
+            method, n_rows, rescaled = "knn_sampled", len(rows), True
+    return {
+        name: {
+            "mutual_info": round(float(mi), 6),
+            "mi_method": method,
+            "mi_rows": n_rows,
+            "mi_rescaled": rescaled,
+            "mi_confidence": "exact" if method == "knn" else "approximate",
+        }
+        for name, mi in zip(names, scores)
+    }
+
+
+# ---------------------------------------------------------------------------
+# Threshold curves
+# ---------------------------------------------------------------------------
+
+THRESHOLD_METRICS = ("f1", "recall", "precision", "cost")
+_METRIC_BETA = {"f1": 1.0, "recall": 2.0, "precision": 0.5}
+
+
+def threshold_curve(y_true: np.ndarray, y_score: np.ndarray, cost_fp: float = 1.0, cost_fn: float = 1.0) -> dict[str, np.ndarray]:
+    """Confusion counts and derived metrics at every distinct score threshold.
+
+    Scores are sorted once; cumulative sums of the labels then give TP/FP for
+    "predict positive when score >= t" at each distinct ``t`` (descending).
+    """
+    y_true = np.asarray(y_true).astype(bool)
+    y_score = np.asarray(y_score, dtype=np.float64)
+    order = np.argsort(-y_score, kind="mergesort")
+    s, y = y_score[order], y_true[order]
+    last = np.r_[np.flatnonzero(np.diff(s)), len(s) - 1]  # last row of each run of equal scores
+    tp = np.cumsum(y)[last].astype(np.float64)
+    fp = (last + 1) - tp
+    pos = float(y.sum())
+    neg = float(len(y)) - pos
+    fn = pos - tp
+    tn = neg - fp
+    with np.errstate(invalid="ignore", divide="ignore"):
+        precision = np.where(tp + fp > 0, tp / (tp + fp), 1.0)
+        recall = tp / pos if pos else np.zeros_like(tp)
+        fpr = fp / neg if neg else np.zeros_like(fp)
+    curve = {
+        "threshold": s[last],
+        "tp": tp, "fp": fp, "fn": fn, "tn": tn,
+        "precision": precision,
+        "recall": recall,
+        "fpr": fpr,
+        "cost": cost_fp * fp + cost_fn * fn,
+    }
+    for name, beta in _METRIC_BETA.items():
+        b2 = beta * beta
+        denom = b2 * precision + recall
+        with np.errstate(invalid="ignore", divide="ignore"):
+            curve[f"f{beta:g}"] = np.where(denom > 0, (1 + b2) * precision * recall / denom, 0.0)
+    return curve
+
+
+def best_threshold_index(curve: dict[str, np.ndarray], metric: str) -> int:
+    """Index of the optimal threshold for ``metric``.
+
+    ``f1`` maximises F1, ``recall`` and ``precision`` maximise F2 and F0.5
+    (so neither degenerates to an extreme threshold) and ``cost`` minimises
+    ``cost_fp * FP + cost_fn * FN``. Ties go to the highest threshold.
+    """
+    if metric == "cost":
+        return int(np.argmin(curve["cost"]))
+    return int(np.argmax(curve[f"f{_METRIC_BETA[metric]:g}"]))
+
+
+def threshold_objective(metric: str) -> dict[str, str]:
+    """The curve column ``best_threshold_index`` optimises for ``metric`` and a plain description of it.
+
+    Returned with every tuned threshold, so a ``recall`` or ``precision``
+    result is not read as the raw metric's optimum (which is degenerate).
+    """
+    if metric == "cost":
+        return {"objective": "cost", "description": "minimise cost_fp * FP + cost_fn * FN"}
+    beta = _METRIC_BETA[metric]
+    if beta == 1.0:
+        return {"objective": "f1", "description": "maximise F1"}
+    favours = "recall over precision" if beta > 1 else "precision over recall"
+    return {
+        "objective": f"f{beta:g}",
+        "description": f"maximise F{beta:g} (F-beta with beta={beta:g}, weighting {favours})",
+    }
+
+
+def curve_auc(curve: dict[str, np.ndarray]) -> dict[str, float]:
+    """ROC AUC (trapezoidal, as sklearn) and average precision from a threshold curve."""
+    tpr = np.r_[0.0, curve["recall"]]
+    fpr = np.r_[0.0, curve["fpr"]]
+    roc_auc = float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+    ap = float(np.sum(np.diff(tpr) * curve["precision"]))
+    return {"roc_auc": roc_auc, "average_precision": ap}
+
+
+def downsample_curve(curve: dict[str, np.ndarray], max_points: int = 200, keep: Sequence[int] = ()) -> list[dict[str, float]]:
+    """At most ``max_points`` evenly spaced curve points (plus ``keep`` indices) for plotting."""
+    n = len(curve["threshold"])
+    idx = np.unique(np.r_[np.linspace(0, n - 1, min(n, max_points)).round().astype(np.int64), list(keep)]).astype(np.int64)
+    fields = ("threshold", "precision", "recall", "fpr", "f1", "cost")
+    return [{f: round(float(curve[f][i]), 6) for f in fields} for i in idx]
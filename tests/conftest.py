@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from api import main, pipeline_runner, result_cache, state
+from api.schemas import ColumnDecision, ETLConfirm
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """Isolated data directory: stores, result cache and sessions all live under ``tmp_path``."""
+    cache = result_cache.ResultCache(tmp_path / "cache")
+    monkeypatch.setattr(result_cache, "results", cache)
+    monkeypatch.setattr(main, "results", cache)
+    monkeypatch.setattr(pipeline_runner, "DATA", tmp_path)
+    monkeypatch.setattr(main, "DATA", tmp_path)
+    monkeypatch.setattr(state.sessions, "root", tmp_path / "sessions")
+    return tmp_path
+
+
+def make_fraud_frame(n: int = 3000, seed: int = 0) -> pd.DataFrame:
+    """Small fraud-like dataset: numeric, integer, categorical (with blanks) and a rare target."""
+    rng = np.random.default_rng(seed)
+    amount = rng.gamma(2.0, 50.0, n).round(2)
+    merchant = rng.choice(["grocery", "travel", "online", "fuel"], n).astype(object)
+    merchant[rng.random(n) < 0.05] = None
+    n_txn = rng.integers(0, 20, n)
+    score = 0.02 * amount + 1.5 * (merchant == "online") + 0.1 * n_txn + rng.normal(size=n)
+    return pd.DataFrame({
+        "amount": amount,
+        "amount_usd": amount * 1.1 + rng.normal(scale=0.5, size=n).round(2),
+        "merchant": merchant,
+        "n_txn": n_txn,
+        "noise": rng.normal(size=n).round(4),
+        "is_fraud": (score > np.quantile(score, 0.9)).astype(int),
+    })
+
+
+@pytest.fixture
+def fraud_csv(workspace):
+    path = workspace / "fraud.csv"
+    make_fraud_frame().to_csv(path, index=False)
+    return path
+
+
+def keep_all(columns, target: str = "is_fraud") -> ETLConfirm:
+    return ETLConfirm(target=target, columns=[ColumnDecision(column=c, decision="keep") for c in columns])
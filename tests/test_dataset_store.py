@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder
+
+from api.dataset_store import (
+    compact_array,
+    iter_chunks,
+    load_columns,
+    load_matrix,
+    prune_stores,
+    read_meta,
+    source_hash,
+    widen,
+)
+from api.pipeline_runner import apply_etl_decisions
+from conftest import keep_all
+
+
+def test_compact_columns_widen_back_to_exact_values():
+    rng = np.random.default_rng(0)
+    for values in (
+        rng.integers(-100, 100, 1000).astype(np.int64),
+        rng.integers(0, 70_000, 1000).astype(np.float64),
+        rng.normal(size=1000).round(2),
+        np.r_[rng.normal(size=999), np.nan],
+    ):
+        np.testing.assert_array_equal(widen(compact_array(values)), values)
+
+
+def test_cleaned_store_matches_baseline_encoding(fraud_csv, workspace):
+    etl = apply_etl_decisions(str(fraud_csv), keep_all(pd.read_csv(fraud_csv, nrows=0).columns), str(workspace / "s"))
+    df = pd.read_csv(fraud_csv)
+    stored = load_columns(etl["cleaned_path"], exact=True)
+
+    for col in ("amount", "amount_usd", "n_txn", "noise", "is_fraud"):
+        np.testing.assert_array_equal(stored[col].to_numpy(), df[col].to_numpy())
+    # Non-null categories get LabelEncoder's codes over the string values
+    present = df["merchant"].notna().to_numpy()
+    expected = LabelEncoder().fit(df["merchant"].dropna().astype(str)).transform(df["merchant"].dropna().astype(str))
+    np.testing.assert_array_equal(stored["merchant"].to_numpy()[present], expected)
+    assert (stored["merchant"].to_numpy()[~present] == len(read_meta(etl["cleaned_path"])["encodings"]["merchant"])).all()
+
+    X = load_matrix(etl["cleaned_path"], ["amount", "n_txn"], dtype=np.float64)
+    np.testing.assert_array_equal(X, df[["amount", "n_txn"]].to_numpy(dtype=np.float64))
+    chunks = list(iter_chunks(etl["cleaned_path"], ["noise"], chunk_rows=700))
+    assert [len(c) for c in chunks] == [700, 700, 700, 700, 200]
+
+
+def test_store_is_keyed_by_content(fraud_csv, workspace):
+    decisions = keep_all(pd.read_csv(fraud_csv, nrows=0).columns)
+    first = apply_etl_decisions(str(fraud_csv), decisions, str(workspace / "a"))
+    copy = workspace / "copy.csv"
+    copy.write_bytes(fraud_csv.read_bytes())
+    mtime = (workspace / "store" / first["dataset_hash"] / "meta.json").stat().st_mtime_ns
+    second = apply_etl_decisions(str(copy), decisions, str(workspace / "b"))
+
+    assert source_hash(str(copy)) == source_hash(str(fraud_csv))
+    assert second["cleaned_path"] == first["cleaned_path"]
+    assert (workspace / "store" / first["dataset_hash"] / "meta.json").stat().st_mtime_ns == mtime
+
+    assert prune_stores(workspace / "store", keep={first["dataset_hash"]}) == []
+    assert prune_stores(workspace / "store", keep=set()) == [first["dataset_hash"]]
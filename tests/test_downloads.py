@@ -0,0 +1,84 @@
+import gzip
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from api import downloads
+from api.downloads import ScoredExport, etag_matches, negotiate_compression
+from api.main import SESSION_HEADER, app
+from conftest import make_fraud_frame
+
+
+@pytest.fixture
+def scored_csv(workspace, monkeypatch):
+    # Small chunks so every export is written (and streamed) in several pieces
+    monkeypatch.setattr(downloads, "EXPORT_CHUNK_ROWS", 500)
+    monkeypatch.setattr(downloads, "COPY_CHUNK_BYTES", 4096)
+    df = make_fraud_frame(3000)
+    df["fraud_probability"] = (df["amount"] / df["amount"].max()).round(6)
+    path = workspace / "scored_output.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+def test_negotiate_compression():
+    assert negotiate_compression(None) == "none"
+    assert negotiate_compression("identity") == "none"
+    assert negotiate_compression("gzip, deflate") == "gzip"
+    assert negotiate_compression("gzip, zstd") == "zstd"
+    assert negotiate_compression("gzip, zstd;q=0.5") == "gzip"
+    assert negotiate_compression("*;q=0.3, gzip;q=0") == "zstd"
+
+
+def test_etag_matches():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"x"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
+
+
+def test_exports_are_deterministic_and_lossless(scored_csv):
+    export = ScoredExport(scored_csv, compression="gzip")
+    streamed = b"".join(export.stream())
+    assert gzip.decompress(streamed) == scored_csv.read_bytes()
+    export.path.unlink()
+    assert ScoredExport(scored_csv, compression="gzip").build().read_bytes() == streamed
+
+    cols = ["merchant", "fraud_probability"]
+    projected = b"".join(ScoredExport(scored_csv, columns=cols).stream())
+    baseline = pd.read_csv(scored_csv, usecols=cols, dtype=str, keep_default_na=False)[cols]
+    assert projected == baseline.to_csv(index=False).encode()
+
+
+def test_dropped_stream_still_completes_the_cached_file(scored_csv):
+    export = ScoredExport(scored_csv, compression="gzip")
+    stream = export.stream()
+    next(stream)
+    stream.close()  # client went away after the first block
+    assert gzip.decompress(export.build().read_bytes()) == scored_csv.read_bytes()
+
+
+def test_conditional_and_range_requests(workspace, scored_csv):
+    client = TestClient(app)
+    sid = client.get("/status").headers[SESSION_HEADER]
+    session_dir = workspace / "sessions" / sid
+    session_dir.mkdir(parents=True, exist_ok=True)
+    scored_csv.replace(session_dir / "scored_output.csv")
+    url = "/download/scored?compression=gzip"
+
+    full = client.get(url)
+    assert full.status_code == 200
+    body, etag = full.content, full.headers["etag"]
+    assert gzip.decompress(body) == (session_dir / "scored_output.csv").read_bytes()
+
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    part = client.get(url, headers={"Range": "bytes=100-1099", "If-Range": etag})
+    assert part.status_code == 206
+    assert part.content == body[100:1100]
+    assert part.headers["content-range"] == f"bytes 100-1099/{len(body)}"
+
+    stale = client.get(url, headers={"Range": "bytes=100-1099", "If-Range": '"stale"'})
+    assert stale.status_code == 200
+    assert stale.content == body
@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder
+
+from api.encoding import UNKNOWN_CODE, encode_value, fit_transform, null_code, transform, value_lookup
+
+
+def test_fit_transform_matches_label_encoder():
+    s = pd.Series(["b", "a", None, "c", "a", np.nan, "b"], dtype=object)
+    codes, vocab = fit_transform(s)
+    present = s.notna().to_numpy()
+    expected = LabelEncoder().fit(s[present].astype(str))
+    assert vocab == list(expected.classes_)
+    np.testing.assert_array_equal(codes[present], expected.transform(s[present].astype(str)))
+    assert (codes[~present] == null_code(vocab)).all()
+
+
+def test_transform_maps_unseen_and_nulls():
+    _, vocab = fit_transform(pd.Series(["no", "yes", "no"]))
+    new = pd.Series(["yes", "maybe", None, "no"], dtype=object)
+    np.testing.assert_array_equal(transform(new, vocab), [1, UNKNOWN_CODE, null_code(vocab), 0])
+
+
+def test_encode_value_agrees_with_transform():
+    s = pd.Series(["x", "y", None, 3, "3", "z"], dtype=object)
+    _, vocab = fit_transform(s.iloc[:5])
+    lookup = value_lookup(vocab)
+    assert [encode_value(v, lookup) for v in s] == transform(s, vocab).tolist()
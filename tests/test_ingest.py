@@ -0,0 +1,59 @@
+import gzip
+import hashlib
+
+import pytest
+
+from api.ingest import UploadSink, csv_name, upload_compression
+from conftest import make_fraud_frame
+
+zstandard = pytest.importorskip("zstandard")
+
+
+@pytest.fixture
+def csv_bytes():
+    return make_fraud_frame(2000).to_csv(index=False).encode()
+
+
+def _upload(tmp_path, payload: bytes, compression, chunk: int = 4096):
+    sink = UploadSink(tmp_path / "part", compression)
+    for i in range(0, len(payload), chunk):
+        sink.write(payload[i:i + chunk])
+    dest = tmp_path / f"upload-{compression}.csv"
+    digest, profile = sink.finish(dest)
+    return dest.read_bytes(), digest, profile
+
+
+def test_compressed_uploads_land_as_identical_csv(tmp_path, csv_bytes):
+    half = len(csv_bytes) // 2
+    payloads = {
+        None: csv_bytes,
+        "gzip": gzip.compress(csv_bytes),
+        "zstd": zstandard.ZstdCompressor().compress(csv_bytes),
+    }
+    multi_member = gzip.compress(csv_bytes[:half]) + gzip.compress(csv_bytes[half:])
+    multi_frame = b"".join(zstandard.ZstdCompressor().compress(p) for p in (csv_bytes[:half], csv_bytes[half:]))
+
+    results = [_upload(tmp_path, p, c) for c, p in payloads.items()]
+    results += [_upload(tmp_path, multi_member, "gzip"), _upload(tmp_path, multi_frame, "zstd")]
+    for data, digest, profile in results:
+        assert data == csv_bytes
+        assert digest == hashlib.sha256(csv_bytes).hexdigest()
+        assert profile.rows == 2000
+        assert profile.columns["merchant"].top_counts == results[0][2].columns["merchant"].top_counts
+
+
+def test_truncated_upload_is_rejected(tmp_path, csv_bytes):
+    sink = UploadSink(tmp_path / "part", "gzip")
+    sink.write(gzip.compress(csv_bytes)[:-100])
+    with pytest.raises(ValueError, match="truncated"):
+        sink.finish(tmp_path / "out.csv")
+    sink.abort()
+    assert not (tmp_path / "part").exists() and not (tmp_path / "out.csv").exists()
+
+
+def test_upload_names():
+    assert upload_compression("Data.CSV.GZ") == "gzip"
+    assert upload_compression("data.csv") is None
+    assert csv_name("dir/data.csv.zst") == "data.csv"
+    with pytest.raises(ValueError):
+        upload_compression("data.xlsx")
@@ -0,0 +1,68 @@
+import threading
+import time
+
+import pytest
+
+from api.jobs import JobManager, report_progress
+
+
+def _square(x):
+    report_progress(0.5, "halfway")
+    return x * x
+
+
+def _fail():
+    raise RuntimeError("boom")
+
+
+def _sleep(seconds):
+    time.sleep(seconds)
+    return "done"
+
+
+@pytest.fixture
+def manager():
+    m = JobManager(max_workers=1)
+    yield m
+    m.shutdown()
+
+
+def _wait(job, timeout=60):
+    deadline = time.time() + timeout
+    while job.status not in ("succeeded", "failed", "cancelled"):
+        assert time.time() < deadline, f"job stuck in {job.status}"
+        time.sleep(0.05)
+    return job
+
+
+def test_jobs_run_in_workers_and_fire_callbacks(manager):
+    finished = threading.Event()
+    job = manager.submit("demo", _square, {"x": 7}, on_success=lambda j: finished.set(), owner="a")
+    assert _wait(job).status == "succeeded"
+    assert job.result == 49 and job.progress == 1.0
+    assert finished.is_set()
+    assert manager.get(job.job_id, owner="b") is None
+    assert [j.job_id for j in manager.list(owner="a")] == [job.job_id]
+
+    failed = _wait(manager.submit("demo", _fail, {}))
+    assert failed.status == "failed" and "boom" in failed.error
+
+
+def test_cancel_stops_running_and_queued_jobs(manager):
+    cancelled = []
+    running = manager.submit("slow", _sleep, {"seconds": 60}, on_cancel=cancelled.append)
+    queued = manager.submit("slow", _sleep, {"seconds": 60})
+    deadline = time.time() + 60
+    while running.status != "running":
+        assert time.time() < deadline
+        time.sleep(0.05)
+
+    started = time.time()
+    manager.cancel(running.job_id)
+    manager.cancel(queued.job_id)
+    assert time.time() - started < 10
+    assert running.status == queued.status == "cancelled"
+    assert cancelled == [running]
+
+    # The replacement worker picks up new work
+    assert _wait(manager.submit("demo", _square, {"x": 3})).result == 9
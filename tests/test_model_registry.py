@@ -0,0 +1,68 @@
+import joblib
+import pytest
+
+from api.model_registry import (
+    ModelCache,
+    forget_models,
+    latest_version,
+    list_models,
+    load_model,
+    model_info,
+    resolve_version,
+    save_model,
+    set_latest,
+)
+
+
+def test_versions_are_numbered_and_latest_tracks_the_newest(tmp_path):
+    assert latest_version(tmp_path) is None
+    with pytest.raises(KeyError):
+        resolve_version(tmp_path)
+
+    v1 = save_model(tmp_path, {"w": 1}, {"model_type": "rf", "dataset_hash": "abc"})
+    v2 = save_model(tmp_path, {"w": 2}, {"model_type": "rf", "dataset_hash": "abc"})
+    assert (v1, v2) == ("v0001", "v0002")
+    assert latest_version(tmp_path) == resolve_version(tmp_path) == v2
+    assert model_info(tmp_path, v1)["version"] == v1
+    assert [m["version"] for m in list_models(tmp_path)] == [v1, v2]
+    assert load_model(tmp_path) == {"w": 2}
+    assert load_model(tmp_path, v1) == {"w": 1}
+
+    set_latest(tmp_path, v1)
+    assert resolve_version(tmp_path) == v1
+    for bad in ("v0009", "../v0001", "latest"):
+        with pytest.raises(KeyError):
+            resolve_version(tmp_path, bad)
+    forget_models(tmp_path)
+
+
+def test_model_cache_is_a_size_bounded_lru(tmp_path):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"m{i}.pkl"
+        joblib.dump(list(range(1000 * (i + 1))), path)
+        paths.append(path)
+    sizes = [p.stat().st_size for p in paths]
+    cache = ModelCache(max_bytes=sizes[0] + sizes[1])
+
+    first = cache.get(paths[0])
+    cache.get(paths[1])
+    assert cache.get(paths[0]) is first  # served from memory
+    cache.get(paths[2])  # over budget: m1 (least recently used) goes first, then m0
+    assert list(cache._models) == [str(paths[2])]
+    assert cache._bytes == sizes[2]
+
+    cache = ModelCache(max_bytes=sizes[0] + sizes[2])
+    cache.get(paths[0])
+    cache.get(paths[1])
+    cache.get(paths[0])
+    cache.get(paths[2])
+    assert list(cache._models) == [str(paths[0]), str(paths[2])]
+
+    cache.forget(tmp_path)
+    assert not cache._models and cache._bytes == 0
+
+    # A model larger than the whole budget is still kept while it is the newest
+    tiny = ModelCache(max_bytes=1)
+    assert tiny.get(paths[2]) == list(range(3000))
+    assert list(tiny._models) == [str(paths[2])]
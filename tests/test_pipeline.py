@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+from api.model_registry import load_model
+from api.pipeline_runner import apply_etl_decisions, run_model
+from api.dataset_store import load_matrix
+from conftest import keep_all
+
+FEATURES = ["amount", "amount_usd", "merchant", "n_txn", "noise"]
+
+
+def _train(workspace, fraud_csv, session: str, n_estimators: int):
+    decisions = keep_all(pd.read_csv(fraud_csv, nrows=0).columns)
+    etl = apply_etl_decisions(str(fraud_csv), decisions, str(workspace / session))
+    result = run_model.__wrapped__("is_fraud", FEATURES, etl["cleaned_path"], n_estimators=n_estimators, artifact_dir=str(workspace / session))
+    return etl["cleaned_path"], result
+
+
+def test_grown_forest_matches_a_fresh_one(workspace, fraud_csv):
+    _train(workspace, fraud_csv, "warm", 15)
+    cleaned, grown = _train(workspace, fraud_csv, "warm", 40)
+    _, fresh = _train(workspace, fraud_csv, "cold", 40)
+
+    assert grown["forest"]["reused_from"] == "v0001"
+    assert grown["forest"]["trees_reused"] == 15
+    assert fresh["forest"]["trees_reused"] == 0
+
+    X = load_matrix(cleaned, FEATURES, dtype=np.float32)
+    warm_model = load_model(workspace / "warm", grown["model_version"])
+    cold_model = load_model(workspace / "cold", fresh["model_version"])
+    assert len(warm_model.estimators_) == len(cold_model.estimators_) == 40
+    np.testing.assert_array_equal(warm_model.predict_proba(X), cold_model.predict_proba(X))
+    assert grown["model_metrics"]["roc_auc"] == fresh["model_metrics"]["roc_auc"]
+
+    # A smaller request does not reuse the bigger forest
+    _, smaller = _train(workspace, fraud_csv, "warm", 10)
+    assert smaller["forest"]["trees_reused"] == 0
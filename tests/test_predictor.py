@@ -0,0 +1,57 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
+
+from api.predictor import MicroBatcher
+
+
+def _slow_sum(X: np.ndarray) -> np.ndarray:
+    time.sleep(0.3)
+    return X.sum(axis=1)
+
+
+def test_batcher_coalesces_concurrent_calls():
+    calls = []
+
+    def fn(X):
+        calls.append(len(X))
+        time.sleep(0.05)
+        return X[:, 0]
+
+    async def main():
+        batcher = MicroBatcher(fn)
+        outs = await asyncio.gather(*(batcher.submit(np.full((1, 2), i, dtype=float)) for i in range(20)))
+        batcher.close()
+        return outs
+
+    outs = asyncio.run(main())
+    assert [float(o[0]) for o in outs] == list(range(20))
+    assert len(calls) < 20
+
+
+def test_close_resolves_queued_and_in_flight_calls():
+    async def main():
+        batcher = MicroBatcher(_slow_sum)
+        first = asyncio.ensure_future(batcher.submit(np.ones((1, 3))))
+        second = asyncio.ensure_future(batcher.submit(np.ones((2, 3))))
+        await asyncio.sleep(0.1)
+        # /reset and LRU eviction close from a worker thread
+        threading.Thread(target=batcher.close).start()
+        done = await asyncio.wait_for(asyncio.gather(first, second), timeout=3)
+        late = await asyncio.wait_for(batcher.submit(np.ones((1, 3))), timeout=3)
+        return done, late
+
+    (first, second), late = asyncio.run(main())
+    assert first.tolist() == [3.0] and second.tolist() == [3.0, 3.0]
+    assert late.tolist() == [3.0]
+
+
+def test_close_before_first_call():
+    async def main():
+        batcher = MicroBatcher(_slow_sum)
+        batcher.close()
+        return await asyncio.wait_for(batcher.submit(np.ones((1, 2))), timeout=3)
+
+    assert asyncio.run(main()).tolist() == [2.0]
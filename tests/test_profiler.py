@@ -0,0 +1,41 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from api.profiler import DistinctCounter, hash_values, profile_csv
+from conftest import make_fraud_frame
+
+
+def test_chunked_profile_matches_pandas():
+    df = make_fraud_frame(5000)
+    df.loc[::7, "amount"] = np.nan
+    buf = io.StringIO(df.to_csv(index=False))
+    baseline = pd.read_csv(io.StringIO(buf.getvalue()))
+    profile = profile_csv(buf, chunksize=777)
+
+    assert profile.rows == len(baseline)
+    for col in baseline.columns:
+        p, s = profile.columns[col], baseline[col]
+        assert p.count == len(s)
+        assert p.null_count == int(s.isnull().sum())
+        assert p.n_unique == s.nunique()
+        if pd.api.types.is_numeric_dtype(s):
+            stats = p.numeric_stats()
+            assert stats["mean"] == pytest.approx(s.mean(), rel=1e-12)
+            assert stats["std"] == pytest.approx(s.std(), rel=1e-9)
+            assert stats["min"] == s.min() and stats["max"] == s.max()
+    assert profile.columns["merchant"].top_counts == baseline["merchant"].value_counts().to_dict()
+
+
+def test_distinct_counter_estimate_past_exact_limit():
+    counter = DistinctCounter(exact_limit=1000)
+    for part in np.array_split(np.arange(200_000, dtype=np.float64), 10):
+        counter.add_hashes(hash_values(pd.Series(part)))
+    assert not counter.is_exact
+    assert counter.count() == pytest.approx(200_000, rel=0.03)
+
+
+def test_int_and_float_chunks_hash_alike():
+    assert set(hash_values(pd.Series([1, 2, 3]))) == set(hash_values(pd.Series([1.0, 2.0, np.nan, 3.0])))
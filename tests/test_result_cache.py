@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+from api import result_cache
+from api.result_cache import ResultCache, cached
+
+
+@pytest.fixture
+def calls(workspace):
+    """Calls that reached the wrapped function, with the shared cache isolated per test."""
+    return []
+
+
+def test_cached_calls_are_keyed_on_dataset_and_parameters(workspace, calls):
+    @cached(dataset=lambda a: a["dataset_hash"])
+    def stage(dataset_hash, alpha=1, artifact_dir=None):
+        calls.append((dataset_hash, alpha, artifact_dir))
+        return {"alpha": alpha}
+
+    assert stage("d1", alpha=1, artifact_dir="a") == {"alpha": 1}
+    assert stage("d1", 1, artifact_dir="b") == {"alpha": 1}  # artifact_dir is not part of the key
+    stage("d1", alpha=2)
+    stage("d2", alpha=1)
+    stage(None, alpha=1)  # no dataset hash bypasses the cache
+    stage(None, alpha=1)
+    assert [c[:2] for c in calls] == [("d1", 1), ("d1", 2), ("d2", 1), (None, 1), (None, 1)]
+
+    result_cache.results.invalidate(["d1"])
+    stage("d1", alpha=1)
+    stage("d2", alpha=1)
+    assert [c[:2] for c in calls][-1] == ("d1", 1) and len(calls) == 6
+
+
+def test_on_hit_can_turn_a_hit_into_a_miss(workspace, calls):
+    replay = {"ok": False}
+
+    @cached(dataset=lambda a: "d", on_hit=lambda value, args: replay["ok"])
+    def stage(x):
+        calls.append(x)
+        return x
+
+    stage(1)
+    stage(1)
+    replay["ok"] = True
+    stage(1)
+    assert calls == [1, 1]
+
+
+def test_hits_survive_a_fresh_process_cache(tmp_path):
+    ResultCache(tmp_path).put("d", "k", [1, 2, 3])
+    assert ResultCache(tmp_path).get("d", "k") == [1, 2, 3]
+    assert ResultCache(tmp_path).get("d", "other") is result_cache._MISS
+
+
+def test_disk_tier_evicts_least_recently_used_to_its_byte_budget(tmp_path):
+    blob = b"x" * 10_000
+    cache = ResultCache(tmp_path, max_bytes=25_000, memory_bytes=0)
+    cache.put("d", "a", blob)
+    cache.put("d", "b", blob)
+    os.utime(tmp_path / "d" / "a.pkl", (1, 1))
+    os.utime(tmp_path / "d" / "b.pkl", (2, 2))
+    cache.get("d", "a")  # touch: b is now the oldest
+    cache.put("d", "c", blob)
+    assert cache.get("d", "b") is result_cache._MISS
+    assert cache.get("d", "a") == blob and cache.get("d", "c") == blob
+    assert sum(p.stat().st_size for p in tmp_path.glob("*/*.pkl")) <= 25_000
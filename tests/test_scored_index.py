@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from api.scored_index import ScoredIndex, ScoredIndexWriter, decode_cursor, encode_cursor
+from conftest import make_fraud_frame
+
+
+def _segment_of(probs: np.ndarray) -> np.ndarray:
+    return 1 + (probs >= 0.4).astype(np.int64) + (probs >= 0.8).astype(np.int64)
+
+
+@pytest.fixture
+def scored(tmp_path):
+    """A scored CSV written in chunks (with ties in probability) and its index."""
+    df = make_fraud_frame(2000)
+    rng = np.random.default_rng(3)
+    probs = rng.random(len(df)).round(3)
+    df["probability"] = probs
+    df["segment_number"] = _segment_of(probs)
+    path = tmp_path / "scored_output.csv"
+    writer = ScoredIndexWriter(tmp_path, len(df))
+    written = 0
+    with open(path, "wb") as f:
+        for start in range(0, len(df), 300):
+            data = df.iloc[start:start + 300].to_csv(index=False, header=start == 0).encode()
+            f.write(data)
+            writer.add(data, written, probs[start:start + 300], header=start == 0)
+            written += len(data)
+    writer.finish(path, _segment_of, 3)
+    return ScoredIndex(tmp_path, path), pd.read_csv(path)
+
+
+def _expected(df, segments=None, prob_min=None, prob_max=None):
+    rows = np.argsort(-df["probability"].to_numpy(), kind="stable")
+    keep = pd.Series(True, index=df.index)
+    if segments is not None:
+        keep &= df["segment_number"].isin(segments)
+    if prob_min is not None:
+        keep &= df["probability"] >= prob_min
+    if prob_max is not None:
+        keep &= df["probability"] <= prob_max
+    return [int(r) for r in rows if keep[r]]
+
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"segments": [3]},
+    {"segments": [1, 3]},
+    {"prob_min": 0.25, "prob_max": 0.5},
+    {"segments": [2], "prob_min": 0.5},
+    {"prob_min": 0.999, "prob_max": 0.001},
+])
+def test_query_matches_a_sort_and_filter(scored, filters):
+    index, df = scored
+    expected = _expected(df, **filters)
+    result = index.query(**filters, limit=len(df))
+    assert result["total"] == len(expected)
+    assert [r["row"] for r in result["rows"]] == expected
+    for record in result["rows"][:50]:
+        assert record["probability"] == df.at[record["row"], "probability"]
+        assert record["merchant"] == (None if pd.isna(df.at[record["row"], "merchant"]) else df.at[record["row"], "merchant"])
+
+
+def test_pages_and_top_k(scored):
+    index, df = scored
+    expected = _expected(df, segments=[2, 3])[:250]
+    seen, offset = [], 0
+    while True:
+        page = index.query(segments=[2, 3], top_k=250, offset=offset, limit=60)
+        assert page["total"] == 250
+        seen += [r["row"] for r in page["rows"]]
+        if page["next_cursor"] is None:
+            break
+        offset = decode_cursor(page["next_cursor"], index.id)
+    assert seen == expected
+
+
+def test_cursor_from_another_index_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor("aaa", 10), "bbb")
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor", "bbb")
+
+
+def test_stale_index_is_not_used(scored):
+    index, df = scored
+    with open(index.csv_path, "ab") as f:
+        f.write(b"\n")
+    with pytest.raises(FileNotFoundError):
+        ScoredIndex(index.csv_path.parent, index.csv_path)
@@ -0,0 +1,30 @@
+from api.state import SessionRegistry
+
+
+def test_unknown_ids_get_a_fresh_server_issued_id(tmp_path):
+    registry = SessionRegistry(root=tmp_path)
+    chosen = "attacker-picked-id-123"
+    session = registry.get_or_create(chosen)
+    assert session.session_id != chosen
+    assert registry.get(chosen) is None
+    assert registry.get_or_create(session.session_id) is session
+
+
+def test_eviction_releases_sessions_before_deleting_their_files(tmp_path):
+    registry = SessionRegistry(root=tmp_path, ttl=10)
+    idle = registry.get_or_create()
+    idle.artifact_dir.mkdir(parents=True)
+    (idle.artifact_dir / "model.pkl").write_bytes(b"x")
+    active = registry.get_or_create()
+    seen = []
+
+    def before_delete(session):
+        # Jobs are cancelled while the artifacts they write to still exist
+        seen.append((session.session_id, (session.artifact_dir / "model.pkl").exists()))
+
+    active.last_seen = idle.last_seen + 100
+    evicted = registry.evict_idle(now=idle.last_seen + 50, force=True, before_delete=before_delete)
+    assert [s.session_id for s in evicted] == [idle.session_id]
+    assert seen == [(idle.session_id, True)]
+    assert not idle.artifact_dir.exists()
+    assert registry.get(active.session_id) is active
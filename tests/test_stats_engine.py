@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats as scipy_stats
+from sklearn.feature_selection import mutual_info_classif
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import average_precision_score, confusion_matrix, roc_auc_score
+
+from api.stats_engine import (
+    best_threshold_index,
+    chi2_pvalues,
+    correlation_matrix,
+    correlation_scan,
+    curve_auc,
+    high_correlation_pairs,
+    mutual_info_scores,
+    stratified_sample,
+    threshold_curve,
+    vif_from_corr,
+)
+
+
+def _baseline_pairs(X: pd.DataFrame, threshold: float = 0.85) -> list[tuple[str, str]]:
+    """The pre-engine walk of ``X.corr()``'s upper triangle."""
+    upper = X.corr().abs().where(np.triu(np.ones((X.shape[1],) * 2), k=1).astype(bool))
+    return [(row, col) for col in upper.columns for row in upper.index if upper.loc[row, col] > threshold]
+
+
+@pytest.mark.parametrize("missing", [0.2, 0.3, 0.5, 0.9])
+def test_heavily_missing_correlated_pair_is_found(missing):
+    rng = np.random.default_rng(0)
+    a = rng.normal(size=5000)
+    b = a + 0.1 * rng.normal(size=5000)
+    b[rng.random(5000) < missing] = np.nan
+    X = pd.DataFrame({"a": a, "b": b, "c": rng.normal(size=5000)})
+    cols = [X[c].to_numpy() for c in X]
+
+    for pairs in (high_correlation_pairs(cols, list(X)), correlation_scan(cols, list(X))[0]):
+        assert [(p["a"], p["b"]) for p in pairs] == [("a", "b")]
+        assert pairs[0]["corr"] == round(abs(X.corr().loc["a", "b"]), 4)
+
+
+def test_pairs_match_dataframe_corr_across_blocks():
+    rng = np.random.default_rng(1)
+    base = rng.normal(size=(2000, 20))
+    W = base[:, rng.integers(0, 20, 150)] + 0.3 * rng.normal(size=(2000, 150))
+    W[rng.random(W.shape) < 0.1] = np.nan
+    X = pd.DataFrame(W, columns=[f"c{i}" for i in range(W.shape[1])])
+    cols = [X[c].to_numpy() for c in X]
+
+    pairs, R = correlation_scan(cols, list(X), block_size=32)
+    assert [(p["a"], p["b"]) for p in pairs] == _baseline_pairs(X)
+    assert high_correlation_pairs(cols, list(X), block_size=32) == pairs
+    np.testing.assert_allclose(R, correlation_matrix(cols, block_size=64), equal_nan=True)
+
+
+def test_correlation_matrix_flags_constant_columns():
+    rng = np.random.default_rng(2)
+    x = rng.normal(size=100)
+    R = correlation_matrix([x, np.ones(100), -x])
+    assert np.isnan(R[1]).all() and np.isnan(R[:, 1]).all()
+    np.testing.assert_allclose(R[np.ix_([0, 2], [0, 2])], [[1, -1], [-1, 1]])
+
+
+def _mi_data(n: int = 3000):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({
+        "amount": rng.normal(size=n),
+        "level": rng.integers(0, 5, n).astype(float),
+        "flag": rng.integers(0, 2, n).astype(float),
+    })
+    y = ((X["amount"] + 0.3 * X["level"] + X["flag"] + rng.normal(size=n)) > 1.5).astype(int)
+    return X, y.to_numpy()
+
+
+@pytest.mark.parametrize("mode", ["auto", "exact"])
+def test_mutual_info_defaults_to_the_baseline_estimator(mode):
+    X, y = _mi_data()
+    scores = mutual_info_scores([X[c].to_numpy() for c in X], list(X), y, mode=mode)
+    baseline = mutual_info_classif(X, y, random_state=42)
+    np.testing.assert_allclose([scores[c]["mutual_info"] for c in X], baseline.round(6))
+    assert all(s["mi_method"] == "knn" and s["mi_confidence"] == "exact" for s in scores.values())
+
+
+def test_mutual_info_labels_plug_in_and_sampled_scores():
+    X, y = _mi_data()
+    cols = [X[c].to_numpy() for c in X]
+    discrete = mutual_info_scores(cols, list(X), y, mode="discrete")
+    assert all(s["mi_method"] == "plug_in" and s["mi_confidence"] == "approximate" for s in discrete.values())
+
+    sampled = mutual_info_scores(cols, list(X), y, mode="auto", sample_size=1000)
+    for s in sampled.values():
+        assert (s["mi_method"], s["mi_rows"], s["mi_rescaled"], s["mi_confidence"]) == ("knn_sampled", 1000, True, "approximate")
+
+
+def test_stratified_sample_keeps_every_minority_row():
+    y = np.r_[np.zeros(9900, dtype=np.int64), np.ones(100, dtype=np.int64)]
+    rows = stratified_sample(y, 1000)
+    assert np.all(np.diff(rows) > 0)
+    assert (y[rows] == 1).sum() == 100
+    assert abs(len(rows) - 1000) <= 1
+
+
+def test_vif_matches_per_column_regressions():
+    rng = np.random.default_rng(4)
+    X = pd.DataFrame(rng.normal(size=(2000, 5)), columns=list("abcde"))
+    X["f"] = X["a"] * 0.8 + X["b"] * 0.5 + rng.normal(scale=0.3, size=len(X))
+    X["g"] = X["c"] + X["d"]  # exact linear combination
+    _, corr = correlation_scan([X[c].to_numpy() for c in X.columns], list(X.columns))
+    vif = vif_from_corr(corr)
+    for j, col in enumerate(X.columns):
+        others = X.drop(columns=[col])
+        r2 = LinearRegression().fit(others, X[col]).score(others, X[col])
+        if col in ("c", "d", "g"):
+            assert vif[j] > 1e6
+        else:
+            assert vif[j] == pytest.approx(1.0 / (1.0 - r2), rel=1e-6)
+
+
+def test_chi2_pvalues_match_crosstab_for_discrete_columns():
+    rng = np.random.default_rng(5)
+    n = 4000
+    y = rng.integers(0, 2, n)
+    cols = {
+        "binary": (rng.random(n) < 0.3 + 0.1 * y).astype(np.int64),
+        "levels": rng.integers(0, 6, n) + y,
+        "unrelated": rng.integers(0, 4, n),
+    }
+    got = chi2_pvalues(list(cols.values()), list(cols), y, n_jobs=1)
+    for name, values in cols.items():
+        _, p, _, _ = scipy_stats.chi2_contingency(pd.crosstab(values, y))
+        assert got[name]["p_value"] == pytest.approx(p, rel=1e-9, abs=1e-300)
+        assert got[name]["binned"] is False
+
+
+def test_threshold_curve_is_exact_at_every_distinct_score():
+    rng = np.random.default_rng(6)
+    y = (rng.random(3000) < 0.1).astype(int)
+    scores = np.round(rng.random(3000) * 0.6 + 0.3 * y, 3)  # plenty of ties
+    curve = threshold_curve(y, scores, cost_fp=1.0, cost_fn=5.0)
+
+    assert np.all(np.diff(curve["threshold"]) < 0)
+    assert set(curve["threshold"]) == set(np.unique(scores))
+    for i in range(0, len(curve["threshold"]), 37):
+        pred = (scores >= curve["threshold"][i]).astype(int)
+        tn, fp, fn, tp = confusion_matrix(y, pred, labels=[0, 1]).ravel()
+        assert (curve["tp"][i], curve["fp"][i], curve["fn"][i], curve["tn"][i]) == (tp, fp, fn, tn)
+        assert curve["cost"][i] == fp + 5 * fn
+
+    auc = curve_auc(curve)
+    assert auc["roc_auc"] == pytest.approx(roc_auc_score(y, scores), abs=1e-12)
+    assert auc["average_precision"] == pytest.approx(average_precision_score(y, scores), abs=1e-12)
+
+    i = best_threshold_index(curve, "cost")
+    costs = [np.sum((scores >= t) & (y == 0)) + 5 * np.sum((scores < t) & (y == 1)) for t in np.unique(scores)]
+    assert curve["cost"][i] == min(costs)
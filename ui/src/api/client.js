@@ -1,10 +1,27 @@
 const API_BASE = "http://localhost:8000";
+const SESSION_HEADER = "X-Session-ID";
+
+// The API keys all state by session; remember ours across reloads.
+let sessionId = localStorage.getItem("sessionId");
+
+function sessionHeaders() {
+  return sessionId ? { [SESSION_HEADER]: sessionId } : {};
+}
+
+function rememberSession(res) {
+  const id = res.headers.get(SESSION_HEADER);
+  if (id && id !== sessionId) {
+    sessionId = id;
+    localStorage.setItem("sessionId", id);
+  }
+}
 
 async function request(path, options = {}) {
   const res = await fetch(`${API_BASE}${path}`, {
-    headers: { "Content-Type": "application/json", ...options.headers },
     ...options,
+    headers: { "Content-Type": "application/json", ...sessionHeaders(), ...options.headers },
   });
+  rememberSession(res);
   if (!res.ok) {
     const body = await res.json().catch(() => ({}));
     throw new Error(body.detail || `Request failed: ${res.status}`);
@@ -12,14 +29,35 @@ async function request(path, options = {}) {
   return res.json();
 }
 
+// /run/* endpoints enqueue a background job; poll it until it finishes.
+async function runJob(path, options = {}, pollMs = 1000) {
+  const job = await request(path, { method: "POST", ...options });
+  while (true) {
+    const state = await request(`/jobs/${job.job_id}`);
+    if (state.status === "succeeded") return state.result;
+    if (state.status === "failed") throw new Error(state.error || "Job failed");
+    if (state.status === "cancelled") throw new Error("Job cancelled");
+    await new Promise((r) => setTimeout(r, pollMs));
+  }
+}
+
+export async function cancelJob(jobId) {
+  return request(`/jobs/${jobId}/cancel`, { method: "POST" });
+}
+
 export async function getStatus() {
   return request("/status");
 }
 
 export async function uploadDataset(file) {
-  const form = new FormData();
-  form.append("file", file);
-  const res = await fetch(`${API_BASE}/upload`, { method: "POST", body: form });
+  // Raw body rather than multipart, so the server writes the file as it arrives
+  const params = new URLSearchParams({ filename: file.name });
+  const res = await fetch(`${API_BASE}/upload/stream?${params}`, {
+    method: "POST",
+    body: file,
+    headers: { "Content-Type": "application/octet-stream", ...sessionHeaders() },
+  });
+  rememberSession(res);
   if (!res.ok) {
     const body = await res.json().catch(() => ({}));
     throw new Error(body.detail || "Upload failed");
@@ -31,26 +69,27 @@ export async function getColumns() {
   return request("/columns");
 }
 
-export async function analyzeTarget(target) {
+export async function analyzeTarget(target, sampleSize = null) {
   return request("/analyze/target", {
     method: "POST",
-    body: JSON.stringify({ target }),
+    body: JSON.stringify({ target, sample_size: sampleSize }),
   });
 }
 
-export async function runStats() {
-  return request("/run/stats", { method: "POST" });
+export async function runStats(payload = {}) {
+  return runJob("/run/stats", { body: JSON.stringify(payload) });
 }
 
 export async function runModel(payload) {
-  return request("/run/model", {
-    method: "POST",
-    body: JSON.stringify(payload),
-  });
+  return runJob("/run/model", { body: JSON.stringify(payload) });
+}
+
+export async function runModelSearch(payload = {}) {
+  return runJob("/run/model/search", { body: JSON.stringify(payload) });
 }
 
 export async function runEvaluate() {
-  return request("/run/evaluate", { method: "POST" });
+  return runJob("/run/evaluate");
 }
 
 export async function confirmStage(stage, payload) {
@@ -68,23 +107,20 @@ export async function resetSession() {
   return request("/reset", { method: "POST" });
 }
 
-export async function runDescriptives(target) {
+export async function runDescriptives(target, page = {}) {
   return request("/run/descriptives", {
     method: "POST",
-    body: JSON.stringify({ target }),
+    body: JSON.stringify({ target, ...page }),
   });
 }
 
 export async function runLogistic(payload) {
-  return request("/run/logistic", {
-    method: "POST",
-    body: JSON.stringify(payload),
-  });
+  return runJob("/run/logistic", { body: JSON.stringify(payload) });
 }
 
 export function downloadReport() {
   const a = document.createElement("a");
-  a.href = `${API_BASE}/download/report`;
+  a.href = `${API_BASE}/download/report?session_id=${encodeURIComponent(sessionId || "")}`;
   a.download = "ml_pipeline_report.html";
   document.body.appendChild(a);
   a.click();